@@ -1,20 +1,143 @@
-from flask import Flask, request, jsonify, send_file, render_template, url_for
+from flask import Flask, Response, g, request, jsonify, send_file, render_template, url_for, make_response
 import os
+import codecs
+import hashlib
+import functools
+import shutil
 import tempfile
 from werkzeug.utils import secure_filename
 import uuid
 
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max
+app.config['BATCH_WORKERS'] = int(os.environ.get('BATCH_WORKERS', os.cpu_count() or 1))
+# Processes a single /convert may fan out to; every worker thread can be converting at once
+app.config['CONVERT_WORKERS'] = int(os.environ.get('CONVERT_WORKERS', 1))
+app.config['BATCH_MAX_FILES'] = int(os.environ.get('BATCH_MAX_FILES', 5000))
+app.config['BATCH_MAX_BYTES'] = int(os.environ.get('BATCH_MAX_BYTES', 1024 * 1024 * 1024))  # uncompressed
+# Inline previews are capped; the rest is fetched page by page from /preview
+app.config['PREVIEW_MAX_BYTES'] = int(os.environ.get('PREVIEW_MAX_BYTES', 64 * 1024))
+app.config['PREVIEW_MAX_LINES'] = int(os.environ.get('PREVIEW_MAX_LINES', 1000))
+app.config['PREVIEW_PAGE_MAX_BYTES'] = int(os.environ.get('PREVIEW_PAGE_MAX_BYTES', 1024 * 1024))
+PREVIEW_FORMATS = ['txt', 'html', 'xml', 'csv']
+# Per-request profiling (X-Profile: cpu,memory) is only honoured when this is set
+app.config['PROFILE_DIR'] = os.environ.get('CONVERTER_PROFILE_DIR')
+# Results are kept here (shared by all workers) and downloaded by opaque id
+app.config['ARTIFACT_DIR'] = os.environ.get('ARTIFACT_DIR', os.path.join(tempfile.gettempdir(), 'converter-artifacts'))
+app.config['ARTIFACT_TTL'] = int(os.environ.get('ARTIFACT_TTL', 3600))
+app.config['DOWNLOAD_COMPRESSION'] = os.environ.get('DOWNLOAD_COMPRESSION', '1') != '0'
+# Every conversion runs in a killable child process with these limits (0 disables one)
+app.config['CONVERT_TIMEOUT'] = float(os.environ.get('CONVERT_TIMEOUT', 120))
+app.config['CONVERT_CPU_SECONDS'] = int(os.environ.get('CONVERT_CPU_SECONDS', 120))
+app.config['CONVERT_MEMORY_MB'] = int(os.environ.get('CONVERT_MEMORY_MB', 4096))
+app.config['JOB_DIR'] = os.environ.get('JOB_DIR', os.path.join(tempfile.gettempdir(), 'converter-jobs'))
+# Identical uploads converted to the same format at the same time share one conversion
+app.config['COALESCE_DIR'] = os.environ.get('COALESCE_DIR', os.path.join(tempfile.gettempdir(), 'converter-flights'))
+KILLED_STATUS = {'timeout': 504, 'cancelled': 409, 'resource_limit': 413, 'killed': 500}
 
 # Import converter after Flask app creation to avoid circular imports
 try:
-    from converters import FileConverter
-    converter = FileConverter()
+    from converters import FileConverter, CONVERT_OPTIONS
+    import artifacts
+    import batch
+    import coalesce
+    import metrics
+    import profiling
+    import supervisor
+    import warmup
+    converter = FileConverter(workers=app.config['CONVERT_WORKERS'])
+    conversion_limits = {
+        'job_dir': app.config['JOB_DIR'],
+        'timeout': app.config['CONVERT_TIMEOUT'],
+        'cpu_seconds': app.config['CONVERT_CPU_SECONDS'],
+        'memory_bytes': app.config['CONVERT_MEMORY_MB'] * 1024 * 1024,
+    }
+    conversion_supervisor = supervisor.Supervisor(converter, **conversion_limits)
+    conversion_flights = coalesce.SingleFlight(app.config['COALESCE_DIR'])
+    artifact_store = artifacts.ArtifactStore(app.config['ARTIFACT_DIR'], app.config['ARTIFACT_TTL'])
 except ImportError as e:
     print(f"Warning: Could not import FileConverter: {e}")
     converter = None
 
+def profiled(view):
+    """Trace every stage of a request; capture cProfile/tracemalloc data on demand.
+
+    The capture itself runs in the conversion's child process: the view
+    passes g.profile on to Supervisor.convert, which fills in its result.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if converter is None:
+            return view(*args, **kwargs)
+
+        with profiling.trace(request.headers.get('X-Request-Id')), profiling.span(request.endpoint):
+            kinds = request.headers.get('X-Profile')
+            directory = app.config['PROFILE_DIR']
+            if not kinds or not directory:
+                return view(*args, **kwargs)
+
+            g.profile = {'kinds': kinds, 'directory': directory, 'label': request.endpoint}
+            response = make_response(view(*args, **kwargs))
+        capture = g.profile.get('capture')
+        if capture is None:
+            response.headers['X-Profile-Skipped'] = 'no conversion ran to completion in this request'
+        elif capture.get('skipped'):
+            response.headers['X-Profile-Skipped'] = 'another capture is running'
+        else:
+            response.headers['X-Profile-Id'] = capture['id']
+        return response
+    return wrapper
+
+def traced_stream(stream, trace_id, name):
+    """Keep a request's trace and span open while its response body is streamed"""
+    with profiling.trace(trace_id), profiling.span(name):
+        yield from stream
+
+def save_upload(file, path):
+    """Save an uploaded file and return the SHA-256 of its bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'wb') as f:
+        for chunk in iter(lambda: file.stream.read(1024 * 1024), b''):
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+def conversion_options(form):
+    """FileConverter.convert keyword options sent as form fields"""
+    return {name: form[name] for name in CONVERT_OPTIONS if form.get(name)}
+
+def read_text_range(path, offset, length, max_lines=None):
+    """Decode up to `length` bytes of UTF-8 starting at `offset`.
+
+    The range is widened/narrowed to character boundaries, so pages can be
+    requested with arbitrary offsets. Raises UnicodeDecodeError for non-text.
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read(length)
+
+    # Skip continuation bytes if the offset landed inside a character
+    start = 0
+    while start < min(3, len(data)) and offset > 0 and (data[start] & 0xC0) == 0x80:
+        start += 1
+
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    at_eof = offset + len(data) >= size
+    text = decoder.decode(data[start:], final=at_eof)
+    if max_lines is not None:
+        lines = text.splitlines(keepends=True)
+        if len(lines) > max_lines:
+            text = ''.join(lines[:max_lines])
+    next_offset = offset + start + len(text.encode('utf-8'))
+    return {
+        'text': text,
+        'offset': offset + start,
+        'next_offset': next_offset,
+        'size': size,
+        'eof': next_offset >= size,
+    }
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -23,11 +146,29 @@ def index():
 def health():
     return "Universal File Converter is running! 🚀"
 
+@app.route('/ready')
+def ready():
+    """Readiness probe: 503 until the conversion backends are warm"""
+    if converter is None:
+        return jsonify({'ready': False, 'error': 'File converter not available'}), 503
+    if not warmup.is_ready():
+        # Nothing warmed this process up front (dev server, no gunicorn.conf.py)
+        warmup.start()
+    state = warmup.status()
+    return jsonify(state), 200 if state['ready'] else 503
+
+@app.route('/metrics')
+def metrics_endpoint():
+    if converter is None:
+        return jsonify({'error': 'File converter not available'}), 500
+    return Response(metrics.REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/instructions')
 def instructions():
     return render_template('instructions.html')
 
 @app.route('/convert', methods=['POST'])
+@profiled
 def convert_file():
     try:
         if converter is None:
@@ -38,6 +179,9 @@ def convert_file():
         
         file = request.files['file']
         output_format = request.form.get('format', '').lower()
+        # Client-chosen id so the conversion can be stopped through /cancel/<job_id>
+        job_id = request.form.get('job_id') or None
+        options = conversion_options(request.form)
         
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
@@ -45,56 +189,210 @@ def convert_file():
         if not output_format:
             return jsonify({'error': 'No output format selected'}), 400
         
+        if job_id is not None and not supervisor.valid_job_id(job_id):
+            return jsonify({'error': 'Invalid job_id'}), 400
+        
         # Save uploaded file
         filename = secure_filename(file.filename)
         temp_id = str(uuid.uuid4())
         temp_path = os.path.join(tempfile.gettempdir(), f"{temp_id}_{filename}")
-        file.save(temp_path)
+        with profiling.span('save_upload'):
+            upload_hash = save_upload(file, temp_path)
         
-        # Convert immediately
-        output_path = converter.convert(temp_path, output_format)
-        
-        # Generate download filename
+        # Download names keep the upload's stem
         base_name = os.path.splitext(filename)[0]
-        download_name = f"{base_name}.{output_format}"
         
-        # Store file for later download
-        output_filename = os.path.basename(output_path)
+        def run_conversion():
+            metrics.QUEUE_DEPTH.inc(queue='convert')
+            try:
+                output_path = conversion_supervisor.convert(temp_path, output_format, job_id,
+                                                            profile=g.get('profile'), **options)
+            finally:
+                metrics.QUEUE_DEPTH.dec(queue='convert')
+            # Store file for later download; a multi-sheet workbook can come back as a .zip
+            artifact = artifact_store.store(output_path, base_name + os.path.splitext(output_path)[1])
+            return dict(artifact, reports=conversion_supervisor.last_reports())
+        
+        # Convert immediately, or attach to an identical conversion already running.
+        # A cancelled leader is not shared: the others run their own conversion.
+        flight_key = hashlib.sha256(f"{upload_hash}:{output_format}:{sorted(options.items())}".encode()).hexdigest()
+        try:
+            artifact, coalesced = conversion_flights.run(
+                flight_key, run_conversion,
+                share_error=lambda e: not isinstance(e, supervisor.ConversionCancelled))
+        except supervisor.ConversionKilled as e:
+            return jsonify({'error': str(e), 'error_type': e.kind}), KILLED_STATUS[e.kind]
+        finally:
+            # Clean up input file only
+            try:
+                with profiling.span('cleanup'):
+                    os.remove(temp_path)
+            except:
+                pass
         
-        # Read file for text preview
+        reports = artifact['reports']
+        result_ext = os.path.splitext(artifact['download_name'])[1]
+        download_name = base_name + result_ext
+        if coalesced:
+            # Every request gets its own download id and name, even when it shared the conversion
+            artifact = artifact_store.alias(artifact, download_name)
+        
+        # Read a bounded text preview; the rest is paged in from /preview
         text_content = None
-        if output_format in ['txt', 'html', 'xml', 'csv']:
+        preview = None
+        if result_ext.lstrip('.') in PREVIEW_FORMATS:
             try:
-                with open(output_path, 'r', encoding='utf-8') as f:
-                    text_content = f.read()
+                with profiling.span('preview_read'):
+                    preview = read_text_range(artifact['path'], 0, app.config['PREVIEW_MAX_BYTES'],
+                                              app.config['PREVIEW_MAX_LINES'])
+                text_content = preview['text']
             except:
                 pass
         
-        # Clean up input file only
-        try:
-            os.remove(temp_path)
-        except:
-            pass
-        
         return jsonify({
             'success': True,
             'text_content': text_content,
-            'format': output_format,
-            'download_url': f"/download/{output_filename}"
+            'preview_truncated': bool(preview) and not preview['eof'],
+            'preview_next_offset': preview['next_offset'] if preview else None,
+            'preview_url': f"/preview/{artifact['id']}" if preview else None,
+            'size': artifact['size'],
+            'format': result_ext.lstrip('.'),
+            'artifact_id': artifact['id'],
+            'coalesced': coalesced,
+            'reports': reports,
+            'download_url': f"/download/{artifact['id']}"
         })
         
+    except ValueError as e:
+        # Unsupported format pair or a bad option
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/download/<filename>')
-def download_file(filename):
+@app.route('/convert/batch', methods=['POST'])
+def convert_batch():
     try:
-        filepath = os.path.join(tempfile.gettempdir(), filename)
-        if os.path.exists(filepath):
-            return send_file(filepath, as_attachment=True)
-        return jsonify({'error': f'File not found: {filename}'}), 404
+        if converter is None:
+            return jsonify({'error': 'File converter not available'}), 500
+
+        uploads = request.files.getlist('files') + request.files.getlist('file')
+        output_format = request.form.get('format', '').lower()
+        options = conversion_options(request.form)
+
+        if not uploads:
+            return jsonify({'error': 'No files uploaded'}), 400
+
+        if not output_format:
+            return jsonify({'error': 'No output format selected'}), 400
+
+        # Save every member (expanding ZIP archives) into a private work dir
+        work_dir = tempfile.mkdtemp(dir=converter.temp_dir)
+        try:
+            inputs = batch.collect_inputs(uploads, work_dir,
+                                          app.config['BATCH_MAX_FILES'],
+                                          app.config['BATCH_MAX_BYTES'])
+        except Exception as e:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            status = 413 if isinstance(e, batch.BatchLimitError) else 400
+            return jsonify({'error': str(e)}), status
+
+        if not inputs:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            return jsonify({'error': 'No files selected'}), 400
+
+        # Results are streamed back as they finish; manifest.json is written last
+        stream = batch.stream_results(inputs, output_format, work_dir, app.config['BATCH_WORKERS'],
+                                      conversion_limits, options)
+        # The work happens while the body streams, after this view has returned
+        stream = traced_stream(stream, request.headers.get('X-Request-Id'), request.endpoint)
+        response = Response(stream, mimetype='application/zip', headers={
+            'Content-Disposition': f'attachment; filename=converted_{output_format}.zip'
+        })
+        if request.headers.get('X-Profile'):
+            # Members convert in the batch pool's processes, out of reach of a capture here
+            response.headers['X-Profile-Skipped'] = 'not supported for batch requests'
+        return response
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/cancel/<job_id>', methods=['POST'])
+def cancel_job(job_id):
+    try:
+        if converter is None:
+            return jsonify({'error': 'File converter not available'}), 500
+
+        if not conversion_supervisor.cancel(job_id):
+            return jsonify({'error': f'No running job: {job_id}'}), 404
+        return jsonify({'success': True, 'job_id': job_id})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/preview/<artifact_id>')
+def preview_file(artifact_id):
+    try:
+        if converter is None:
+            return jsonify({'error': 'File converter not available'}), 500
+
+        artifact = artifact_store.load(artifact_id)
+        if artifact is None or os.path.splitext(artifact['download_name'])[1].lstrip('.').lower() not in PREVIEW_FORMATS:
+            return jsonify({'error': f'File not found: {artifact_id}'}), 404
+        filepath = artifact['path']
+
+        try:
+            offset = max(0, int(request.args.get('offset', 0)))
+            length = int(request.args.get('length', app.config['PREVIEW_MAX_BYTES']))
+        except ValueError:
+            return jsonify({'error': 'offset and length must be integers'}), 400
+        length = max(4, min(length, app.config['PREVIEW_PAGE_MAX_BYTES']))
+
+        try:
+            page = read_text_range(filepath, offset, length)
+        except UnicodeDecodeError:
+            return jsonify({'error': 'File is not valid UTF-8 text'}), 415
+        return jsonify(page)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/download/<artifact_id>')
+def download_file(artifact_id):
+    try:
+        if converter is None:
+            return jsonify({'error': 'File converter not available'}), 500
+
+        artifact = artifact_store.load(artifact_id)
+        if artifact is None:
+            return jsonify({'error': f'File not found: {artifact_id}'}), 404
+
+        # Text outputs may be sent compressed, but never for range requests:
+        # byte ranges always refer to the original representation
+        encoding = None
+        if (app.config['DOWNLOAD_COMPRESSION'] and artifact_store.is_text(artifact)
+                and 'Range' not in request.headers):
+            encoding = artifacts.negotiate_encoding(request.headers.get('Accept-Encoding'),
+                                                    artifact_store.supported_encodings())
+
+        path = artifact['path']
+        etag = artifact['sha256']
+        if encoding:
+            path = artifact_store.encoded(artifact, encoding)
+            etag = f"{etag}-{encoding}"
+
+        # conditional=True answers If-None-Match with 304 and Range/If-Range with 206
+        response = send_file(path, mimetype=artifact['mimetype'], as_attachment=True,
+                             download_name=artifact['download_name'], conditional=True,
+                             etag=etag, max_age=app.config['ARTIFACT_TTL'])
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if artifact_store.is_text(artifact):
+            response.vary.add('Accept-Encoding')
+        response.cache_control.private = True
+        response.cache_control.immutable = True
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
+    if converter is not None:
+        warmup.start()
     app.run(debug=True, port=5000)
\ No newline at end of file
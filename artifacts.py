@@ -0,0 +1,162 @@
+"""Conversion results addressed by opaque id.
+
+Each artifact lives in ``<root>/<id>/`` next to a small ``meta.json`` holding
+its download name, size and SHA-256. The root is shared by every gunicorn
+worker, so a download can be served by a different worker than the one that
+did the conversion. Compressed variants for text outputs are built once on
+first request and cached beside the original.
+"""
+import os
+import re
+import gzip
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import mimetypes
+import threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+_TEXT_TYPES = ('application/json', 'application/xml', 'image/svg+xml')
+_PURGE_INTERVAL = 300
+
+
+class ArtifactStore:
+    def __init__(self, root, ttl=3600):
+        self.root = root
+        self.ttl = ttl
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _dir(self, artifact_id):
+        return os.path.join(self.root, artifact_id)
+
+    def store(self, path, download_name):
+        """Move a finished output into the store and return its metadata"""
+        artifact_id = uuid.uuid4().hex
+        directory = self._dir(artifact_id)
+        os.makedirs(directory)
+        content_path = os.path.join(directory, 'content')
+        shutil.move(path, content_path)
+
+        digest = hashlib.sha256()
+        with open(content_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+
+        return self._write_meta(artifact_id, download_name, content_path, digest.hexdigest())
+
+    def alias(self, artifact, download_name):
+        """Give an existing artifact's content a new id and download name without copying it"""
+        artifact_id = uuid.uuid4().hex
+        directory = self._dir(artifact_id)
+        os.makedirs(directory)
+        content_path = os.path.join(directory, 'content')
+        try:
+            os.link(artifact['path'], content_path)
+        except OSError:
+            shutil.copyfile(artifact['path'], content_path)
+        return self._write_meta(artifact_id, download_name, content_path, artifact['sha256'])
+
+    def _write_meta(self, artifact_id, download_name, content_path, sha256):
+        meta = {
+            'id': artifact_id,
+            'download_name': download_name,
+            'mimetype': mimetypes.guess_type(download_name)[0] or 'application/octet-stream',
+            'size': os.path.getsize(content_path),
+            'sha256': sha256,
+            'created': time.time(),
+        }
+        with open(os.path.join(self._dir(artifact_id), 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        self.purge_expired()
+        return dict(meta, path=content_path)
+
+    def load(self, artifact_id):
+        """Return metadata (with 'path') for an id, or None if it is unknown or expired"""
+        if not _ID_PATTERN.match(artifact_id or ''):
+            return None
+        directory = self._dir(artifact_id)
+        try:
+            with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.ttl and time.time() - meta['created'] > self.ttl:
+            return None
+        meta['path'] = os.path.join(directory, 'content')
+        return meta
+
+    @staticmethod
+    def is_text(meta):
+        mimetype = meta['mimetype']
+        return mimetype.startswith('text/') or mimetype in _TEXT_TYPES
+
+    @staticmethod
+    def supported_encodings():
+        return ('zstd', 'gzip') if zstandard is not None else ('gzip',)
+
+    def encoded(self, meta, encoding):
+        """Path of a compressed copy of the artifact, built on first use"""
+        suffix = {'gzip': 'gz', 'zstd': 'zst'}[encoding]
+        encoded_path = f"{meta['path']}.{suffix}"
+        if os.path.exists(encoded_path):
+            return encoded_path
+
+        # Build under a unique name so concurrent requests never see a partial file
+        partial = f"{encoded_path}.{uuid.uuid4().hex}.part"
+        with open(meta['path'], 'rb') as src:
+            if encoding == 'gzip':
+                # mtime=0 keeps the bytes (and therefore the ETag) stable
+                with open(partial, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+            else:
+                with open(partial, 'wb') as dst:
+                    zstandard.ZstdCompressor(level=10).copy_stream(src, dst)
+        os.replace(partial, encoded_path)
+        return encoded_path
+
+    def purge_expired(self, force=False):
+        """Delete expired artifacts; runs at most every few minutes unless forced"""
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_purge < _PURGE_INTERVAL:
+                return
+            self._last_purge = now
+        if not self.ttl:
+            return
+        for artifact_id in os.listdir(self.root):
+            directory = self._dir(artifact_id)
+            try:
+                if now - os.path.getmtime(directory) > self.ttl:
+                    shutil.rmtree(directory, ignore_errors=True)
+            except OSError:
+                pass
+
+
+def negotiate_encoding(accept_encoding, available):
+    """Pick the best content-coding from an Accept-Encoding header value"""
+    accepted = {}
+    for item in (accept_encoding or '').split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+    for encoding in available:
+        if accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+            return encoding
+    return None
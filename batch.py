@@ -0,0 +1,222 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import zipfile
+import posixpath
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.utils import secure_filename
+
+import metrics
+from converters import FileConverter
+from supervisor import Supervisor, ConversionKilled
+
+# Each pool process builds its own converter (and temp dir) once
+_converter = None
+_pool = None
+_pool_key = None
+
+
+def _init_worker(limits):
+    global _converter
+    # Members already run side by side, one per pool process
+    converter = FileConverter(workers=1)
+    # With limits, each member runs in a killable child of the pool process
+    _converter = Supervisor(converter, **limits) if limits else converter
+    # Drop samples inherited from the parent at fork time
+    metrics.REGISTRY.collect_delta()
+
+
+def get_pool(workers, limits=None):
+    """Return the shared batch pool, creating it on first use"""
+    global _pool, _pool_key
+    key = (workers, tuple(sorted((limits or {}).items())))
+    if _pool is None or _pool_key != key:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(limits,))
+        _pool_key = key
+    return _pool
+
+
+def _discard_pool(pool):
+    """Drop a broken pool so the next batch starts a fresh one"""
+    global _pool
+    if _pool is pool:
+        _pool = None
+        pool.shutdown(wait=False)
+
+
+def _pool_pids():
+    return list(getattr(_pool, '_processes', None) or {})
+
+metrics.watch_processes('batch', _pool_pids)
+
+
+def safe_archive_name(name):
+    """Sanitize a member path so it cannot escape the result archive"""
+    parts = [secure_filename(part) for part in name.replace('\\', '/').split('/')]
+    return '/'.join(part for part in parts if part)
+
+
+class BatchLimitError(ValueError):
+    pass
+
+
+def collect_inputs(uploads, work_dir, max_files, max_bytes):
+    """Save uploaded files (expanding ZIP archives) into work_dir.
+
+    Returns a list of (original_name, saved_path) tuples.
+    """
+    inputs = []
+    total_bytes = 0
+
+    def reserve(size):
+        nonlocal total_bytes
+        total_bytes += size
+        if len(inputs) >= max_files:
+            raise BatchLimitError(f"Batch exceeds {max_files} files")
+        if total_bytes > max_bytes:
+            raise BatchLimitError(f"Batch exceeds {max_bytes} uncompressed bytes")
+
+    for upload in uploads:
+        filename = secure_filename(upload.filename or '')
+        if not filename:
+            continue
+
+        if filename.lower().endswith('.zip'):
+            with zipfile.ZipFile(upload.stream) as archive:
+                for info in archive.infolist():
+                    if info.is_dir():
+                        continue
+                    member_name = safe_archive_name(info.filename)
+                    if not member_name:
+                        continue
+                    reserve(info.file_size)
+                    saved_path = os.path.join(work_dir, f"{uuid.uuid4().hex}_{posixpath.basename(member_name)}")
+                    with archive.open(info) as src, open(saved_path, 'wb') as dst:
+                        shutil.copyfileobj(src, dst)
+                    inputs.append((member_name, saved_path))
+        else:
+            saved_path = os.path.join(work_dir, f"{uuid.uuid4().hex}_{filename}")
+            upload.save(saved_path)
+            reserve(os.path.getsize(saved_path))
+            inputs.append((filename, saved_path))
+
+    return inputs
+
+
+def _entry(name, input_path):
+    return {
+        'name': name,
+        'output': None,
+        'status': 'ok',
+        'error': None,
+        'input_bytes': os.path.getsize(input_path),
+        'output_bytes': None,
+        'seconds': None,
+    }
+
+
+def convert_member(name, input_path, output_format, output_dir, options=None):
+    """Convert one batch member; never raises so one bad file can't fail the batch"""
+    entry = _entry(name, input_path)
+    started = time.perf_counter()
+    try:
+        output_path = _converter.convert(input_path, output_format, **(options or {}))
+        final_path = os.path.join(output_dir, os.path.basename(output_path))
+        shutil.move(output_path, final_path)
+        # A multi-sheet workbook can come back as a .zip of per-sheet files
+        entry['output'] = posixpath.splitext(name)[0] + os.path.splitext(output_path)[1]
+        entry['output_bytes'] = os.path.getsize(final_path)
+        entry['path'] = final_path
+    except ConversionKilled as e:
+        entry['status'] = e.kind
+        entry['error'] = str(e)
+    except Exception as e:
+        entry['status'] = 'error'
+        entry['error'] = str(e)
+    entry['seconds'] = round(time.perf_counter() - started, 4)
+    # Ship this process's samples back so the web worker's /metrics sees them
+    entry['metrics'] = metrics.REGISTRY.collect_delta()
+    return entry
+
+
+def _unique_name(name, used_names):
+    base, ext = posixpath.splitext(name)
+    candidate = name
+    counter = 1
+    while candidate in used_names or candidate == 'manifest.json':
+        candidate = f"{base}_{counter}{ext}"
+        counter += 1
+    used_names.add(candidate)
+    return candidate
+
+
+class _StreamBuffer:
+    """Write-only sink that lets ZipFile produce an archive incrementally"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_results(inputs, output_format, work_dir, workers, limits=None, options=None):
+    """Fan inputs out over the pool and yield a ZIP archive as results complete"""
+    pool = get_pool(workers, limits)
+    started = time.perf_counter()
+    futures = {}
+    for name, path in inputs:
+        metrics.QUEUE_DEPTH.inc(queue='batch')
+        future = pool.submit(convert_member, name, path, output_format, work_dir, options)
+        future.add_done_callback(lambda f: metrics.QUEUE_DEPTH.dec(queue='batch'))
+        futures[future] = (name, path)
+
+    manifest = {'format': output_format, 'files': []}
+    used_names = set()
+    buffer = _StreamBuffer()
+    try:
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for future in as_completed(futures):
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    # The member never reached convert_member's own handling:
+                    # a worker died, or its arguments or result didn't pickle
+                    if isinstance(e, BrokenProcessPool):
+                        _discard_pool(pool)
+                    entry = _entry(*futures[future])
+                    entry['status'] = 'error'
+                    entry['error'] = f"{type(e).__name__}: {e}"
+                metrics.REGISTRY.merge(entry.pop('metrics', None))
+                output_path = entry.pop('path', None)
+                if output_path:
+                    entry['output'] = _unique_name(entry['output'], used_names)
+                    archive.write(output_path, entry['output'])
+                    os.remove(output_path)
+                manifest['files'].append(entry)
+                yield buffer.drain()
+
+            manifest['files'].sort(key=lambda item: item['name'])
+            manifest['total'] = len(manifest['files'])
+            manifest['failed'] = sum(1 for item in manifest['files'] if item['status'] != 'ok')
+            manifest['seconds'] = round(time.perf_counter() - started, 4)
+            archive.writestr('manifest.json', json.dumps(manifest, indent=2))
+        yield buffer.drain()
+    finally:
+        for future in futures:
+            future.cancel()
+        shutil.rmtree(work_dir, ignore_errors=True)
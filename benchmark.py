@@ -0,0 +1,535 @@
+"""Reproducible conversion benchmarks.
+
+Generate a deterministic fixture corpus, time every supported conversion pair
+and compare against a saved baseline:
+
+    python benchmark.py fixtures --scale medium
+    python benchmark.py run --output baseline.json
+    # ... change converters.py ...
+    python benchmark.py run --output current.json --compare baseline.json
+    python benchmark.py micro docx --repeat 5
+
+Each measurement runs in a fresh process so peak RSS belongs to that
+conversion alone. ``--compare`` exits non-zero when a pair got slower or
+bigger than the baseline by more than ``--threshold``.
+"""
+import os
+import io
+import sys
+import csv
+import json
+import time
+import random
+import shutil
+import tempfile
+import argparse
+import platform
+import datetime
+import statistics
+import subprocess
+import multiprocessing
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+from converters import FileConverter, CONVERSIONS
+
+FIXTURES_DIR = 'bench_fixtures'
+SEED = 1234
+FIXED_DATE = datetime.datetime(2024, 1, 1)
+
+SCALES = {
+    'small': {'pages': 5, 'rows': 1000, 'paragraphs': 100, 'images': 2, 'slides': 10, 'lines': 5000},
+    'medium': {'pages': 50, 'rows': 50000, 'paragraphs': 2000, 'images': 10, 'slides': 100, 'lines': 200000},
+    'large': {'pages': 300, 'rows': 500000, 'paragraphs': 20000, 'images': 40, 'slides': 300, 'lines': 2000000},
+}
+
+WORDS = ('alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima mike '
+         'november oscar papa quebec romeo sierra tango uniform victor whiskey xray yankee zulu').split()
+
+
+# Fixture generation
+
+def _sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _records(rng, rows):
+    cities = ['Lahore', 'Karachi', 'Berlin', 'Austin', 'Osaka', 'Lima', 'Oslo', 'Accra']
+    for i in range(rows):
+        yield {
+            'id': i + 1,
+            'name': f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}",
+            'city': rng.choice(cities),
+            'amount': round(rng.uniform(1, 10000), 2),
+            'quantity': rng.randint(1, 500),
+            'date': f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'note': _sentence(rng, 6),
+        }
+
+
+def _image(rng, width=800, height=600):
+    from PIL import Image, ImageDraw
+    img = Image.new('RGB', (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):
+        x0, y0 = rng.randint(0, width - 1), rng.randint(0, height - 1)
+        x1, y1 = min(width, x0 + rng.randint(10, 200)), min(height, y0 + rng.randint(10, 200))
+        draw.rectangle([x0, y0, x1, y1], fill=tuple(rng.randint(0, 255) for _ in range(3)))
+    return img
+
+
+def make_pdf(path, rng, pages):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, PageBreak
+    from reportlab.lib import colors
+
+    styles = getSampleStyleSheet()
+    elements = []
+    for page in range(pages):
+        elements.append(Paragraph(f"Section {page + 1}", styles['Heading1']))
+        for _ in range(3):
+            elements.append(Paragraph(_sentence(rng, 40), styles['Normal']))
+        data = [['ID', 'Name', 'City', 'Amount']]
+        for record in _records(rng, 12):
+            data.append([record['id'], record['name'], record['city'], record['amount']])
+        table = Table(data)
+        table.setStyle(TableStyle([('GRID', (0, 0), (-1, -1), 0.5, colors.black)]))
+        elements.append(table)
+        elements.append(PageBreak())
+    # invariant=1 keeps timestamps and ids out so the bytes are reproducible
+    SimpleDocTemplate(path, pagesize=letter, invariant=1).build(elements)
+
+
+def make_docx(path, rng, paragraphs, images):
+    import docx
+
+    document = docx.Document()
+    document.core_properties.created = FIXED_DATE
+    document.core_properties.modified = FIXED_DATE
+    image_every = max(1, paragraphs // max(1, images))
+    for i in range(paragraphs):
+        if i % 50 == 0:
+            document.add_heading(f"Chapter {i // 50 + 1}", level=1)
+        document.add_paragraph(_sentence(rng, 30))
+        if images and i % image_every == 0 and i // image_every < images:
+            buffer = io.BytesIO()
+            _image(rng, 400, 300).save(buffer, 'PNG')
+            buffer.seek(0)
+            document.add_picture(buffer, width=docx.shared.Inches(4))
+    table = document.add_table(rows=1, cols=4)
+    for cell, title in zip(table.rows[0].cells, ['ID', 'Name', 'City', 'Amount']):
+        cell.text = title
+    for record in _records(rng, min(200, paragraphs)):
+        cells = table.add_row().cells
+        for cell, key in zip(cells, ['id', 'name', 'city', 'amount']):
+            cell.text = str(record[key])
+    document.save(path)
+
+
+def make_scan(path, rng, lines=40):
+    """Grey, slightly noisy page of text, similar to a scanned document"""
+    from PIL import Image, ImageDraw, ImageFilter
+    img = Image.new('L', (1700, 2200), 245)
+    draw = ImageDraw.Draw(img)
+    for i in range(lines):
+        draw.text((100, 100 + i * 48), _sentence(rng, 10), fill=20)
+    # Seeded speckle mask (Image.effect_noise isn't reproducible)
+    noise = Image.frombytes('L', img.size, rng.randbytes(img.size[0] * img.size[1]))
+    noise = noise.point(lambda v: 0 if v < 8 else 255)
+    img = Image.composite(img, Image.new('L', img.size, 200), noise).filter(ImageFilter.GaussianBlur(0.6))
+    img.save(path, 'PNG')
+
+
+def make_csv(path, rng, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = None
+        for record in _records(rng, rows):
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(record))
+                writer.writeheader()
+            writer.writerow(record)
+
+
+def make_html(path, rng, paragraphs):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<!DOCTYPE html><html><head><meta charset="utf-8"><title>Export</title>'
+                '<style>body{font-family:sans-serif}</style><script>var x = 1;</script></head><body>')
+        for i in range(paragraphs):
+            if i % 50 == 0:
+                f.write(f'<div class="section"><h2>Section {i // 50 + 1}</h2>')
+            f.write(f'<div class="item"><div class="body"><p>{_sentence(rng, 25)}</p></div></div>')
+            if i % 50 == 49 or i == paragraphs - 1:
+                f.write('</div>')
+        f.write('<table><tr><th>ID</th><th>Name</th><th>City</th></tr>')
+        for record in _records(rng, min(500, paragraphs)):
+            f.write(f"<tr><td>{record['id']}</td><td>{record['name']}</td><td>{record['city']}</td></tr>")
+        f.write('</table></body></html>')
+
+
+def make_pptx(path, rng, slides):
+    from pptx import Presentation
+    prs = Presentation()
+    for i in range(slides):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = f"Slide {i + 1}"
+        slide.placeholders[1].text = '\n'.join(_sentence(rng, 8) for _ in range(5))
+        slide.notes_slide.notes_text_frame.text = _sentence(rng, 15)
+    prs.core_properties.created = FIXED_DATE
+    prs.core_properties.modified = FIXED_DATE
+    prs.save(path)
+
+
+def make_txt(path, rng, lines):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(lines):
+            f.write(_sentence(rng, rng.randint(4, 16)) + '\n')
+            if i % 20 == 19:
+                f.write('\n')
+
+
+def generate_fixtures(directory, scale):
+    import pandas as pd
+
+    sizes = SCALES[scale]
+    os.makedirs(directory, exist_ok=True)
+
+    def rng(name):
+        # One seeded generator per fixture so adding a fixture doesn't shift the others
+        return random.Random(f"{SEED}-{name}")
+
+    records = list(_records(rng('table'), min(sizes['rows'], 100000)))
+    df = pd.DataFrame(records)
+
+    builders = {
+        'document.pdf': lambda p: make_pdf(p, rng('pdf'), sizes['pages']),
+        'document.docx': lambda p: make_docx(p, rng('docx'), sizes['paragraphs'], sizes['images']),
+        'export.html': lambda p: make_html(p, rng('html'), sizes['paragraphs']),
+        'table.csv': lambda p: make_csv(p, rng('table'), sizes['rows']),
+        'table.xlsx': lambda p: df.to_excel(p, index=False),
+        'table.json': lambda p: df.to_json(p, orient='records', indent=2),
+        'table.xml': lambda p: df.to_xml(p, index=False, root_name='Root', row_name='Row', parser='etree'),
+        'table.parquet': lambda p: df.to_parquet(p, index=False),
+        'table.feather': lambda p: df.to_feather(p),
+        'scan.png': lambda p: make_scan(p, rng('scan')),
+        'photo.jpg': lambda p: _image(rng('photo'), 2000, 1500).save(p, 'JPEG', quality=90),
+        'slides.pptx': lambda p: make_pptx(p, rng('pptx'), sizes['slides']),
+        'log.txt': lambda p: make_txt(p, rng('txt'), sizes['lines']),
+    }
+    if pyarrow is None:
+        print("pyarrow is not installed; skipping table.parquet and table.feather")
+        del builders['table.parquet'], builders['table.feather']
+    for name, build in builders.items():
+        path = os.path.join(directory, name)
+        started = time.perf_counter()
+        build(path)
+        print(f"{name:15} {os.path.getsize(path):>12,} bytes  {time.perf_counter() - started:.1f}s")
+
+    with open(os.path.join(directory, 'fixtures.json'), 'w', encoding='utf-8') as f:
+        json.dump({'scale': scale, 'seed': SEED, 'sizes': sizes}, f, indent=2)
+
+
+# Measurement
+
+def _measure_child(input_path, output_format, conn):
+    converter = FileConverter()
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    try:
+        output_path = converter.convert(input_path, output_format)
+        result = {'status': 'ok', 'output_bytes': os.path.getsize(output_path)}
+    except Exception as e:
+        result = {'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+    result['wall'] = time.perf_counter() - started
+    result['cpu'] = time.process_time() - cpu_started
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        result['peak_rss'] = peak if sys.platform == 'darwin' else peak * 1024
+    conn.send(result)
+    conn.close()
+    shutil.rmtree(converter.temp_dir, ignore_errors=True)
+
+
+def measure(input_path, output_format, timeout):
+    """Run one conversion in a fresh interpreter and report its cost"""
+    context = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(target=_measure_child, args=(input_path, output_format, child_conn))
+    process.start()
+    child_conn.close()
+    if parent_conn.poll(timeout):
+        result = parent_conn.recv()
+    else:
+        process.kill()
+        result = {'status': 'timeout', 'wall': timeout}
+    process.join()
+    return result
+
+
+def run_benchmarks(args):
+    fixtures = sorted(
+        name for name in os.listdir(args.fixtures)
+        if os.path.splitext(name)[1].lower() in CONVERSIONS
+    )
+    if not fixtures:
+        raise SystemExit(f"No fixtures in {args.fixtures}; run 'python benchmark.py fixtures' first")
+    wanted = set(args.pairs.split(',')) if args.pairs else None
+
+    results = {}
+    for name in fixtures:
+        input_ext = os.path.splitext(name)[1].lower()
+        for output_format in CONVERSIONS[input_ext]:
+            pair = f"{input_ext[1:]}->{output_format}"
+            if wanted and pair not in wanted:
+                continue
+            runs = [measure(os.path.join(args.fixtures, name), output_format, args.timeout)
+                    for _ in range(args.repeat)]
+            ok = [run for run in runs if run['status'] == 'ok']
+            summary = {'fixture': name, 'status': 'ok' if len(ok) == len(runs) else runs[-1]['status'],
+                       'runs': runs}
+            if ok:
+                summary['wall'] = statistics.median(run['wall'] for run in ok)
+                summary['cpu'] = statistics.median(run['cpu'] for run in ok)
+                if all('peak_rss' in run for run in ok):
+                    summary['peak_rss'] = max(run['peak_rss'] for run in ok)
+            else:
+                summary['error'] = runs[-1].get('error')
+            results[pair] = summary
+            print(_format_row(pair, summary), flush=True)
+
+    report = {'meta': _meta(args), 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {len(results)} pairs to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        return compare(baseline, report, args.threshold, args.min_delta)
+    return 0
+
+
+def _format_row(pair, summary):
+    if summary['status'] != 'ok':
+        return f"{pair:18} {summary['status'].upper():>10}  {summary.get('error') or ''}"
+    rss = summary.get('peak_rss')
+    rss_text = f"{rss / 1024 / 1024:8.1f} MB" if rss else ''
+    return f"{pair:18} {summary['wall']:9.3f}s wall {summary['cpu']:9.3f}s cpu {rss_text}"
+
+
+def _meta(args):
+    meta = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeat': args.repeat,
+    }
+    fixtures_info = os.path.join(args.fixtures, 'fixtures.json')
+    if os.path.exists(fixtures_info):
+        with open(fixtures_info, 'r', encoding='utf-8') as f:
+            meta['fixtures'] = json.load(f)
+    try:
+        meta['commit'] = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                                 stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        pass
+    return meta
+
+
+def compare(baseline, current, threshold, min_delta):
+    """Print a per-pair diff and return 1 if anything regressed past the threshold"""
+    regressions = []
+    for pair, now in sorted(current['results'].items()):
+        before = baseline.get('results', {}).get(pair)
+        if not before or before.get('status') != 'ok':
+            continue
+        if now.get('status') != 'ok':
+            regressions.append(f"{pair}: now {now.get('status')} ({now.get('error')})")
+            continue
+        for key, floor in (('wall', min_delta), ('cpu', min_delta), ('peak_rss', 5 * 1024 * 1024)):
+            if key not in before or key not in now:
+                continue
+            change = (now[key] - before[key]) / before[key] if before[key] else 0.0
+            if change > threshold and now[key] - before[key] > floor:
+                regressions.append(f"{pair}: {key} {before[key]:.3f} -> {now[key]:.3f} (+{change:.0%})")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) past {threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions past {threshold:.0%}")
+    return 0
+
+
+def run_compare(args):
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, 'r', encoding='utf-8') as f:
+        current = json.load(f)
+    return compare(baseline, current, args.threshold, args.min_delta)
+
+
+# Micro-benchmarks: alternative implementations of one step, timed in-process
+
+def _python_docx_text(path):
+    import docx
+    document = docx.Document(path)
+    parts = [' '.join(para.text.split()) for para in document.paragraphs if para.text.strip()]
+    for table in document.tables:
+        for row in table.rows:
+            parts.append('\t'.join(' '.join(cell.text.split()) for cell in row.cells))
+    return '\n'.join(parts)
+
+
+def micro_docx(path):
+    converter = FileConverter()
+    return {
+        'python-docx': lambda: _python_docx_text(path),
+        'docx_reader': lambda: converter._extract_docx_text(path),
+    }
+
+
+def _python_pptx_text(path):
+    from pptx import Presentation
+    return '\n'.join(shape.text for slide in Presentation(path).slides
+                     for shape in slide.shapes if hasattr(shape, 'text'))
+
+
+def micro_pptx(path):
+    import pptx_reader
+    return {
+        'python-pptx': lambda: _python_pptx_text(path),
+        'pptx_reader': lambda: pptx_reader.extract_text(path),
+        'pptx_reader x4': lambda: pptx_reader.extract_text(path, workers=4),
+    }
+
+
+def _soup_text(path):
+    from bs4 import BeautifulSoup
+    with open(path, 'r', encoding='utf-8') as f:
+        soup = BeautifulSoup(f.read(), 'html.parser')
+    for script in soup(['script', 'style']):
+        script.decompose()
+    return soup.get_text()
+
+
+def _soup_blocks(path):
+    from bs4 import BeautifulSoup
+    with open(path, 'r', encoding='utf-8') as f:
+        soup = BeautifulSoup(f.read(), 'html.parser')
+    return [element.get_text().strip() for element in soup.find_all(['p', 'h1', 'h2', 'h3', 'div'])]
+
+
+def micro_html(path):
+    import html_reader
+    return {
+        'bs4 get_text': lambda: _soup_text(path),
+        'bs4 find_all': lambda: _soup_blocks(path),
+        'html_reader': lambda: list(html_reader.iter_blocks(path)),
+    }
+
+
+def micro_pdf2docx(path):
+    import pdf_docx
+    output = os.path.join(tempfile.mkdtemp(), 'document.docx')
+    return {
+        'pdf2docx': lambda: pdf_docx.convert(path, output),
+        'pdf2docx x4': lambda: pdf_docx.convert(path, output, workers=4),
+    }
+
+
+# name -> (default fixture, factory returning {label: callable}); the first label is the baseline
+MICRO_BENCHMARKS = {
+    'docx': ('document.docx', micro_docx),
+    'pptx': ('slides.pptx', micro_pptx),
+    'html': ('export.html', micro_html),
+    'pdf2docx': ('document.pdf', micro_pdf2docx),
+}
+
+
+def run_micro(args):
+    default_fixture, factory = MICRO_BENCHMARKS[args.name]
+    path = args.file or os.path.join(args.fixtures, default_fixture)
+    if not os.path.exists(path):
+        raise SystemExit(f"{path} not found; run 'python benchmark.py fixtures' or pass --file")
+
+    results = {}
+    baseline = None
+    for label, func in factory(path).items():
+        func()  # warm up imports and caches
+        runs = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            func()
+            runs.append(time.perf_counter() - started)
+        seconds = statistics.median(runs)
+        baseline = baseline or seconds
+        results[label] = {'wall': seconds, 'runs': runs}
+        print(f"{label:18} {seconds:9.4f}s  {baseline / seconds:6.2f}x", flush=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'meta': _meta(args), 'benchmark': args.name, 'file': path, 'results': results}, f, indent=2)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='benchmark.py', description='Conversion benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    fixtures = commands.add_parser('fixtures', help='Generate the deterministic fixture corpus')
+    fixtures.add_argument('--out', default=FIXTURES_DIR, help=f'Output directory (default: {FIXTURES_DIR})')
+    fixtures.add_argument('--scale', choices=sorted(SCALES), default='small')
+    fixtures.set_defaults(func=lambda args: generate_fixtures(args.out, args.scale) or 0)
+
+    def add_compare_options(command):
+        command.add_argument('--threshold', type=float, default=0.2,
+                             help='Relative slowdown that counts as a regression (default: 0.2)')
+        command.add_argument('--min-delta', type=float, default=0.05,
+                             help='Ignore time changes smaller than this many seconds (default: 0.05)')
+
+    run = commands.add_parser('run', help='Time every supported conversion pair')
+    run.add_argument('--fixtures', default=FIXTURES_DIR)
+    run.add_argument('--pairs', help='Comma-separated pairs to run, e.g. pdf->docx,csv->xlsx')
+    run.add_argument('--repeat', type=int, default=3)
+    run.add_argument('--timeout', type=float, default=600.0, help='Seconds before a run is killed')
+    run.add_argument('--output', help='Write results to this JSON file')
+    run.add_argument('--compare', help='Baseline JSON to compare against')
+    add_compare_options(run)
+    run.set_defaults(func=run_benchmarks)
+
+    diff = commands.add_parser('compare', help='Compare two saved result files')
+    diff.add_argument('baseline')
+    diff.add_argument('current')
+    add_compare_options(diff)
+    diff.set_defaults(func=run_compare)
+
+    micro = commands.add_parser('micro', help='Compare implementations of a single step in-process')
+    micro.add_argument('name', choices=sorted(MICRO_BENCHMARKS))
+    micro.add_argument('--fixtures', default=FIXTURES_DIR)
+    micro.add_argument('--file', help='Input file (default: the matching fixture)')
+    micro.add_argument('--repeat', type=int, default=5)
+    micro.add_argument('--output', help='Write results to this JSON file')
+    micro.set_defaults(func=run_micro)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
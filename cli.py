@@ -0,0 +1,219 @@
+"""Headless command-line entry point for FileConverter.
+
+Convert a whole directory tree:
+
+    python cli.py convert ./incoming ./converted --to pdf --jobs 8
+
+Every finished file is appended to a JSON-lines manifest in the output
+directory, so re-running the same command after a crash skips the files that
+were already converted.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from converters import FileConverter, INPUT_FORMATS
+
+MANIFEST_NAME = '.convert-manifest.jsonl'
+
+_converter = None
+
+
+def _init_worker():
+    global _converter
+    # Files already convert side by side, one per pool process
+    _converter = FileConverter(workers=1)
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_path):
+    """Return the last recorded entry for every source in the manifest"""
+    entries = {}
+    if not os.path.exists(manifest_path):
+        return entries
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A crash can leave a truncated last line behind
+                continue
+            entries[entry['source']] = entry
+    return entries
+
+
+def find_inputs(source_dir, extensions):
+    for dirpath, dirnames, filenames in os.walk(source_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1].lower() in extensions:
+                yield os.path.join(dirpath, filename)
+
+
+def is_up_to_date(source, output, previous, check):
+    """Cheap parent-side check; hash checks are left to the worker"""
+    if not os.path.exists(output):
+        return False
+    stat = os.stat(source)
+    if previous and previous.get('status') in ('ok', 'skipped'):
+        if previous.get('size') == stat.st_size and previous.get('mtime_ns') == stat.st_mtime_ns:
+            return True
+    return check == 'mtime' and os.path.getmtime(output) >= stat.st_mtime
+
+
+def convert_one(source, output, output_format, hash_source, known_hash):
+    """Convert a single file inside a pool process"""
+    stat = os.stat(source)
+    entry = {
+        'source': source,
+        'output': output,
+        'format': output_format,
+        'status': 'ok',
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': None,
+        'seconds': None,
+        'error': None,
+    }
+    started = time.perf_counter()
+    try:
+        if hash_source:
+            entry['sha256'] = file_sha256(source)
+            if known_hash and entry['sha256'] == known_hash and os.path.exists(output):
+                entry['status'] = 'skipped'
+                return entry
+
+        temp_output = _converter.convert(source, output_format)
+        # A multi-sheet workbook can come back as a .zip of per-sheet files
+        output = os.path.splitext(output)[0] + os.path.splitext(temp_output)[1]
+        entry['output'] = output
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        # Move next to the destination first so the final rename is atomic
+        partial = os.path.join(os.path.dirname(output), f".{os.path.basename(output)}.part")
+        shutil.move(temp_output, partial)
+        os.replace(partial, output)
+    except Exception as e:
+        entry['status'] = 'error'
+        entry['error'] = str(e)
+    finally:
+        entry['seconds'] = round(time.perf_counter() - started, 4)
+    return entry
+
+
+def run_convert(args):
+    source_dir = os.path.abspath(args.source)
+    output_dir = os.path.abspath(args.output)
+    output_format = args.to.lower()
+    extensions = INPUT_FORMATS
+    if args.only:
+        extensions = tuple('.' + ext.strip().lower().lstrip('.') for ext in args.only.split(','))
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = args.manifest or os.path.join(output_dir, MANIFEST_NAME)
+    previous = {} if args.force else load_manifest(manifest_path)
+
+    counts = {'ok': 0, 'skipped': 0, 'error': 0}
+    max_pending = args.jobs * 4
+
+    with open(manifest_path, 'a', encoding='utf-8') as manifest, \
+            ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker) as pool:
+
+        def record(entry):
+            counts[entry['status']] += 1
+            manifest.write(json.dumps(entry) + '\n')
+            manifest.flush()
+            if entry['status'] == 'error':
+                print(f"FAILED {entry['source']}: {entry['error']}", file=sys.stderr)
+            elif args.verbose:
+                print(f"{entry['status']:7} {entry['source']} ({entry['seconds']}s)")
+
+        pending = set()
+        for source in find_inputs(source_dir, extensions):
+            relative = os.path.relpath(source, source_dir)
+            output = os.path.join(output_dir, f"{os.path.splitext(relative)[0]}.{output_format}")
+            last = previous.get(source)
+            if (last and last.get('format') == output_format and last.get('output')
+                    and os.path.splitext(last['output'])[0] == os.path.splitext(output)[0]):
+                output = last['output']  # may be a .zip for a multi-sheet workbook
+
+            if not args.force and is_up_to_date(source, output, last, args.check):
+                counts['skipped'] += 1
+                continue
+
+            known_hash = None
+            if not args.force and last and last.get('status') in ('ok', 'skipped'):
+                known_hash = last.get('sha256')
+            pending.add(pool.submit(convert_one, source, output, output_format,
+                                    args.check == 'hash', known_hash))
+
+            # Keep the queue bounded so 100k-file trees don't pile up futures
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(future.result())
+
+        for future in wait(pending).done:
+            record(future.result())
+
+    print(f"Converted {counts['ok']}, skipped {counts['skipped']}, failed {counts['error']}")
+    return 1 if counts['error'] else 0
+
+
+def run_watch(args):
+    import watcher
+    return watcher.run_watch(args)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description='Universal File Converter (headless)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    convert = commands.add_parser('convert', help='Convert every supported file in a directory tree')
+    convert.add_argument('source', help='Input directory')
+    convert.add_argument('output', help='Output directory (mirrors the input tree)')
+    convert.add_argument('--to', required=True, help='Target format, e.g. pdf, docx, csv')
+    convert.add_argument('--only', help='Comma-separated input extensions to include')
+    convert.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                         help='Number of worker processes (default: CPU count)')
+    convert.add_argument('--check', choices=['mtime', 'hash'], default='mtime',
+                         help='How to decide an output is up to date (default: mtime)')
+    convert.add_argument('--manifest', help=f'Manifest path (default: <output>/{MANIFEST_NAME})')
+    convert.add_argument('--force', action='store_true', help='Ignore the manifest and reconvert everything')
+    convert.add_argument('--verbose', '-v', action='store_true', help='Print every converted file')
+    convert.set_defaults(func=run_convert)
+
+    watch = commands.add_parser('watch', help='Convert files as they are dropped into a directory')
+    watch.add_argument('input', nargs='?', help='Directory to watch')
+    watch.add_argument('output', nargs='?', help='Directory that receives converted files')
+    watch.add_argument('--to', help='Target format, e.g. pdf, docx, csv')
+    watch.add_argument('--pattern', default='*', help='Glob of input files to convert (default: *)')
+    watch.add_argument('--config', help='JSON file with a list of rules (input, pattern, format, output, workers)')
+    watch.add_argument('--jobs', '-j', type=int, default=1, help='Worker processes for the rule (default: 1)')
+    watch.add_argument('--settle', type=float, default=2.0,
+                       help='Seconds a file must stop changing before it is converted (default: 2)')
+    watch.add_argument('--poll-interval', type=float, default=1.0, help='Polling/event interval in seconds')
+    watch.add_argument('--poll', action='store_true', help='Force polling even when inotify is available')
+    watch.set_defaults(func=run_watch)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
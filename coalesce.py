@@ -0,0 +1,176 @@
+"""Single-flight execution of identical work.
+
+Callers passing the same key while a call is running attach to it and get
+its result (or its exception) instead of starting their own. Within a process
+this uses an in-memory table. Across gunicorn workers a flock on
+``<lock_dir>/<key>.lock`` elects one leader. Workers that had to wait for the
+lock pick up the leader's pickled outcome from ``<key>.result``.
+"""
+import os
+import time
+import pickle
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+import metrics
+
+_PURGE_INTERVAL = 300
+_RESULT_TTL = 3600
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.outcome = None
+
+
+class SingleFlight:
+    def __init__(self, lock_dir):
+        self.lock_dir = lock_dir
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        os.makedirs(lock_dir, exist_ok=True)
+
+    def run(self, key, func, share_error=None):
+        """Call func() once per key at a time; returns (value, coalesced).
+
+        share_error(exc) decides whether a failure is handed to the callers
+        that attached to the flight; when it returns False they retry instead.
+        """
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+
+            if leader:
+                try:
+                    flight.outcome = self._lead(key, func, share_error)
+                finally:
+                    with self._lock:
+                        del self._flights[key]
+                    flight.done.set()
+                outcome = flight.outcome
+                coalesced = outcome.get('scope') is not None
+            else:
+                flight.done.wait()
+                outcome = flight.outcome
+                if outcome is None or not outcome['shared']:
+                    continue
+                metrics.COALESCED.inc(scope='thread')
+                coalesced = True
+
+            if 'error' in outcome:
+                raise outcome['error']
+            return outcome['value'], coalesced
+
+    def _call(self, func, share_error):
+        try:
+            return {'value': func(), 'shared': True}
+        except Exception as e:
+            return {'error': e, 'shared': share_error is None or bool(share_error(e))}
+
+    def _lead(self, key, func, share_error):
+        if fcntl is None:
+            return self._call(func, share_error)
+
+        self._purge()
+        started = time.time()
+        lock_path = os.path.join(self.lock_dir, f"{key}.lock")
+        while True:
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    waited = False
+                except BlockingIOError:
+                    # Another worker is running the same job; wait for it to finish
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                    waited = True
+                if not _is_linked(fd, lock_path):
+                    continue  # purged while we opened it; lock the file that is there now
+                if waited:
+                    outcome = self._read_result(key, started)
+                    if outcome is not None and outcome['shared']:
+                        metrics.COALESCED.inc(scope='process')
+                        outcome['scope'] = 'process'
+                        return outcome
+
+                outcome = self._call(func, share_error)
+                self._write_result(key, outcome)
+                return outcome
+            finally:
+                os.close(fd)
+
+    def _result_path(self, key):
+        return os.path.join(self.lock_dir, f"{key}.result")
+
+    def _read_result(self, key, started):
+        """The outcome of the flight we waited on, ignoring older ones"""
+        try:
+            with open(self._result_path(key), 'rb') as f:
+                outcome = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            return None
+        return outcome if outcome['finished'] >= started else None
+
+    def _write_result(self, key, outcome):
+        record = dict(outcome, finished=time.time())
+        try:
+            data = pickle.dumps(record)
+        except Exception:
+            # Keep the message of exceptions that can't be pickled
+            record['error'] = Exception(str(record['error']))
+            data = pickle.dumps(record)
+        partial = f"{self._result_path(key)}.{os.getpid()}.{threading.get_ident()}"
+        with open(partial, 'wb') as f:
+            f.write(data)
+        os.replace(partial, self._result_path(key))
+
+    def _purge(self):
+        now = time.time()
+        with self._lock:
+            if now - self._last_purge < _PURGE_INTERVAL:
+                return
+            self._last_purge = now
+        for name in os.listdir(self.lock_dir):
+            if name.endswith('.result'):
+                path = os.path.join(self.lock_dir, name)
+                try:
+                    if now - os.path.getmtime(path) > _RESULT_TTL:
+                        os.remove(path)
+                        _remove_lock(f"{path[:-len('.result')]}.lock")
+                except OSError:
+                    pass
+
+
+def _is_linked(fd, path):
+    """Whether fd is still the file at path"""
+    try:
+        return os.path.samestat(os.fstat(fd), os.stat(path))
+    except OSError:
+        return False
+
+
+def _remove_lock(path):
+    """Unlink a lock file unless a flight holds it.
+
+    A worker that opened it before the unlink notices once it gets the lock
+    (see _is_linked) and locks the new file instead.
+    """
+    fd = os.open(path, os.O_RDWR)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return
+        if _is_linked(fd, path):
+            os.remove(path)
+    finally:
+        os.close(fd)
@@ -1,5 +1,7 @@
 import fitz  # PyMuPDF
 import docx
+import io
+import csv
 import pandas as pd
 import json
 import xml.etree.ElementTree as ET
@@ -11,7 +13,27 @@ from pathlib import Path
 import tempfile
 import shutil
 import re
-from bs4 import BeautifulSoup
+import time
+import uuid
+import zipfile
+import threading
+import functools
+from contextlib import contextmanager
+from html import escape as html_escape
+
+import docx_reader
+import html_reader
+import pptx_reader
+import text_reader
+import text_writers
+import table_schema
+import workbook
+import page_ranges
+import pdf_docx
+import pdf_optimize
+import table_html
+import metrics
+import profiling
 
 # Professional conversion libraries
 try:
@@ -28,6 +50,11 @@ try:
 except ImportError:
     HTML = CSS = None
 
+try:
+    from weasyprint.text.fonts import FontConfiguration
+except ImportError:
+    FontConfiguration = None
+
 try:
     import pdfplumber
 except ImportError:
@@ -44,23 +71,212 @@ except ImportError:
     camelot = None
 
 try:
-    import tabula
+    import pyarrow
+    from pyarrow import feather
 except ImportError:
-    tabula = None
+    pyarrow = feather = None
 
 try:
-    import pikepdf
+    import tabula
 except ImportError:
-    pikepdf = None
+    tabula = None
 
 try:
     import pytesseract
 except ImportError:
     pytesseract = None
 
+# Per-thread record of the handlers that served the current conversion, and of the reports they left
+_conversion = threading.local()
+
+def _handler(method):
+    """Record top-level handler calls so metrics can tell which path ran"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        depth = getattr(_conversion, 'depth', 0)
+        if depth == 0 and hasattr(_conversion, 'handlers'):
+            _conversion.handlers.append(method.__name__)
+        _conversion.depth = depth + 1
+        try:
+            with profiling.span(method.__name__):
+                return method(self, *args, **kwargs)
+        finally:
+            _conversion.depth = depth
+    return wrapper
+
+def _fallback(method):
+    """Count every time a fallback conversion path fires"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        metrics.FALLBACKS.inc(fallback=method.__name__)
+        with profiling.span(method.__name__, fallback=True):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+# Output formats FileConverter.convert supports for each input extension
+_TEXT_OUTPUTS = ('txt', 'docx', 'html', 'csv', 'xlsx', 'json', 'xml', 'pptx')
+_TABLE_OUTPUTS = ('csv', 'xlsx', 'json', 'xml', 'parquet', 'feather', 'pdf', 'pptx', 'txt', 'docx', 'html')
+CONVERSIONS = {
+    '.pdf': ('docx', 'html', 'txt', 'xlsx', 'csv', 'jpg', 'jpeg', 'png', 'pdfa'),
+    '.docx': _TEXT_OUTPUTS + ('pdf',),
+    '.html': _TEXT_OUTPUTS + ('pdf',),
+    '.xlsx': _TABLE_OUTPUTS,
+    '.csv': _TABLE_OUTPUTS,
+    '.jpg': ('pdf', 'docx', 'png', 'jpg', 'jpeg', 'txt', 'html'),
+    '.jpeg': ('pdf', 'docx', 'png', 'jpg', 'jpeg', 'txt', 'html'),
+    '.png': ('pdf', 'docx', 'png', 'jpg', 'jpeg', 'txt', 'html'),
+    '.pptx': _TEXT_OUTPUTS + ('pdf',),
+    '.txt': _TEXT_OUTPUTS + ('pdf',),
+    '.json': _TABLE_OUTPUTS,
+    '.xml': _TABLE_OUTPUTS,
+    '.parquet': _TABLE_OUTPUTS,
+    '.feather': _TABLE_OUTPUTS,
+}
+
+# Input extensions handled by FileConverter.convert
+INPUT_FORMATS = tuple(CONVERSIONS)
+
+# Several XLSX sheets converted to these come back as a .zip with one file per sheet
+ZIPPED_OUTPUTS = ('csv', 'json', 'xml', 'parquet', 'feather')
+
+# Pairs FileConverter.convert_stream runs on in-memory buffers
+_IMAGE_OUTPUTS = ('png', 'jpg', 'jpeg')
+_DATA_OUTPUTS = ('csv', 'xlsx', 'json', 'xml', 'parquet', 'feather')
+MEMORY_CONVERSIONS = {
+    '.pdf': ('txt',) + _IMAGE_OUTPUTS,
+    '.docx': ('txt',),
+    '.html': ('txt',),
+    '.pptx': ('txt',),
+    '.txt': ('txt', 'html', 'csv', 'json', 'xml'),
+    '.xlsx': _DATA_OUTPUTS,
+    '.csv': _DATA_OUTPUTS,
+    '.json': _DATA_OUTPUTS,
+    '.xml': _DATA_OUTPUTS,
+    '.parquet': _DATA_OUTPUTS,
+    '.feather': _DATA_OUTPUTS,
+    '.jpg': _IMAGE_OUTPUTS,
+    '.jpeg': _IMAGE_OUTPUTS,
+    '.png': _IMAGE_OUTPUTS,
+}
+
+# Inputs (and results) up to this size stay in memory in convert_stream
+MEMORY_MAX_BYTES = 16 * 1024 * 1024
+
+# Processes one conversion may fan out to (PPTX slides, XLSX sheets, PDF to DOCX chunks).
+# Code that already runs conversions side by side builds its converter with workers=1.
+DEFAULT_WORKERS = int(os.environ.get('CONVERT_WORKERS', 0)) or min(os.cpu_count() or 1, 4)
+
+# Keyword options convert() accepts; formats they don't apply to ignore them.
+# compression: parquet ('snappy', 'gzip', 'brotli', 'lz4', 'zstd') or feather ('lz4', 'zstd'),
+# 'none' for uncompressed. compression_level: codec level for zstd, gzip and brotli.
+# schema: {column: type} (or its JSON), replacing type inference for tabular inputs.
+# sheets: XLSX sheet names to convert (list or comma-separated), default all of them.
+# pages: PDF pages to convert, e.g. '1-3,7,10-' (1-based), default all of them.
+# page_rows: CSV/XLSX to HTML only; page the tables in the browser, this many rows at a time.
+CONVERT_OPTIONS = ('compression', 'compression_level', 'page_rows', 'pages', 'schema', 'sheets')
+
+# Characters a sheet name may contain that don't belong in a ZIP member name
+_UNSAFE_NAME = re.compile(r'[\\/:*?"<>|]')
+
+_PIL_FORMATS = {'jpg': 'JPEG', 'jpeg': 'JPEG', 'png': 'PNG'}
+
+def _is_buffer(target):
+    return hasattr(target, 'write') or hasattr(target, 'read')
+
+@contextmanager
+def _text_output(output):
+    """Open a path, or wrap a binary buffer, for writing UTF-8 text"""
+    if _is_buffer(output):
+        wrapper = io.TextIOWrapper(output, encoding='utf-8', newline='')
+        try:
+            yield wrapper
+        finally:
+            wrapper.flush()
+            wrapper.detach()
+    else:
+        with open(output, 'w', encoding='utf-8') as f:
+            yield f
+
+def _open_pdf(source):
+    """fitz.open for a path or a binary buffer"""
+    if _is_buffer(source):
+        source.seek(0)
+        return fitz.open(stream=source.read(), filetype='pdf')
+    return fitz.open(source)
+
+def _check_page_range(source, pages):
+    """Fail on pages the document doesn't have before a backend tries (and falls back)"""
+    if pages:
+        with _open_pdf(source) as doc:
+            page_ranges.select(pages, len(doc))
+        if _is_buffer(source):
+            source.seek(0)
+
+@functools.lru_cache(maxsize=None)
+def _font_config():
+    """WeasyPrint font configuration, built once per process so fontconfig loads once.
+
+    Fonts a document adds with @font-face stay registered in it, but
+    conversions run in forked children and take those additions with them.
+    """
+    return FontConfiguration() if FontConfiguration else None
+
+@functools.lru_cache(maxsize=None)
+def _pdf_table_styles():
+    """(heading, table style) for reportlab table PDFs, built once per process"""
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import TableStyle
+    from reportlab.lib import colors
+
+    return getSampleStyleSheet()['Heading2'], TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+def _check_options(options):
+    unknown = sorted(set(options) - set(CONVERT_OPTIONS))
+    if unknown:
+        raise ValueError(f"Unknown conversion option: {', '.join(unknown)}")
+    if options.get('pages'):
+        page_ranges.parse(options['pages'])
+    if options.get('page_rows') and not str(options['page_rows']).isdigit():
+        raise ValueError(f"page_rows must be a whole number of rows: {options['page_rows']!r}")
+
+def _check_conversion(input_ext, output_ext):
+    if input_ext not in CONVERSIONS:
+        raise ValueError(f"Unsupported input format: {input_ext}")
+    if output_ext not in CONVERSIONS[input_ext]:
+        raise ValueError(f"Cannot convert {input_ext} to {output_ext}")
+
+def _writer_options(options):
+    """The options _dataframe_to_format takes; the rest belong to other stages or formats"""
+    return {name: options[name] for name in ('compression', 'compression_level') if name in options}
+
+def _require_pyarrow():
+    if pyarrow is None:
+        raise ImportError("pyarrow required for Parquet and Feather")
+
+def _arrow_compatible(df):
+    """Frame Arrow can type: string column names, a plain index, no mixed object columns"""
+    df = df.reset_index(drop=True)
+    if not all(isinstance(column, str) for column in df.columns):
+        df.columns = [str(column) for column in df.columns]
+    for column in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[column], skipna=True).startswith('mixed'):
+            # e.g. a spreadsheet column of numbers and notes: keep it as text
+            df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+    return df
+
 class FileConverter:
-    def __init__(self):
+    def __init__(self, workers=None):
         self.temp_dir = tempfile.mkdtemp()
+        self.workers = workers or DEFAULT_WORKERS
         
     def __del__(self):
         try:
@@ -68,137 +284,248 @@ class FileConverter:
         except:
             pass
 
-    def convert(self, input_path, output_format):
+    def last_reports(self):
+        """Reports the last conversion on this thread left, by stage, e.g. {'optimize': {...}} for PDF/A"""
+        return dict(getattr(_conversion, 'reports', {}))
+
+    def convert(self, input_path, output_format, **options):
         if not os.path.exists(input_path):
             raise FileNotFoundError(f"Input file not found: {input_path}")
+        _check_options(options)
             
         output_path = self._get_output_path(input_path, output_format)
         input_ext = Path(input_path).suffix.lower()
         output_ext = output_format.lower()
         
+        with self._tracked(input_ext, output_ext, os.path.getsize(input_path)) as tracked:
+            # Inside _tracked, so an unsupported pair is counted as a failed conversion
+            _check_conversion(input_ext, output_ext)
+            try:
+                # Ensure output directory exists
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                result = self._dispatch(input_path, output_path, input_ext, output_ext, output_format, options)
+            except Exception as e:
+                if os.path.exists(output_path):
+                    try:
+                        os.remove(output_path)
+                    except:
+                        pass
+                raise e
+            if result and os.path.exists(result):
+                tracked['bytes_out'] = os.path.getsize(result)
+            return result
+
+    def convert_bytes(self, data, input_ext, output_format, spill_threshold=MEMORY_MAX_BYTES, **options):
+        """Convert a document held in memory and return the result as bytes (see convert_stream)"""
+        with self.convert_stream(io.BytesIO(data), input_ext, output_format, spill_threshold, **options) as result:
+            return result.read()
+
+    def convert_stream(self, stream, input_ext, output_format, spill_threshold=MEMORY_MAX_BYTES, **options):
+        """Convert a readable binary stream and return a readable result stream.
+
+        Inputs up to spill_threshold bytes whose pair is in MEMORY_CONVERSIONS
+        never touch the disk. Anything else is spilled to the temp dir and run
+        through convert(); its result is returned in a spooled temp file.
+
+        The result is always a single output_format file. An XLSX input that
+        would produce several sheets in a ZIPPED_OUTPUTS format raises
+        ValueError: pick one with sheets=, or use convert(), which returns
+        the .zip path.
+        """
+        input_ext = f".{input_ext.lower().lstrip('.')}"
+        output_ext = output_format.lower()
+        _check_options(options)
+
+        head = stream.read(spill_threshold + 1)
+        if len(head) <= spill_threshold and output_ext in MEMORY_CONVERSIONS.get(input_ext, ()):
+            self._check_single_output(io.BytesIO(head), input_ext, output_ext, options)
+            return self._convert_in_memory(head, input_ext, output_ext, options)
+
+        input_path = os.path.join(self.temp_dir, f"{uuid.uuid4().hex}{input_ext}")
+        with open(input_path, 'wb') as f:
+            f.write(head)
+            shutil.copyfileobj(stream, f)
         try:
-            # Ensure output directory exists
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            # PDF conversions
-            if input_ext == '.pdf':
-                if output_ext == 'docx':
-                    return self._pdf_to_docx_professional(input_path, output_path)
-                elif output_ext == 'html':
-                    return self._pdf_to_html_professional(input_path, output_path)
-                elif output_ext == 'txt':
-                    return self._pdf_to_txt_professional(input_path, output_path)
-                elif output_ext == 'xlsx':
-                    return self._pdf_to_xlsx_professional(input_path, output_path)
-                elif output_ext == 'csv':
-                    return self._pdf_to_csv_professional(input_path, output_path)
-                elif output_ext in ['jpg', 'jpeg', 'png']:
-                    return self._pdf_to_image_professional(input_path, output_path)
-                elif output_ext == 'pdfa':
-                    return self._pdf_to_pdfa(input_path, output_path)
-            
-            # DOCX conversions
-            elif input_ext == '.docx':
-                if output_ext == 'pdf':
-                    return self._docx_to_pdf_professional(input_path, output_path)
-                elif output_ext == 'html':
-                    return self._docx_to_html_professional(input_path, output_path)
-                elif output_ext == 'txt':
-                    return self._docx_to_txt_professional(input_path, output_path)
-                elif output_ext == 'pptx':
-                    return self._docx_to_pptx_with_images(input_path, output_path)
-                else:
-                    text = self._extract_docx_text(input_path)
-                    return self._create_from_text(text, output_path, output_ext)
-            
-            # HTML conversions
-            elif input_ext == '.html':
-                if output_ext == 'pdf':
-                    return self._html_to_pdf_professional(input_path, output_path)
-                elif output_ext == 'docx':
-                    return self._html_to_docx_professional(input_path, output_path)
-                else:
-                    text = self._extract_html_text(input_path)
-                    return self._create_from_text(text, output_path, output_ext)
-            
-            # Excel conversions
-            elif input_ext == '.xlsx':
-                if output_ext == 'pdf':
-                    return self._xlsx_to_pdf_professional(input_path, output_path)
-                elif output_ext == 'html':
-                    return self._xlsx_to_html_professional(input_path, output_path)
-                elif output_ext == 'csv':
-                    return self._xlsx_to_csv_professional(input_path, output_path)
-                else:
-                    df = self.load_dataframe(input_path)
-                    return self._dataframe_to_format(df, output_path, output_ext)
-            
-            # CSV conversions
-            elif input_ext == '.csv':
-                if output_ext == 'xlsx':
-                    return self._csv_to_xlsx_professional(input_path, output_path)
-                elif output_ext == 'pdf':
-                    return self._csv_to_pdf_professional(input_path, output_path)
-                elif output_ext == 'html':
-                    return self._csv_to_html_professional(input_path, output_path)
-                else:
-                    df = self.load_dataframe(input_path)
-                    return self._dataframe_to_format(df, output_path, output_ext)
-            
-            # Image conversions
-            elif input_ext in ['.jpg', '.jpeg', '.png']:
-                if output_ext == 'pdf':
-                    return self._image_to_pdf_professional(input_path, output_path)
-                elif output_ext == 'docx':
-                    return self._image_to_docx_professional(input_path, output_path)
-                else:
-                    return self._image_convert(input_path, output_path, output_ext)
-            
-            # PowerPoint conversions
-            elif input_ext == '.pptx':
-                if output_ext == 'pdf':
-                    return self._pptx_to_pdf(input_path, output_path)
-                else:
-                    text = self._extract_pptx_text(input_path)
-                    return self._create_from_text(text, output_path, output_ext)
-            
-            # Text conversions
-            elif input_ext == '.txt':
-                text = self._extract_txt_text(input_path)
-                if output_ext == 'pdf':
-                    return self._text_to_pdf(text, output_path)
-                elif output_ext == 'pptx':
-                    return self._text_to_pptx(text, output_path)
-                else:
-                    return self._create_from_text(text, output_path, output_ext)
-            
-            # JSON/XML conversions
-            elif input_ext in ['.json', '.xml']:
-                df = self.load_dataframe(input_path)
-                return self._dataframe_to_format(df, output_path, output_ext)
-            
-            else:
-                raise ValueError(f"Unsupported input format: {input_ext}")
-            
-            # Copy from temp directory to final destination if needed
-            if output_path.startswith(self.temp_dir):
-                try:
-                    final_output = self._get_final_output_path(input_path, output_format)
-                    shutil.copy2(output_path, final_output)
-                    return final_output
-                except Exception as copy_error:
-                    print(f"Could not copy to final destination: {copy_error}")
-                    return output_path
-            
-            return output_path
-                
+            self._check_single_output(input_path, input_ext, output_ext, options)
+            output_path = self.convert(input_path, output_format, **options)
+            result = tempfile.SpooledTemporaryFile(max_size=spill_threshold)
+            with open(output_path, 'rb') as f:
+                shutil.copyfileobj(f, result)
+            os.remove(output_path)
+            result.seek(0)
+            return result
+        finally:
+            os.remove(input_path)
+
+    def _check_single_output(self, source, input_ext, output_ext, options):
+        """A stream result has no name to tell the caller it is a .zip, so refuse to make one"""
+        if input_ext != '.xlsx' or output_ext not in ZIPPED_OUTPUTS:
+            return
+        with pd.ExcelFile(source) as book:
+            names = workbook.select(book.sheet_names, options.get('sheets'))
+        if len(names) > 1:
+            raise ValueError(f"{len(names)} sheets would be returned as a ZIP, not {output_ext}; "
+                             f"choose one with sheets= or use convert()")
+
+    def _convert_in_memory(self, data, input_ext, output_ext, options):
+        source = io.BytesIO(data)
+        output = io.BytesIO()
+        with self._tracked(input_ext, output_ext, len(data)) as tracked:
+            self._dispatch_memory(source, output, input_ext, output_ext, options)
+            tracked['bytes_out'] = output.tell()
+        output.seek(0)
+        return output
+
+    @contextmanager
+    def _tracked(self, input_ext, output_ext, bytes_in):
+        """Trace one conversion and record which handlers served it"""
+        _conversion.handlers = []
+        _conversion.depth = 0
+        _conversion.reports = {}
+        tracked = {'bytes_out': None}
+        started = time.perf_counter()
+        error = None
+        try:
+            with profiling.span('convert', input=input_ext, output=output_ext, bytes_in=bytes_in):
+                yield tracked
         except Exception as e:
-            if os.path.exists(output_path):
-                try:
-                    os.remove(output_path)
-                except:
-                    pass
-            raise e
+            error = e
+            raise
+        finally:
+            metrics.observe_conversion(
+                input_ext, output_ext, '+'.join(_conversion.handlers) or 'none',
+                time.perf_counter() - started, bytes_in, tracked['bytes_out'],
+                'error' if error is not None else 'ok', error)
+            del _conversion.handlers
+
+    def _dispatch_memory(self, source, output, input_ext, output_ext, options):
+        """The MEMORY_CONVERSIONS subset of _dispatch, on BytesIO buffers"""
+        if input_ext == '.pdf':
+            pages = options.get('pages')
+            _check_page_range(source, pages)
+            if output_ext == 'txt':
+                return self._pdf_to_txt_professional(source, output, pages)
+            return self._pdf_to_image_professional(source, output, output_ext, pages)
+        elif input_ext == '.docx':
+            return self._docx_to_txt_professional(source, output)
+        elif input_ext == '.html':
+            return self._create_from_text(self._extract_html_text(source), output, output_ext)
+        elif input_ext == '.pptx':
+            return self._create_from_text(self._extract_pptx_text(source), output, output_ext)
+        elif input_ext == '.txt':
+            return self._create_from_lines(text_reader.iter_lines(source), output, output_ext)
+        elif input_ext in ['.jpg', '.jpeg', '.png']:
+            return self._image_convert(source, output, output_ext)
+        elif input_ext == '.xlsx':
+            return self._convert_workbook(source, output, output_ext, options)
+        elif input_ext == '.csv' and output_ext == 'xlsx':
+            return self._csv_to_xlsx_professional(source, output)
+        return self._convert_table(source, output, input_ext, output_ext, options)
+
+    def _dispatch(self, input_path, output_path, input_ext, output_ext, output_format, options):
+        # PDF conversions
+        if input_ext == '.pdf':
+            pages = options.get('pages')
+            _check_page_range(input_path, pages)
+            if output_ext == 'docx':
+                return self._pdf_to_docx_professional(input_path, output_path, pages)
+            elif output_ext == 'html':
+                return self._pdf_to_html_professional(input_path, output_path, pages)
+            elif output_ext == 'txt':
+                return self._pdf_to_txt_professional(input_path, output_path, pages)
+            elif output_ext == 'xlsx':
+                return self._pdf_to_xlsx_professional(input_path, output_path, pages)
+            elif output_ext == 'csv':
+                return self._pdf_to_csv_professional(input_path, output_path, pages)
+            elif output_ext in ['jpg', 'jpeg', 'png']:
+                return self._pdf_to_image_professional(input_path, output_path, pages=pages)
+            elif output_ext == 'pdfa':
+                return self._pdf_to_pdfa(input_path, output_path, pages)
+        
+        # DOCX conversions
+        elif input_ext == '.docx':
+            if output_ext == 'pdf':
+                return self._docx_to_pdf_professional(input_path, output_path)
+            elif output_ext == 'html':
+                return self._docx_to_html_professional(input_path, output_path)
+            elif output_ext == 'txt':
+                return self._docx_to_txt_professional(input_path, output_path)
+            elif output_ext == 'pptx':
+                return self._docx_to_pptx_with_images(input_path, output_path)
+            else:
+                text = self._extract_docx_text(input_path)
+                return self._create_from_text(text, output_path, output_ext)
+        
+        # HTML conversions
+        elif input_ext == '.html':
+            if output_ext == 'pdf':
+                return self._html_to_pdf_professional(input_path, output_path)
+            elif output_ext == 'docx':
+                return self._html_to_docx_professional(input_path, output_path)
+            else:
+                text = self._extract_html_text(input_path)
+                return self._create_from_text(text, output_path, output_ext)
+        
+        # Excel conversions
+        elif input_ext == '.xlsx':
+            return self._convert_workbook(input_path, output_path, output_ext, options)
+        
+        # CSV conversions
+        elif input_ext == '.csv':
+            if output_ext == 'xlsx':
+                return self._csv_to_xlsx_professional(input_path, output_path)
+            elif output_ext == 'pdf':
+                return self._csv_to_pdf_professional(input_path, output_path)
+            elif output_ext == 'html':
+                return self._csv_to_html_professional(input_path, output_path, options.get('page_rows'))
+            else:
+                return self._convert_table(input_path, output_path, input_ext, output_ext, options)
+        
+        # Image conversions
+        elif input_ext in ['.jpg', '.jpeg', '.png']:
+            if output_ext == 'pdf':
+                return self._image_to_pdf_professional(input_path, output_path)
+            elif output_ext == 'docx':
+                return self._image_to_docx_professional(input_path, output_path)
+            else:
+                return self._image_convert(input_path, output_path, output_ext)
+        
+        # PowerPoint conversions
+        elif input_ext == '.pptx':
+            if output_ext == 'pdf':
+                return self._pptx_to_pdf(input_path, output_path)
+            else:
+                text = self._extract_pptx_text(input_path)
+                return self._create_from_text(text, output_path, output_ext)
+        
+        # Text conversions
+        elif input_ext == '.txt':
+            lines = text_reader.iter_lines(input_path)
+            if output_ext == 'pdf':
+                return self._lines_to_pdf(lines, output_path)
+            elif output_ext == 'pptx':
+                return self._lines_to_pptx(lines, output_path)
+            else:
+                return self._create_from_lines(lines, output_path, output_ext)
+        
+        # JSON/XML/columnar conversions
+        elif input_ext in ['.json', '.xml', '.parquet', '.feather']:
+            return self._convert_table(input_path, output_path, input_ext, output_ext, options)
+        
+        else:
+            raise ValueError(f"Unsupported input format: {input_ext}")
+        
+        # Copy from temp directory to final destination if needed
+        if output_path.startswith(self.temp_dir):
+            try:
+                final_output = self._get_final_output_path(input_path, output_format)
+                shutil.copy2(output_path, final_output)
+                return final_output
+            except Exception as copy_error:
+                print(f"Could not copy to final destination: {copy_error}")
+                return output_path
+        
+        return output_path
     
     def _get_final_output_path(self, input_path, output_format):
         """Get the intended final output path"""
@@ -212,7 +539,8 @@ class FileConverter:
         return temp_output
 
     # Professional PDF conversions
-    def _pdf_to_docx_professional(self, input_path, output_path):
+    @_handler
+    def _pdf_to_docx_professional(self, input_path, output_path, pages=None):
         try:
             if pdf2docx:
                 # Ensure output directory exists and is writable
@@ -227,18 +555,17 @@ class FileConverter:
                         temp_output = output_path.replace('.docx', '_temp.docx')
                         output_path = temp_output
                 
-                from pdf2docx import Converter
-                cv = Converter(input_path)
-                cv.convert(output_path, start=0, end=None)
-                cv.close()
+                with profiling.span('pdf2docx'):
+                    pdf_docx.convert(input_path, output_path, pages, workers=self.workers)
                 return output_path
         except Exception as e:
             print(f"pdf2docx failed: {e}")
         
         # Fallback
-        return self._pdf_to_docx_fallback(input_path, output_path)
+        return self._pdf_to_docx_fallback(input_path, output_path, pages)
 
-    def _pdf_to_html_professional(self, input_path, output_path):
+    @_handler
+    def _pdf_to_html_professional(self, input_path, output_path, pages=None):
         try:
             if pdfplumber:
                 with pdfplumber.open(input_path) as pdf:
@@ -251,11 +578,13 @@ class FileConverter:
                     html_content.append('.page { page-break-after: always; margin-bottom: 40px; }')
                     html_content.append('</style></head><body>')
                     
-                    for page_num, page in enumerate(pdf.pages):
+                    for page_num in page_ranges.select(pages, len(pdf.pages)):
+                        page = pdf.pages[page_num]
                         html_content.append(f'<div class="page" id="page-{page_num + 1}">')
                         
                         # Extract tables first
-                        tables = page.extract_tables()
+                        with profiling.span('extract_tables', page=page_num + 1):
+                            tables = page.extract_tables()
                         if tables:
                             for table in tables:
                                 if table and len(table) > 0:
@@ -270,7 +599,8 @@ class FileConverter:
                                     html_content.append('</table>')
                         
                         # Extract remaining text
-                        text = page.extract_text()
+                        with profiling.span('extract_text', page=page_num + 1):
+                            text = page.extract_text()
                         if text:
                             paragraphs = text.split('\n\n')
                             for para in paragraphs:
@@ -281,22 +611,26 @@ class FileConverter:
                     
                     html_content.append('</body></html>')
                     
-                    with open(output_path, 'w', encoding='utf-8') as f:
-                        f.write('\n'.join(html_content))
+                    with profiling.span('write'):
+                        with open(output_path, 'w', encoding='utf-8') as f:
+                            f.write('\n'.join(html_content))
                     return output_path
         except Exception as e:
             print(f"Professional PDF to HTML failed: {e}")
         
-        return self._pdf_to_html_fallback(input_path, output_path)
+        return self._pdf_to_html_fallback(input_path, output_path, pages)
 
-    def _pdf_to_xlsx_professional(self, input_path, output_path):
+    @_handler
+    def _pdf_to_xlsx_professional(self, input_path, output_path, pages=None):
         try:
             if pdfplumber:
                 with pdfplumber.open(input_path) as pdf:
                     all_tables = []
                     
-                    for page in pdf.pages:
-                        tables = page.extract_tables()
+                    for page_num in page_ranges.select(pages, len(pdf.pages)):
+                        page = pdf.pages[page_num]
+                        with profiling.span('extract_tables', page=page_num + 1):
+                            tables = page.extract_tables()
                         for table in tables:
                             if table and len(table) > 0:
                                 clean_table = []
@@ -308,7 +642,7 @@ class FileConverter:
                                     all_tables.append(clean_table)
                     
                     if all_tables:
-                        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+                        with profiling.span('write'), pd.ExcelWriter(output_path, engine='openpyxl') as writer:
                             for i, table in enumerate(all_tables):
                                 if len(table) > 1:
                                     df = pd.DataFrame(table[1:], columns=table[0])
@@ -320,26 +654,29 @@ class FileConverter:
         except Exception as e:
             print(f"Professional PDF to Excel failed: {e}")
         
-        return self._pdf_to_xlsx_fallback(input_path, output_path)
+        return self._pdf_to_xlsx_fallback(input_path, output_path, pages)
 
+    @_handler
     def _docx_to_pdf_professional(self, input_path, output_path):
         # Use Linux-safe fallback method only
         return self._docx_to_pdf_fallback(input_path, output_path)
 
+    @_handler
     def _html_to_pdf_professional(self, input_path, output_path):
         try:
             if HTML:
-                HTML(filename=input_path).write_pdf(output_path)
+                HTML(filename=input_path).write_pdf(output_path, font_config=_font_config())
                 return output_path
         except Exception as e:
             print(f"WeasyPrint failed: {e}")
         
         return self._html_to_pdf_fallback(input_path, output_path)
 
-    def _xlsx_to_pdf_professional(self, input_path, output_path):
-        # Use Linux-safe fallback method only
-        return self._xlsx_to_pdf_fallback(input_path, output_path)
+    @_handler
+    def _xlsx_to_pdf_professional(self, sheets, output_path):
+        return self._tables_to_pdf(sheets, output_path)
 
+    @_handler
     def _image_to_pdf_professional(self, input_path, output_path):
         try:
             img = Image.open(input_path)
@@ -352,12 +689,13 @@ class FileConverter:
             return self._image_to_pdf_fallback(input_path, output_path)
 
     # Fallback methods
-    def _pdf_to_docx_fallback(self, input_path, output_path):
+    @_fallback
+    def _pdf_to_docx_fallback(self, input_path, output_path, pages=None):
         doc_pdf = fitz.open(input_path)
         doc_docx = docx.Document()
         
-        for page in doc_pdf:
-            text = page.get_text()
+        for page_num in page_ranges.select(pages, len(doc_pdf)):
+            text = doc_pdf[page_num].get_text()
             if text.strip():
                 for para in text.split('\n\n'):
                     if para.strip():
@@ -367,12 +705,13 @@ class FileConverter:
         doc_pdf.close()
         return output_path
 
-    def _pdf_to_html_fallback(self, input_path, output_path):
+    @_fallback
+    def _pdf_to_html_fallback(self, input_path, output_path, pages=None):
         doc = fitz.open(input_path)
         html_content = ['<html><head><meta charset="utf-8"></head><body>']
         
-        for page_num, page in enumerate(doc):
-            text = page.get_text()
+        for page_num in page_ranges.select(pages, len(doc)):
+            text = doc[page_num].get_text()
             html_content.append(f'<div class="page-{page_num + 1}">')
             for para in text.split('\n\n'):
                 if para.strip():
@@ -386,18 +725,20 @@ class FileConverter:
         doc.close()
         return output_path
 
-    def _pdf_to_xlsx_fallback(self, input_path, output_path):
+    @_fallback
+    def _pdf_to_xlsx_fallback(self, input_path, output_path, pages=None):
         doc = fitz.open(input_path)
         text_lines = []
         
-        for page in doc:
-            text_lines.extend([line.strip() for line in page.get_text().split('\n') if line.strip()])
+        for page_num in page_ranges.select(pages, len(doc)):
+            text_lines.extend([line.strip() for line in doc[page_num].get_text().split('\n') if line.strip()])
         
         df = pd.DataFrame(text_lines, columns=['Content'])
         df.to_excel(output_path, index=False)
         doc.close()
         return output_path
 
+    @_fallback
     def _docx_to_pdf_fallback(self, input_path, output_path):
         doc = docx.Document(input_path)
         
@@ -417,42 +758,12 @@ class FileConverter:
         pdf_doc.close()
         return output_path
 
+    @_fallback
     def _html_to_pdf_fallback(self, input_path, output_path):
-        with open(input_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
-        soup = BeautifulSoup(html_content, 'html.parser')
-        text = soup.get_text()
-        
+        text = html_reader.extract_text(input_path)
         return self._text_to_pdf(text, output_path)
 
-    def _xlsx_to_pdf_fallback(self, input_path, output_path):
-        df = pd.read_excel(input_path)
-        
-        from reportlab.lib.pagesizes import letter
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-        from reportlab.lib import colors
-        
-        doc = SimpleDocTemplate(output_path, pagesize=letter)
-        elements = []
-        
-        data = [df.columns.tolist()] + df.values.tolist()
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        elements.append(table)
-        doc.build(elements)
-        return output_path
-
+    @_fallback
     def _image_to_pdf_fallback(self, input_path, output_path):
         img = Image.open(input_path)
         if img.mode != 'RGB':
@@ -474,10 +785,11 @@ class FileConverter:
         else:
             return ""
 
-    def _extract_pdf_text(self, file_path):
-        doc = fitz.open(file_path)
+    def _extract_pdf_text(self, file_path, pages=None):
+        doc = _open_pdf(file_path)
         text_parts = []
-        for page in doc:
+        for page_num in page_ranges.select(pages, len(doc)):
+            page = doc[page_num]
             # Use layout preservation for better spacing
             blocks = page.get_text("dict")["blocks"]
             page_lines = []
@@ -494,68 +806,96 @@ class FileConverter:
         doc.close()
         return '\n\n'.join(text_parts)
 
+    @_handler
     def _extract_docx_text(self, file_path):
-        doc = docx.Document(file_path)
-        text_parts = []
-        
-        for para in doc.paragraphs:
-            if para.text.strip():
-                # Normalize spacing while preserving structure
-                clean_text = ' '.join(para.text.split())
-                text_parts.append(clean_text)
-        
-        for table in doc.tables:
-            for row in table.rows:
-                row_cells = [' '.join(cell.text.split()) for cell in row.cells]
-                row_text = '\t'.join(row_cells)
-                if row_text.strip():
-                    text_parts.append(row_text)
-        
-        return '\n'.join(text_parts)
+        return '\n'.join(self._iter_docx_lines(file_path))
 
-    def _extract_txt_text(self, file_path):
-        encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    return f.read()
-            except UnicodeDecodeError:
+    def _iter_docx_lines(self, file_path):
+        """Paragraphs and tab-joined table rows in document order, spacing normalized"""
+        for kind, value in docx_reader.iter_blocks(file_path):
+            if kind == 'paragraph':
+                line = ' '.join(value.split())
+            elif kind == 'row':
+                line = '\t'.join(' '.join(cell.split()) for cell in value)
+            else:
                 continue
-        raise ValueError("Could not decode text file")
+            if line.strip():
+                yield line
 
+    @_handler
+    def _extract_txt_text(self, file_path):
+        return text_reader.read_text(file_path)
+
+    @_handler
     def _extract_html_text(self, file_path):
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        soup = BeautifulSoup(content, 'html.parser')
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        return soup.get_text()
+        return html_reader.extract_text(file_path)
 
+    @_handler
     def _extract_pptx_text(self, file_path):
-        if not Presentation:
-            raise ImportError("python-pptx required")
-        
-        prs = Presentation(file_path)
-        text_parts = []
-        for slide in prs.slides:
-            for shape in slide.shapes:
-                if hasattr(shape, "text"):
-                    text_parts.append(shape.text)
-        return '\n'.join(text_parts)
+        # Reads the slide XML directly; big decks are parsed across processes
+        return pptx_reader.extract_text(file_path, workers=self.workers)
 
     # Data loading methods
-    def load_dataframe(self, file_path):
-        ext = Path(file_path).suffix.lower()
+    def _convert_table(self, source, output_path, input_ext, output_ext, options):
+        """load_dataframe, the schema stage, then _dataframe_to_format"""
+        schema = table_schema.parse(options.get('schema'))
+        df = self.load_dataframe(source, input_ext, schema)
+        with profiling.span('schema', columns=len(df.columns), given=bool(schema)):
+            df = table_schema.compact(df, schema, output_ext)
+        return self._dataframe_to_format(df, output_path, output_ext, **_writer_options(options))
+
+    def _convert_workbook(self, source, output_path, output_ext, options):
+        """XLSX input: every selected sheet, in one file where the format holds several tables"""
+        with profiling.span('read_sheets'):
+            sheets = workbook.read_sheets(source, options.get('sheets'), self.workers)
+        sheets = self._compact_tables(sheets, options.get('schema'), output_ext)
+        writer_options = _writer_options(options)
+
+        if output_ext == 'pdf':
+            return self._xlsx_to_pdf_professional(sheets, output_path)
+        elif output_ext == 'html':
+            return self._xlsx_to_html_professional(sheets, output_path, options.get('page_rows'))
+        elif output_ext == 'xlsx':
+            return self._tables_to_xlsx(sheets, output_path)
+        elif len(sheets) == 1:
+            return self._dataframe_to_format(next(iter(sheets.values())), output_path, output_ext, **writer_options)
+        elif output_ext in ('txt', 'docx', 'pptx'):
+            text = '\n\n'.join(f"{name}\n{df.to_string(index=False)}" for name, df in sheets.items())
+            if output_ext == 'pptx':
+                return self._text_to_pptx(text, output_path)
+            return self._create_from_text(text, output_path, output_ext)
+        else:
+            return self._tables_to_zip(sheets, output_path, output_ext, writer_options)
+
+    def _compact_tables(self, tables, schema, output_ext):
+        """The schema stage for several tables; a given schema applies to the columns each one has"""
+        schema = table_schema.parse(schema)
+        with profiling.span('schema', tables=len(tables), given=bool(schema)):
+            if not schema:
+                return {name: table_schema.compact(df, None, output_ext) for name, df in tables.items()}
+            missing = [column for column in schema if not any(column in df.columns for df in tables.values())]
+            if missing:
+                raise ValueError(f"Schema columns not in the data: {', '.join(map(str, missing))}")
+            return {
+                name: table_schema.apply(df, {column: dtype for column, dtype in schema.items() if column in df.columns})
+                for name, df in tables.items()
+            }
+
+    @_handler
+    def load_dataframe(self, file_path, ext=None, schema=None):
+        ext = ext or Path(file_path).suffix.lower()
         
         if ext == '.csv':
-            return pd.read_csv(file_path)
+            with text_reader.open_text(file_path) as f:
+                return pd.read_csv(f, **table_schema.read_csv_kwargs(schema))
         elif ext == '.xlsx':
             return pd.read_excel(file_path)
         elif ext == '.json':
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if _is_buffer(file_path):
+                data = json.load(file_path)
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
             if isinstance(data, list):
                 return pd.DataFrame(data)
             else:
@@ -568,51 +908,79 @@ class FileConverter:
                 row = {child.tag: child.text for child in item}
                 rows.append(row)
             return pd.DataFrame(rows)
+        elif ext == '.parquet':
+            _require_pyarrow()
+            return pd.read_parquet(file_path)
+        elif ext == '.feather':
+            _require_pyarrow()
+            # Memory-mapped, so fixed-width columns are read without copying the file
+            table = feather.read_table(file_path, memory_map=not _is_buffer(file_path))
+            return table.to_pandas()
         else:
             raise ValueError(f"Unsupported data format: {ext}")
 
     # Output creation methods
+    @_handler
     def _create_from_text(self, text, output_path, ext):
+        return self._create_from_lines(text.split('\n'), output_path, ext)
+
+    @_handler
+    def _create_from_lines(self, lines, output_path, ext):
+        """Write an iterable of lines (no newlines) without joining them first"""
         if ext == 'txt':
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(text)
+            with _text_output(output_path) as f:
+                for i, line in enumerate(lines):
+                    f.write(f"\n{line}" if i else line)
         elif ext == 'docx':
-            doc = docx.Document()
-            for line in text.split('\n'):
-                if line.strip():
-                    doc.add_paragraph(line)
-            doc.save(output_path)
+            text_writers.write_docx(lines, output_path)
         elif ext == 'html':
-            html = f'<html><head><meta charset="utf-8"></head><body><pre>{text}</pre></body></html>'
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html)
+            with _text_output(output_path) as f:
+                f.write('<html><head><meta charset="utf-8"></head><body><pre>')
+                for i, line in enumerate(lines):
+                    f.write(html_escape(f"\n{line}" if i else line, quote=False))
+                f.write('</pre></body></html>')
         elif ext == 'csv':
-            lines = [line for line in text.split('\n') if line.strip()]
-            df = pd.DataFrame(lines, columns=['Content'])
-            df.to_csv(output_path, index=False)
+            with _text_output(output_path) as f:
+                writer = csv.writer(f, lineterminator='\n')
+                writer.writerow(['Content'])
+                writer.writerows([line] for line in lines if line.strip())
         elif ext == 'xlsx':
-            lines = [line for line in text.split('\n') if line.strip()]
-            df = pd.DataFrame(lines, columns=['Content'])
-            df.to_excel(output_path, index=False)
+            from openpyxl import Workbook
+            book = Workbook(write_only=True)
+            sheet = book.create_sheet('Sheet1')
+            sheet.append(['Content'])
+            for line in lines:
+                if line.strip():
+                    sheet.append([line])
+            book.save(output_path)
         elif ext == 'json':
-            lines = [line for line in text.split('\n') if line.strip()]
-            data = {'content': lines}
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # Same layout as json.dump(..., indent=2), one line at a time
+            with _text_output(output_path) as f:
+                f.write('{\n  "content": [')
+                count = 0
+                for line in lines:
+                    if line.strip():
+                        f.write(',\n    ' if count else '\n    ')
+                        f.write(json.dumps(line, ensure_ascii=False))
+                        count += 1
+                f.write('\n  ]\n}' if count else ']\n}')
         elif ext == 'xml':
-            lines = [line for line in text.split('\n') if line.strip()]
-            root = ET.Element("Document")
-            for line in lines:
-                ET.SubElement(root, "Line").text = line
-            tree = ET.ElementTree(root)
-            tree.write(output_path, encoding='utf-8', xml_declaration=True)
+            with _text_output(output_path) as f:
+                f.write("<?xml version='1.0' encoding='utf-8'?>\n<Document>")
+                for line in lines:
+                    if line.strip():
+                        f.write(f"<Line>{html_escape(line, quote=False)}</Line>")
+                f.write('</Document>')
         elif ext == 'pptx':
-            return self._text_to_pptx(text, output_path)
-        
+            return self._lines_to_pptx(lines, output_path)
+
         return output_path
 
-    def _dataframe_to_format(self, df, output_path, ext):
-        if ext == 'csv':
+    @_handler
+    def _dataframe_to_format(self, df, output_path, ext, compression=None, compression_level=None):
+        if ext in ('parquet', 'feather'):
+            return self._dataframe_to_columnar(df, output_path, ext, compression, compression_level)
+        elif ext == 'csv':
             df.to_csv(output_path, index=False)
         elif ext == 'xlsx':
             df.to_excel(output_path, index=False)
@@ -637,209 +1005,219 @@ class FileConverter:
         
         return output_path
 
+    def _dataframe_to_columnar(self, df, output_path, ext, compression, compression_level):
+        _require_pyarrow()
+        df = _arrow_compatible(df)
+        if compression == 'none':
+            compression = 'uncompressed' if ext == 'feather' else None
+        kwargs = {} if compression is None else {'compression': compression}
+        if compression_level is not None:
+            kwargs['compression_level'] = int(compression_level)
+        with profiling.span('write'):
+            if ext == 'parquet':
+                df.to_parquet(output_path, index=False, **kwargs)
+            else:
+                df.to_feather(output_path, **kwargs)
+        return output_path
+
     def _dataframe_to_pdf(self, df, output_path):
+        return self._tables_to_pdf({None: df}, output_path)
+
+    @_handler
+    def _tables_to_pdf(self, tables, output_path):
+        """One table per DataFrame; with several, each starts a page under its name"""
         from reportlab.lib.pagesizes import letter
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-        from reportlab.lib import colors
+        from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, PageBreak
         
         doc = SimpleDocTemplate(output_path, pagesize=letter)
+        heading, table_style = _pdf_table_styles()
         elements = []
         
-        data = [df.columns.tolist()] + df.values.tolist()
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        for name, df in tables.items():
+            if len(tables) > 1:
+                if elements:
+                    elements.append(PageBreak())
+                elements.append(Paragraph(html_escape(str(name)), heading))
+            data = [df.columns.tolist()] + df.values.tolist()
+            table = Table(data)
+            table.setStyle(table_style)
+            elements.append(table)
         
-        elements.append(table)
         doc.build(elements)
         return output_path
 
+    @_handler
+    def _tables_to_html(self, tables, output_path, page_rows=None):
+        """{name: DataFrame or iterable of DataFrame batches} as one streamed HTML page"""
+        with profiling.span('write'), _text_output(output_path) as f:
+            table_html.write_document(f, tables, int(page_rows) if page_rows else None)
+        return output_path
+
+    @_handler
+    def _tables_to_xlsx(self, tables, output_path):
+        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+            for name, df in tables.items():
+                df.to_excel(writer, sheet_name=name, index=False)
+        return output_path
+
+    @_handler
+    def _tables_to_zip(self, tables, output_path, ext, options):
+        """A ZIP with one <name>.<ext> per table, written next to output_path as .zip"""
+        if not _is_buffer(output_path):
+            output_path = f"{os.path.splitext(output_path)[0]}.zip"
+        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, df in tables.items():
+                member = io.BytesIO()
+                self._dataframe_to_format(df, member, ext, **options)
+                archive.writestr(f"{_UNSAFE_NAME.sub('_', str(name))}.{ext}", member.getvalue())
+        return output_path
+
+    @_handler
     def _text_to_pdf(self, text, output_path):
-        doc = fitz.open()
-        page = doc.new_page()
-        
-        y_position = 50
-        for line in text.split('\n'):
-            if y_position > 750:
-                page = doc.new_page()
-                y_position = 50
-            page.insert_text((50, y_position), line, fontsize=11)
-            y_position += 15
-        
-        doc.save(output_path)
-        doc.close()
+        return self._lines_to_pdf(text.split('\n'), output_path)
+
+    @_handler
+    def _lines_to_pdf(self, lines, output_path):
+        with profiling.span('write'):
+            text_writers.write_pdf(lines, output_path)
         return output_path
 
     # Additional professional methods
-    def _pdf_to_txt_professional(self, input_path, output_path):
+    @_handler
+    def _pdf_to_txt_professional(self, input_path, output_path, pages=None):
         try:
             if pdfplumber:
                 with pdfplumber.open(input_path) as pdf:
                     text_parts = []
-                    for page in pdf.pages:
-                        text = page.extract_text()
-                        if text:
-                            text_parts.append(text)
+                    selection = page_ranges.select(pages, len(pdf.pages))
+                    with profiling.span('extract_text', pages=len(selection)):
+                        for page_num in selection:
+                            text = pdf.pages[page_num].extract_text()
+                            if text:
+                                text_parts.append(text)
                     
-                    with open(output_path, 'w', encoding='utf-8') as f:
-                        f.write('\n\n'.join(text_parts))
+                    with profiling.span('write'):
+                        with _text_output(output_path) as f:
+                            f.write('\n\n'.join(text_parts))
                     return output_path
         except:
             pass
         
-        text = self._extract_pdf_text(input_path)
-        with open(output_path, 'w', encoding='utf-8') as f:
+        metrics.FALLBACKS.inc(fallback='_pdf_to_txt_professional.fitz')
+        text = self._extract_pdf_text(input_path, pages)
+        with _text_output(output_path) as f:
             f.write(text)
         return output_path
 
-    def _pdf_to_csv_professional(self, input_path, output_path):
+    @_handler
+    def _pdf_to_csv_professional(self, input_path, output_path, pages=None):
         try:
             if pdfplumber:
                 with pdfplumber.open(input_path) as pdf:
                     all_rows = []
-                    for page in pdf.pages:
-                        tables = page.extract_tables()
+                    for page_num in page_ranges.select(pages, len(pdf.pages)):
+                        page = pdf.pages[page_num]
+                        with profiling.span('extract_tables', page=page_num + 1):
+                            tables = page.extract_tables()
                         for table in tables:
                             if table:
                                 all_rows.extend(table)
                     
                     if all_rows and len(all_rows) > 1:
                         df = pd.DataFrame(all_rows[1:], columns=all_rows[0])
-                        df.to_csv(output_path, index=False)
+                        with profiling.span('write'):
+                            df.to_csv(output_path, index=False)
                         return output_path
         except:
             pass
         
-        text = self._extract_pdf_text(input_path)
+        metrics.FALLBACKS.inc(fallback='_pdf_to_csv_professional.text')
+        text = self._extract_pdf_text(input_path, pages)
         lines = [line.strip() for line in text.split('\n') if line.strip()]
         df = pd.DataFrame(lines, columns=['Content'])
         df.to_csv(output_path, index=False)
         return output_path
 
-    def _pdf_to_image_professional(self, input_path, output_path):
-        doc = fitz.open(input_path)
-        page = doc[0]
+    @_handler
+    def _pdf_to_image_professional(self, input_path, output_path, output_ext=None, pages=None):
+        doc = _open_pdf(input_path)
+        # One image: the first selected page
+        page = doc[page_ranges.select(pages, len(doc))[0]]
         pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # High resolution
-        pix.save(output_path)
+        if _is_buffer(output_path):
+            output_path.write(pix.tobytes(output=_PIL_FORMATS[output_ext].lower()))
+        else:
+            pix.save(output_path)
         doc.close()
         return output_path
 
+    @_handler
     def _docx_to_html_professional(self, input_path, output_path):
-        doc = docx.Document(input_path)
-        html_content = ['<html><head><meta charset="utf-8"></head><body>']
-        
-        for para in doc.paragraphs:
-            if para.text.strip():
-                html_content.append(f'<p>{para.text}</p>')
-        
-        for table in doc.tables:
-            html_content.append('<table border="1">')
-            for row in table.rows:
-                html_content.append('<tr>')
-                for cell in row.cells:
-                    html_content.append(f'<td>{cell.text}</td>')
-                html_content.append('</tr>')
-            html_content.append('</table>')
-        
-        html_content.append('</body></html>')
-        
         with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(html_content))
+            f.write('<html><head><meta charset="utf-8"></head><body>\n')
+            in_table = False
+            for kind, value in docx_reader.iter_blocks(input_path):
+                if kind == 'paragraph':
+                    if value.strip():
+                        f.write(f'<p>{html_escape(value)}</p>\n')
+                elif kind == 'row':
+                    if not in_table:
+                        f.write('<table border="1">\n')
+                        in_table = True
+                    cells = ''.join(f'<td>{html_escape(cell)}</td>' for cell in value)
+                    f.write(f'<tr>{cells}</tr>\n')
+                elif in_table:
+                    f.write('</table>\n')
+                    in_table = False
+            f.write('</body></html>')
         return output_path
 
+    @_handler
     def _docx_to_txt_professional(self, input_path, output_path):
-        text = self._extract_docx_text(input_path)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(text)
+        with _text_output(output_path) as f:
+            for i, line in enumerate(self._iter_docx_lines(input_path)):
+                f.write(f"\n{line}" if i else line)
         return output_path
 
+    @_handler
     def _html_to_docx_professional(self, input_path, output_path):
-        with open(input_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
-        soup = BeautifulSoup(html_content, 'html.parser')
         doc = docx.Document()
         
-        for element in soup.find_all(['p', 'h1', 'h2', 'h3', 'div']):
-            text = element.get_text().strip()
-            if text:
+        # One pass over the tree; nested blocks contribute their own text only once
+        for tag, text in html_reader.iter_blocks(input_path):
+            if tag == 'title':
+                continue
+            if tag in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6'):
+                doc.add_heading(text, level=int(tag[1]))
+            else:
                 doc.add_paragraph(text)
         
         doc.save(output_path)
         return output_path
 
+    @_handler
     def _csv_to_xlsx_professional(self, input_path, output_path):
         df = pd.read_csv(input_path)
         df.to_excel(output_path, index=False)
         return output_path
 
+    @_handler
     def _csv_to_pdf_professional(self, input_path, output_path):
         df = pd.read_csv(input_path)
         return self._dataframe_to_pdf(df, output_path)
 
-    def _csv_to_html_professional(self, input_path, output_path):
-        df = pd.read_csv(input_path)
-        html = df.to_html(index=False, table_id='data-table')
-        
-        full_html = f"""
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 40px; }}
-                table {{ border-collapse: collapse; width: 100%; }}
-                th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-                th {{ background-color: #f2f2f2; }}
-            </style>
-        </head>
-        <body>
-            {html}
-        </body>
-        </html>
-        """
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(full_html)
-        return output_path
+    @_handler
+    def _csv_to_html_professional(self, input_path, output_path, page_rows=None):
+        # Read in batches too, so neither the CSV nor the page is ever held whole
+        with text_reader.open_text(input_path) as f, \
+                pd.read_csv(f, chunksize=table_html.BATCH_ROWS) as batches:
+            return self._tables_to_html({None: batches}, output_path, page_rows)
 
-    def _xlsx_to_csv_professional(self, input_path, output_path):
-        df = pd.read_excel(input_path)
-        df.to_csv(output_path, index=False)
-        return output_path
-
-    def _xlsx_to_html_professional(self, input_path, output_path):
-        df = pd.read_excel(input_path)
-        html = df.to_html(index=False, table_id='data-table')
-        
-        full_html = f"""
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 40px; }}
-                table {{ border-collapse: collapse; width: 100%; }}
-                th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-                th {{ background-color: #f2f2f2; }}
-            </style>
-        </head>
-        <body>
-            {html}
-        </body>
-        </html>
-        """
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(full_html)
-        return output_path
+    @_handler
+    def _xlsx_to_html_professional(self, sheets, output_path, page_rows=None):
+        return self._tables_to_html(sheets, output_path, page_rows)
 
+    @_handler
     def _image_to_docx_professional(self, input_path, output_path):
         doc = docx.Document()
         
@@ -904,6 +1282,7 @@ class FileConverter:
         doc.save(output_path)
         return output_path
 
+    @_handler
     def _image_convert(self, input_path, output_path, output_ext):
         # For text formats, try OCR with formatting preservation
         if output_ext in ['txt', 'docx', 'html'] and pytesseract:
@@ -1013,63 +1392,43 @@ class FileConverter:
         if output_ext in ['jpg', 'jpeg'] and img.mode in ('RGBA', 'LA'):
             img = img.convert('RGB')
         
-        img.save(output_path)
+        img.save(output_path, format=_PIL_FORMATS.get(output_ext))
         return output_path
 
+    @_handler
     def _pptx_to_pdf(self, input_path, output_path):
         text = self._extract_pptx_text(input_path)
         return self._text_to_pdf(text, output_path)
 
-    def _pdf_to_pdfa(self, input_path, output_path):
-        if pikepdf:
-            with pikepdf.open(input_path) as pdf:
-                pdf.save(output_path, linearize=True)
-            return output_path
+    @_handler
+    def _pdf_to_pdfa(self, input_path, output_path, pages=None):
+        with profiling.span('optimize') as record:
+            report = pdf_optimize.optimize(input_path, output_path, pages, pdfa=True)
+            if record:
+                record['attrs'].update(report)
+        if hasattr(_conversion, 'reports'):
+            _conversion.reports['optimize'] = report
+        if report['bytes_saved'] >= 0:
+            metrics.PDF_BYTES_SAVED.inc(report['bytes_saved'])
         else:
-            # Simple copy if pikepdf not available
-            shutil.copy2(input_path, output_path)
-            return output_path
+            metrics.PDF_BYTES_ADDED.inc(-report['bytes_saved'])
+        return output_path
     
+    @_handler
     def _text_to_pptx(self, text, output_path):
+        return self._lines_to_pptx(text.split('\n'), output_path)
+
+    @_handler
+    def _lines_to_pptx(self, lines, output_path):
         if not Presentation:
             raise ImportError("python-pptx required for PPTX creation")
-        
-        prs = Presentation()
-        
-        # Split text into slides (by double newlines or every 10 lines)
-        paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-        if not paragraphs:
-            paragraphs = [line.strip() for line in text.split('\n') if line.strip()]
-        
-        # Group paragraphs into slides (max 10 lines per slide)
-        slides_content = []
-        current_slide = []
-        
-        for para in paragraphs:
-            current_slide.append(para)
-            if len(current_slide) >= 10:
-                slides_content.append(current_slide)
-                current_slide = []
-        
-        if current_slide:
-            slides_content.append(current_slide)
-        
-        # Create slides
-        for i, slide_lines in enumerate(slides_content):
-            slide_layout = prs.slide_layouts[1]  # Title and Content layout
-            slide = prs.slides.add_slide(slide_layout)
-            
-            # Set title
-            title = slide.shapes.title
-            title.text = f"Slide {i + 1}"
-            
-            # Set content
-            content = slide.placeholders[1]
-            content.text = '\n'.join(slide_lines)
-        
-        prs.save(output_path)
+
+        # Paragraphs split on blank lines, at most 10 paragraphs or lines per slide
+        with profiling.span('write'):
+            text_writers.write_pptx(text_writers.slide_bodies(lines), output_path)
         return output_path
     
+    @_handler
     def _docx_to_pptx_with_images(self, input_path, output_path):
         if not Presentation:
             raise ImportError("python-pptx required for PPTX creation")
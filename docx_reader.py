@@ -0,0 +1,119 @@
+"""Streaming text reader for .docx files.
+
+Reads the main document part straight from the zip with iterparse instead of
+building python-docx's object model. Body blocks are yielded in document
+order and released as soon as they are read:
+
+    ('paragraph', text)
+    ('row', [cell_text, ...])     one entry per <w:tc>; merged cells appear once
+    ('table_end', None)           after the last row of a top-level table
+
+Nested tables are flattened into the text of the cell that contains them.
+Text boxes are skipped, as python-docx's ``paragraph.text`` does.
+"""
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_OFFICE_DOCUMENT = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+
+_BODY = W + 'body'
+_P = W + 'p'
+_TBL = W + 'tbl'
+_TR = W + 'tr'
+_TC = W + 'tc'
+_T = W + 't'
+_TAB = W + 'tab'
+_BREAKS = (W + 'br', W + 'cr')
+_SKIP = (W + 'txbxContent', W + 'delText', W + 'instrText')
+
+
+def _document_part(archive):
+    """Name of the main document part, per the package relationships"""
+    try:
+        root = ET.fromstring(archive.read('_rels/.rels'))
+        for rel in root.iter(_REL + 'Relationship'):
+            if rel.get('Type') == _OFFICE_DOCUMENT:
+                return posixpath.normpath(rel.get('Target').lstrip('/'))
+    except KeyError:
+        pass
+    return 'word/document.xml'
+
+
+def iter_blocks(source):
+    """Yield the body's paragraphs and table rows in document order.
+
+    source is a path or a binary file object.
+    """
+    with zipfile.ZipFile(source) as archive:
+        with archive.open(_document_part(archive)) as part:
+            yield from _iter_part(part)
+
+
+def _iter_part(part):
+    body = None
+    skip = 0
+    paragraphs = []   # text buffers of the open paragraphs (w:p can nest via text boxes)
+    tables = []       # per open table: list of rows, each a list of cells
+    cells = []        # per open cell: list of paragraph texts
+
+    for event, elem in ET.iterparse(part, events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            if tag in _SKIP:
+                skip += 1
+            elif skip:
+                continue
+            elif tag == _P:
+                paragraphs.append([])
+            elif tag == _TBL:
+                tables.append([])
+            elif tag == _TR:
+                tables[-1].append([])
+            elif tag == _TC:
+                cells.append([])
+            elif tag == _BODY:
+                body = elem
+            continue
+
+        if tag in _SKIP:
+            skip -= 1
+            continue
+        if skip:
+            continue
+
+        if tag == _T:
+            if paragraphs:
+                paragraphs[-1].append(elem.text or '')
+        elif tag == _TAB:
+            if paragraphs:
+                paragraphs[-1].append('\t')
+        elif tag in _BREAKS:
+            if paragraphs:
+                paragraphs[-1].append('\n')
+        elif tag == _P:
+            text = ''.join(paragraphs.pop())
+            if cells:
+                cells[-1].append(text)
+            elif not paragraphs:
+                yield 'paragraph', text
+        elif tag == _TC:
+            tables[-1][-1].append('\n'.join(cells.pop()))
+        elif tag == _TR:
+            row = tables[-1][-1]
+            if len(tables) == 1:
+                yield 'row', row
+                tables[-1].pop()
+        elif tag == _TBL:
+            rows = tables.pop()
+            if cells:
+                # Nested table: fold its rows into the enclosing cell
+                cells[-1].extend('\t'.join(row) for row in rows)
+            else:
+                yield 'table_end', None
+
+        # Drop finished top-level blocks so memory stays flat on large documents
+        if body is not None and tag in (_P, _TBL) and not paragraphs and not tables:
+            body.clear()
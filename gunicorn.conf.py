@@ -0,0 +1,35 @@
+"""Gunicorn settings: import and warm the converters once in the master, then fork.
+
+Bind address and worker count come from gunicorn's own defaults and
+environment ($PORT, $WEB_CONCURRENCY, GUNICORN_CMD_ARGS). Set
+CONVERTER_PRELOAD=0 to load and warm the app in each worker instead.
+"""
+import os
+import tempfile
+
+preload_app = os.environ.get('CONVERTER_PRELOAD', '1') != '0'
+# Conversions are supervised with their own timeout (CONVERT_TIMEOUT); don't kill the worker first
+timeout = int(float(os.environ.get('CONVERT_TIMEOUT', 120))) + 30
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded app is imported, before any worker is forked
+    if preload_app:
+        import warmup
+        state = warmup.warm()
+        server.log.info("Backends warm in %ss: %s", state['seconds'],
+                        ', '.join(f"{name} {step['status']}" for name, step in state['steps'].items()))
+
+
+def post_fork(server, worker):
+    import app
+    import metrics
+    import warmup
+
+    if preload_app and app.converter is not None:
+        # The preloaded converter's temp dir belongs to the master, which removes it on exit
+        app.converter.temp_dir = tempfile.mkdtemp()
+    # Warm-up spans were recorded in the master; each worker reports only its own samples
+    metrics.REGISTRY.collect_delta()
+    if not warmup.is_ready():
+        warmup.start()
@@ -0,0 +1,182 @@
+"""Single-pass HTML text extraction.
+
+Parses with lxml when it is installed (BeautifulSoup's html.parser
+otherwise) and walks the tree once without recursion, emitting the text that
+belongs directly to each block element, in document order. Text inside a
+nested block is reported for that block only, never again for its ancestors,
+so deeply nested <div> exports cost one pass instead of one per level.
+"""
+import re
+
+try:
+    from lxml import html as lxml_html
+    from lxml import etree
+except ImportError:
+    lxml_html = etree = None
+
+BLOCK_TAGS = frozenset((
+    'address', 'article', 'aside', 'blockquote', 'body', 'caption', 'dd', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'header', 'hr', 'html', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'tbody',
+    'tfoot', 'thead', 'title', 'ul',
+))
+CELL_TAGS = ('td', 'th')
+SKIP_TAGS = frozenset(('script', 'style', 'noscript', 'template'))
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _read(source):
+    if isinstance(source, bytes):
+        return source
+    if hasattr(source, 'read'):
+        return source.read()
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def _lxml_events(data):
+    try:
+        data.decode('utf-8')
+        encoding = 'utf-8'
+    except UnicodeDecodeError:
+        encoding = None  # let libxml2 follow <meta charset>
+    parser = lxml_html.HTMLParser(encoding=encoding, remove_comments=True, remove_pis=True)
+    try:
+        root = lxml_html.document_fromstring(data, parser=parser)
+    except etree.ParserError:
+        return  # empty document
+
+    yield 'start', root.tag
+    if root.text:
+        yield 'text', root.text
+    stack = [(root, iter(root))]
+    while stack:
+        element, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            yield 'end', element.tag
+            if stack and element.tail:
+                yield 'text', element.tail
+            continue
+        if not isinstance(child.tag, str) or child.tag in SKIP_TAGS:
+            if child.tail:
+                yield 'text', child.tail
+            continue
+        yield 'start', child.tag
+        if child.text:
+            yield 'text', child.text
+        stack.append((child, iter(child)))
+
+
+def _soup_events(data):
+    from bs4 import BeautifulSoup, NavigableString
+
+    soup = BeautifulSoup(data, 'html.parser')
+    stack = [iter(soup.contents)]
+    names = []
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+            if names:
+                yield 'end', names.pop()
+        elif isinstance(node, NavigableString):
+            # Subclasses are comments, doctypes and script/style bodies
+            if type(node) is NavigableString:
+                yield 'text', str(node)
+        elif node.name not in SKIP_TAGS:
+            yield 'start', node.name
+            names.append(node.name)
+            stack.append(iter(node.contents))
+
+
+def _clean(pieces, preformatted):
+    text = ''.join(pieces)
+    if preformatted:
+        return text.strip('\n')
+    # Only <br> produced newlines; everything else was collapsed to single spaces
+    lines = (' '.join(line.split()) for line in text.split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+def iter_blocks(source):
+    """Yield (tag, text) for every block that has text of its own.
+
+    Table rows come out as ('tr', cell texts joined by tabs). source is HTML
+    bytes, a path or a binary file object.
+    """
+    data = _read(source)
+    events = _lxml_events(data) if lxml_html is not None else _soup_events(data)
+
+    pieces = []
+    blocks = []      # open block tags
+    row = None       # cells of the open table row
+    cell_depth = 0
+    pre_depth = 0
+
+    def flush():
+        text = _clean(pieces, pre_depth > 0)
+        pieces.clear()
+        return (blocks[-1] if blocks else 'body', text) if text else None
+
+    for event, value in events:
+        if event == 'text':
+            pieces.append(value if pre_depth else _WHITESPACE.sub(' ', value))
+            continue
+
+        tag = value
+        if tag == 'br':
+            if event == 'start':
+                pieces.append('\n')
+        elif tag in CELL_TAGS:
+            if event == 'start':
+                if not cell_depth:
+                    block = flush()
+                    if block and row is None:
+                        yield block
+                cell_depth += 1
+            else:
+                cell_depth -= 1
+                if not cell_depth:
+                    block = flush()
+                    text = block[1].replace('\n', ' ') if block else ''
+                    if row is not None:
+                        row.append(text)
+                    elif text:
+                        yield 'td', text
+        elif cell_depth:
+            # Blocks (even whole tables) inside a cell become part of its text
+            if tag in BLOCK_TAGS or tag == 'tr':
+                pieces.append(' ')
+        elif tag == 'tr':
+            block = flush()
+            if block:
+                yield block
+            if event == 'start':
+                row = []
+            else:
+                if row and any(row):
+                    yield 'tr', '\t'.join(row)
+                row = None
+        elif tag in BLOCK_TAGS:
+            block = flush()
+            if block:
+                yield block
+            if event == 'start':
+                blocks.append(tag)
+                pre_depth += tag == 'pre'
+            else:
+                if blocks:
+                    blocks.pop()
+                pre_depth -= tag == 'pre'
+
+    block = flush()
+    if block:
+        yield block
+
+
+def extract_text(source):
+    """Block texts in document order, one per line"""
+    return '\n'.join(text for _, text in iter_blocks(source))
@@ -0,0 +1,306 @@
+"""HTTP load generator for the Flask service.
+
+Starts app.py locally (under gunicorn or the Flask dev server), replays a
+weighted mix of uploads at a fixed concurrency, and reports throughput,
+latency percentiles, error rate and server RSS over time:
+
+    python benchmark.py fixtures --scale small
+    python loadtest.py --server gunicorn --workers 4 --concurrency 16 --duration 60
+    python loadtest.py --server gunicorn --worker-class gthread --threads 4 --mix mix.json
+
+A mix file is a JSON list of {"file": path, "format": target, "weight": n}.
+Without one, a default mix is built from the benchmark fixtures.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import signal
+import argparse
+import threading
+import subprocess
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import rss_bytes
+
+DEFAULT_MIX = [
+    ('document.pdf', 'docx', 2),
+    ('document.pdf', 'txt', 3),
+    ('document.docx', 'pdf', 2),
+    ('table.csv', 'xlsx', 3),
+    ('table.xlsx', 'csv', 2),
+    ('export.html', 'pdf', 1),
+    ('photo.jpg', 'png', 2),
+    ('log.txt', 'docx', 1),
+]
+
+
+def load_mix(mix_path, fixtures_dir):
+    if mix_path:
+        with open(mix_path, 'r', encoding='utf-8') as f:
+            items = [(entry['file'], entry['format'], entry.get('weight', 1)) for entry in json.load(f)]
+    else:
+        items = [(os.path.join(fixtures_dir, name), fmt, weight) for name, fmt, weight in DEFAULT_MIX]
+        items = [item for item in items if os.path.exists(item[0])]
+    if not items:
+        raise SystemExit("Empty mix; generate fixtures with 'python benchmark.py fixtures' or pass --mix")
+
+    mix = []
+    for path, fmt, weight in items:
+        with open(path, 'rb') as f:
+            data = f.read()
+        mix.append({'name': os.path.basename(path), 'format': fmt, 'weight': weight, 'data': data,
+                    'pair': f"{os.path.splitext(path)[1][1:]}->{fmt}"})
+    return mix
+
+
+def encode_multipart(filename, data, fields):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    parts.append((f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                  'Content-Type: application/octet-stream\r\n\r\n').encode())
+    parts.append(data)
+    parts.append(f'\r\n--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def process_tree(pid):
+    """pid plus every descendant (gunicorn master + workers + conversion children)"""
+    children = {}
+    for entry in os.listdir('/proc') if os.path.isdir('/proc') else []:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                # The command name can contain spaces; ppid follows the closing paren
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, pid, interval):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        started = time.monotonic()
+        while not self.stopped.wait(self.interval):
+            total = sum(rss_bytes(pid) or 0 for pid in process_tree(self.pid))
+            self.samples.append((round(time.monotonic() - started, 2), total))
+
+
+def start_server(args):
+    env = dict(os.environ)
+    port = args.port
+    if args.server == 'gunicorn':
+        command = ['gunicorn', '-b', f'127.0.0.1:{port}', '-w', str(args.workers),
+                   '-k', args.worker_class, '--timeout', str(int(args.request_timeout))]
+        if args.worker_class == 'gthread':
+            command += ['--threads', str(args.threads)]
+        command += args.gunicorn_arg + ['app:app']
+    else:
+        command = [sys.executable, '-m', 'flask', '--app', 'app', 'run', '--port', str(port),
+                   '--no-reload', '--with-threads']
+    process = subprocess.Popen(command, cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                               stdout=subprocess.DEVNULL if not args.server_output else None,
+                               stderr=subprocess.STDOUT if not args.server_output else None)
+
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + args.startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited with code {process.returncode}")
+        try:
+            # /ready answers 503 until the backends are warm, so warm-up isn't measured
+            urllib.request.urlopen(f'{url}/ready', timeout=1).read()
+            return process, url
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    process.kill()
+    raise SystemExit(f"Server was not ready within {args.startup_timeout}s")
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    return {
+        'count': len(latencies),
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'max': latencies[-1] if latencies else None,
+    }
+
+
+def run_load(url, mix, args):
+    rng = random.Random(args.seed)
+    rng_lock = threading.Lock()
+    weights = [item['weight'] for item in mix]
+    results = []
+    results_lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+    remaining = [args.requests] if args.requests else None
+
+    def next_item():
+        with rng_lock:
+            if remaining is not None:
+                if remaining[0] <= 0:
+                    return None
+                remaining[0] -= 1
+            elif time.monotonic() >= deadline:
+                return None
+            return rng.choices(mix, weights)[0]
+
+    def client():
+        while True:
+            item = next_item()
+            if item is None:
+                return
+            body, content_type = encode_multipart(item['name'], item['data'], {'format': item['format']})
+            request = urllib.request.Request(f'{url}/convert', data=body, method='POST',
+                                             headers={'Content-Type': content_type})
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=args.request_timeout) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            except Exception as e:
+                status = type(e).__name__
+            with results_lock:
+                results.append((item['pair'], status, time.perf_counter() - started, len(item['data'])))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for _ in range(args.concurrency):
+            pool.submit(client)
+    elapsed = time.perf_counter() - started
+    return results, elapsed
+
+
+def build_report(results, elapsed, rss_samples, args):
+    ok = [latency for _, status, latency, _ in results if status == 200]
+    errors = [status for _, status, _, _ in results if status != 200]
+    report = {
+        'config': {key: getattr(args, key) for key in
+                   ('server', 'workers', 'worker_class', 'threads', 'concurrency', 'duration', 'requests')},
+        'requests': len(results),
+        'elapsed': round(elapsed, 3),
+        'throughput': round(len(ok) / elapsed, 3) if elapsed else 0,
+        'upload_mb_per_s': round(sum(size for *_, size in results) / elapsed / 1e6, 3) if elapsed else 0,
+        'error_rate': round(len(errors) / len(results), 4) if results else 0,
+        'errors': {str(status): errors.count(status) for status in set(errors)},
+        'latency': summarize(ok),
+        'pairs': {},
+        'rss': {
+            'samples': rss_samples,
+            'max': max((rss for _, rss in rss_samples), default=None),
+            'mean': int(sum(rss for _, rss in rss_samples) / len(rss_samples)) if rss_samples else None,
+        },
+    }
+    for pair in sorted({pair for pair, *_ in results}):
+        pair_results = [(status, latency) for p, status, latency, _ in results if p == pair]
+        report['pairs'][pair] = summarize([latency for status, latency in pair_results if status == 200])
+        report['pairs'][pair]['errors'] = sum(1 for status, _ in pair_results if status != 200)
+    return report
+
+
+def print_report(report):
+    latency = report['latency']
+    fmt = lambda value: f"{value * 1000:8.1f}ms" if value is not None else '       -'
+    print(f"\nRequests     {report['requests']} in {report['elapsed']}s")
+    print(f"Throughput   {report['throughput']} req/s ({report['upload_mb_per_s']} MB/s uploaded)")
+    print(f"Error rate   {report['error_rate']:.2%} {report['errors'] or ''}")
+    print(f"Latency      p50 {fmt(latency['p50'])}  p95 {fmt(latency['p95'])}  p99 {fmt(latency['p99'])}")
+    if report['rss']['max']:
+        print(f"Server RSS   mean {report['rss']['mean'] / 1e6:.1f} MB  max {report['rss']['max'] / 1e6:.1f} MB")
+    print()
+    for pair, stats in report['pairs'].items():
+        print(f"  {pair:14} n={stats['count']:<6} p50 {fmt(stats['p50'])}  p95 {fmt(stats['p95'])}  "
+              f"p99 {fmt(stats['p99'])}  errors={stats['errors']}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='loadtest.py', description='Load-test the converter web service')
+    parser.add_argument('--server', choices=['gunicorn', 'dev', 'none'], default='gunicorn',
+                        help="Server to start; 'none' targets --url instead")
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help="Target when --server none")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--worker-class', default='sync', help='gunicorn worker class (sync, gthread, ...)')
+    parser.add_argument('--threads', type=int, default=4, help='Threads per gthread worker')
+    parser.add_argument('--gunicorn-arg', action='append', default=[], help='Extra gunicorn argument')
+    parser.add_argument('--server-output', action='store_true', help="Show the server's own output")
+    parser.add_argument('--startup-timeout', type=float, default=60.0)
+    parser.add_argument('--mix', help='JSON mix file (default: built from benchmark fixtures)')
+    parser.add_argument('--fixtures', default='bench_fixtures')
+    parser.add_argument('--concurrency', '-c', type=int, default=8)
+    parser.add_argument('--duration', '-d', type=float, default=30.0, help='Seconds to run')
+    parser.add_argument('--requests', '-n', type=int, help='Stop after this many requests instead')
+    parser.add_argument('--request-timeout', type=float, default=300.0)
+    parser.add_argument('--rss-interval', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--output', help='Write the full report (including RSS timeline) to JSON')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    mix = load_mix(args.mix, args.fixtures)
+
+    process = None
+    sampler = None
+    url = args.url.rstrip('/')
+    try:
+        if args.server != 'none':
+            process, url = start_server(args)
+            sampler = RssSampler(process.pid, args.rss_interval)
+            sampler.start()
+        print(f"Load testing {url} with {len(mix)} upload types at concurrency {args.concurrency}", flush=True)
+        results, elapsed = run_load(url, mix, args)
+    finally:
+        if sampler is not None:
+            sampler.stopped.set()
+            sampler.join()
+        if process is not None:
+            process.send_signal(signal.SIGTERM)
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    report = build_report(results, elapsed, sampler.samples if sampler else [], args)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved report to {args.output}")
+    return 1 if not results else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
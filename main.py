@@ -86,7 +86,7 @@ class FileConverterApp:
         self.output_format = tk.StringVar()
         format_combo = ttk.Combobox(format_frame, textvariable=self.output_format, 
                                   font=('Arial', 11), width=30, state='readonly')
-        format_combo['values'] = ('PDF', 'DOCX', 'TXT', 'HTML', 'JPG', 'PNG', 'CSV', 'JSON', 'XML', 'XLSX', 'PPTX', 'PDFA')
+        format_combo['values'] = ('PDF', 'DOCX', 'TXT', 'HTML', 'JPG', 'PNG', 'CSV', 'JSON', 'XML', 'XLSX', 'PARQUET', 'FEATHER', 'PPTX', 'PDFA')
         format_combo.grid(row=0, column=1, sticky=tk.W, padx=(15, 0), pady=10)
         
         # Action buttons section
@@ -146,7 +146,7 @@ class FileConverterApp:
             ("All files", "*.*"),
             ("Images", "*.jpg *.jpeg *.png *.bmp *.gif *.tiff *.webp"),
             ("Documents", "*.pdf *.docx *.txt *.html"),
-            ("Data files", "*.csv *.json *.xml *.xlsx"),
+            ("Data files", "*.csv *.json *.xml *.xlsx *.parquet *.feather"),
             ("Audio files", "*.mp3 *.wav *.ogg *.flac"),
             ("Video files", "*.mp4 *.avi *.mov *.mkv")
         ]
@@ -216,17 +216,18 @@ class FileConverterApp:
             self.info_text.config(state=tk.DISABLED)
             self.info_text.see(tk.END)
             
-            temp_output_path = self.converter.convert(
-                self.file_path.get(), 
-                self.output_format.get().lower()
-            )
+            input_path = self.file_path.get()
+            output_format = self.output_format.get().lower()
+            
+            temp_output_path = self.converter.convert(input_path, output_format)
             
             # Read the converted file into memory
             with open(temp_output_path, 'rb') as f:
                 self.converted_file_data = f.read()
             
-            # Store the filename for download
-            self.converted_file_name = os.path.basename(temp_output_path)
+            # Store the filename for download; a multi-sheet workbook can come back as a .zip
+            base_name = os.path.splitext(os.path.basename(input_path))[0]
+            self.converted_file_name = base_name + os.path.splitext(temp_output_path)[1]
             
             # Clean up temporary file
             try:
@@ -0,0 +1,269 @@
+"""In-process metrics with Prometheus text exposition.
+
+Kept dependency-free on purpose: the registry is a handful of dicts behind a
+lock. Conversions that run in other processes (batch pool, CLI workers) send
+their samples back with ``REGISTRY.collect_delta()`` and the parent folds them
+in with ``REGISTRY.merge()``.
+"""
+import os
+import threading
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, registry, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.lock = registry.lock
+        self.values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def reset(self):
+        self.values = {}
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def merge(self, values):
+        for key, value in values.items():
+            self.values[key] = self.values.get(key, 0) + value
+
+    def samples(self):
+        for key, value in sorted(self.values.items()):
+            yield self.name, _format_labels(self.labelnames, key), value
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def merge(self, values):
+        # Gauges describe the local process; samples from children are ignored
+        pass
+
+    def samples(self):
+        for key, value in sorted(self.values.items()):
+            yield self.name, _format_labels(self.labelnames, key), value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, help, labelnames=(), buckets=DURATION_BUCKETS):
+        super().__init__(registry, name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += 1
+            state[2] += value
+
+    def merge(self, values):
+        for key, (counts, count, total) in values.items():
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * len(self.buckets), 0, 0.0]
+            state[0] = [a + b for a, b in zip(state[0], counts)]
+            state[1] += count
+            state[2] += total
+
+    def samples(self):
+        for key, (counts, count, total) in sorted(self.values.items()):
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield (f'{self.name}_bucket',
+                       _format_labels(self.labelnames, key, ('le', _format_value(bound))), bucket_count)
+            yield f'{self.name}_bucket', _format_labels(self.labelnames, key, ('le', '+Inf')), count
+            yield f'{self.name}_count', _format_labels(self.labelnames, key), count
+            yield f'{self.name}_sum', _format_labels(self.labelnames, key), total
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.metrics = {}
+        self.collectors = []
+
+    def _add(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._add(Counter(self, name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self._add(Gauge(self, name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DURATION_BUCKETS):
+        return self._add(Histogram(self, name, help, labelnames, buckets))
+
+    def add_collector(self, func):
+        """Register a callable refreshed right before every render"""
+        self.collectors.append(func)
+
+    def collect_delta(self):
+        """Return and clear everything recorded so far (for child processes)"""
+        with self.lock:
+            delta = {name: metric.values for name, metric in self.metrics.items() if metric.values}
+            for metric in self.metrics.values():
+                metric.reset()
+        return delta
+
+    def reset_lock(self):
+        """Give a forked child a fresh lock; another thread may have held it at fork time"""
+        self.lock = threading.RLock()
+        for metric in self.metrics.values():
+            metric.lock = self.lock
+
+    def merge(self, delta):
+        with self.lock:
+            for name, values in (delta or {}).items():
+                if name in self.metrics:
+                    self.metrics[name].merge(values)
+
+    def render(self):
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+
+        lines = []
+        with self.lock:
+            for metric in self.metrics.values():
+                lines.append(f'# HELP {metric.name} {metric.help}')
+                lines.append(f'# TYPE {metric.name} {metric.kind}')
+                for name, labels, value in metric.samples():
+                    lines.append(f'{name}{labels} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def rss_bytes(pid=None):
+    """Resident set size of a process, or None when it can't be read"""
+    if pid == os.getpid():
+        pid = None
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        if pid is None and resource is not None:
+            # Non-Linux: peak RSS is the best we have (bytes on macOS, KiB elsewhere)
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if os.uname().sysname == 'Darwin' else peak * 1024
+        return None
+
+
+REGISTRY = Registry()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=REGISTRY.reset_lock)
+
+CONVERSION_LABELS = ('input', 'output', 'handler')
+
+CONVERSIONS = REGISTRY.counter(
+    'converter_conversions_total', 'Conversions by input/output format, handler and status',
+    CONVERSION_LABELS + ('status',))
+DURATION = REGISTRY.histogram(
+    'converter_conversion_duration_seconds', 'Wall-clock time spent in FileConverter.convert',
+    CONVERSION_LABELS)
+BYTES_IN = REGISTRY.counter(
+    'converter_input_bytes_total', 'Bytes read by conversions', CONVERSION_LABELS)
+BYTES_OUT = REGISTRY.counter(
+    'converter_output_bytes_total', 'Bytes written by successful conversions', CONVERSION_LABELS)
+ERRORS = REGISTRY.counter(
+    'converter_errors_total', 'Failed conversions by exception type', ('input', 'output', 'error'))
+FALLBACKS = REGISTRY.counter(
+    'converter_fallbacks_total', 'How often each fallback conversion path fired', ('fallback',))
+STAGE_DURATION = REGISTRY.histogram(
+    'converter_stage_duration_seconds', 'Time spent in each traced conversion stage', ('stage', 'status'))
+COALESCED = REGISTRY.counter(
+    'converter_coalesced_requests_total', 'Requests served by an identical conversion already in flight',
+    ('scope',))
+PDF_BYTES_SAVED = REGISTRY.counter(
+    'converter_pdf_optimize_saved_bytes_total', 'Bytes removed from PDFs by the optimizer')
+PDF_BYTES_ADDED = REGISTRY.counter(
+    'converter_pdf_optimize_added_bytes_total', 'Bytes PDF/A output grew by when it could not be made smaller')
+QUEUE_DEPTH = REGISTRY.gauge(
+    'converter_queue_depth', 'Conversions accepted but not yet finished', ('queue',))
+WORKER_RSS = REGISTRY.gauge(
+    'converter_worker_rss_bytes', 'Resident memory of this worker and its conversion processes',
+    ('pid', 'role'))
+
+
+def observe_conversion(input_ext, output_ext, handler, seconds, bytes_in, bytes_out, status, error=None):
+    labels = {'input': input_ext.lstrip('.'), 'output': output_ext, 'handler': handler}
+    CONVERSIONS.inc(status=status, **labels)
+    DURATION.observe(seconds, **labels)
+    BYTES_IN.inc(bytes_in, **labels)
+    if bytes_out:
+        BYTES_OUT.inc(bytes_out, **labels)
+    if error is not None:
+        ERRORS.inc(input=labels['input'], output=output_ext, error=type(error).__name__)
+
+
+def watch_processes(role, get_pids):
+    """Report RSS for a group of processes (e.g. a pool) on every render"""
+    def collect():
+        with REGISTRY.lock:
+            for key in [key for key in WORKER_RSS.values if key[1] == role]:
+                del WORKER_RSS.values[key]
+        for pid in get_pids():
+            rss = rss_bytes(pid)
+            if rss is not None:
+                WORKER_RSS.set(rss, pid=pid, role=role)
+    REGISTRY.add_collector(collect)
+
+
+# Looked up on every render so forked workers report their own pid
+watch_processes('web', lambda: [os.getpid()])
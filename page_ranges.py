@@ -0,0 +1,44 @@
+"""Page range selection for PDF inputs.
+
+Ranges are written the way print dialogs take them: 1-based and inclusive,
+separated by commas, with an open end running to the last page, e.g.
+"1-3,7,10-". Selected pages always come out in document order, once each.
+"""
+import re
+
+_SPAN = re.compile(r'(\d+)?\s*(-)?\s*(\d+)?')
+
+
+def parse(pages):
+    """[(first, last)] 1-based spans; last is None for "to the end".
+
+    pages is a range string, a page number or a list of either.
+    """
+    if isinstance(pages, int):
+        pages = [pages]
+    if not isinstance(pages, str):
+        pages = ','.join(str(part) for part in pages)
+    spans = []
+    for part in pages.split(','):
+        match = _SPAN.fullmatch(part.strip())
+        if not part.strip() or not match or not (match.group(1) or match.group(3)):
+            raise ValueError(f"Invalid page range: {pages!r} (expected e.g. '1-3,7,10-')")
+        first, dash, last = match.groups()
+        first = int(first) if first else 1
+        last = int(last) if last else (None if dash else first)
+        if first < 1 or (last is not None and last < first):
+            raise ValueError(f"Invalid page range: {part.strip()!r}")
+        spans.append((first, last))
+    return spans
+
+
+def select(pages, count):
+    """0-based indices of the selected pages of a count-page document; all of them for no selection"""
+    if pages is None or pages == '' or pages == []:
+        return list(range(count))
+    selected = set()
+    for first, last in parse(pages):
+        if first > count or (last is not None and last > count):
+            raise ValueError(f"Page {last or first} out of range (document has {count} pages)")
+        selected.update(range(first - 1, last if last is not None else count))
+    return sorted(selected)
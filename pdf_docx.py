@@ -0,0 +1,195 @@
+"""Chunked PDF to DOCX conversion with pdf2docx.
+
+pdf2docx lays pages out one at a time in pure Python, so a long document is
+split into runs of consecutive pages that are converted to separate DOCX
+files across a process pool, then merged back in page order. Merging
+appends each chunk's body to the first one. The section a chunk ended with
+becomes a section break, so page sizes and margins carry over. Images and
+other related parts are renamed per chunk, and styles are merged by
+styleId, with the first definition winning.
+"""
+import os
+import re
+import shutil
+import itertools
+import zipfile
+import posixpath
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+
+import page_ranges
+
+# Shorter documents are converted in-process; pool start-up would cost more
+PARALLEL_MIN_PAGES = 20
+# Fewest pages worth a chunk of their own
+CHUNK_MIN_PAGES = 10
+
+_REL_ID = re.compile(r'\br:(?:id|embed|link|pict)="([^"]+)"')
+_RELATIONSHIP = re.compile(r'<Relationship\b[^>]*/>')
+_STYLE = re.compile(r'<w:style\b[^>]*?(?:/>|>.*?</w:style>)', re.S)
+_STYLE_ID = re.compile(r'\bw:styleId="([^"]+)"')
+_DEFAULT = re.compile(r'<Default\b[^>]*/>')
+_ATTRIBUTE = re.compile(r'([\w:]+)="([^"]*)"')
+_DOC_PR_ID = re.compile(r'(<wp:docPr\b[^>]*?\bid=")\d+')
+
+
+def chunks(pages, workers, min_pages=CHUNK_MIN_PAGES):
+    """Split page indices into at most workers consecutive runs of about equal length"""
+    count = max(1, min(workers, len(pages) // min_pages))
+    size = -(-len(pages) // count)
+    return [pages[i:i + size] for i in range(0, len(pages), size)]
+
+
+def _convert_pages(pdf_path, docx_path, pages):
+    from pdf2docx import Converter
+
+    cv = Converter(pdf_path)
+    try:
+        cv.convert(docx_path, start=0, end=None, pages=pages)
+    finally:
+        cv.close()
+    return docx_path
+
+
+def convert(pdf_path, docx_path, pages=None, workers=None):
+    """Convert the pages of pdf_path (a page range, default all) to docx_path.
+
+    With workers > 1 and at least PARALLEL_MIN_PAGES selected pages, chunks
+    are converted across a process pool and merged.
+    """
+    with fitz.open(pdf_path) as doc:
+        selection = page_ranges.select(pages, len(doc))
+    if not (workers and workers > 1 and len(selection) >= PARALLEL_MIN_PAGES):
+        return _convert_pages(pdf_path, docx_path, selection if pages else None)
+
+    parts = chunks(selection, workers)
+    directory = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(docx_path)))
+    try:
+        paths = [os.path.join(directory, f'chunk{n}.docx') for n in range(len(parts))]
+        with ProcessPoolExecutor(max_workers=len(parts)) as pool:
+            list(pool.map(_convert_pages, [pdf_path] * len(parts), paths, parts))
+        merge(paths, docx_path)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return docx_path
+
+
+def _split_body(xml):
+    """(head, content, closing sectPr, tail) of a document.xml"""
+    start = xml.index('>', xml.index('<w:body')) + 1
+    end = xml.rindex('</w:body>')
+    section = xml.rfind('<w:sectPr', start, end)
+    if section < 0:
+        section = end
+    return xml[:start], xml[start:section], xml[section:end], xml[end:]
+
+
+def _attributes(element):
+    return dict(_ATTRIBUTE.findall(element))
+
+
+def _part_name(target):
+    """Zip name of a relationship target relative to word/document.xml"""
+    if target.startswith('/'):
+        return target[1:]
+    return posixpath.normpath(posixpath.join('word', target))
+
+
+def _renamed(target, n):
+    directory, name = posixpath.split(target)
+    return posixpath.join(directory, f'chunk{n}-{name}')
+
+
+def _merge_styles(styles, other):
+    known = set(_STYLE_ID.findall(styles))
+    missing = []
+    for style in _STYLE.findall(other):
+        style_id = _STYLE_ID.search(style)
+        if style_id and style_id.group(1) not in known:
+            known.add(style_id.group(1))
+            missing.append(style)
+    return styles.replace('</w:styles>', ''.join(missing) + '</w:styles>')
+
+
+def _merge_content_types(content_types, other, overrides):
+    """Add other's extension defaults we lack, plus Overrides for renamed parts"""
+    known = {_attributes(default)['Extension'].lower() for default in _DEFAULT.findall(content_types)}
+    added = [default for default in _DEFAULT.findall(other)
+             if _attributes(default)['Extension'].lower() not in known]
+    for old, new in overrides:
+        match = re.search(r'<Override\b[^>]*PartName="/%s"[^>]*/>' % re.escape(old), other)
+        if match:
+            added.append(match.group(0).replace(f'"/{old}"', f'"/{new}"'))
+    return content_types.replace('</Types>', ''.join(added) + '</Types>')
+
+
+def _take_chunk(archive, n, files):
+    """Body and closing section of one chunk, with its relationships moved into files.
+
+    Returns (content, section, relationship elements, [(old part, new part)]).
+    """
+    _, content, section, _ = _split_body(archive.read('word/document.xml').decode('utf-8'))
+    rels = {}
+    for element in _RELATIONSHIP.findall(archive.read('word/_rels/document.xml.rels').decode('utf-8')):
+        attributes = _attributes(element)
+        rels[attributes['Id']] = (element, attributes)
+
+    relationships, renamed = [], []
+    for rel_id in sorted(set(_REL_ID.findall(content + section))):
+        element, attributes = rels[rel_id]
+        element = element.replace(f'Id="{rel_id}"', f'Id="rIdChunk{n}-{rel_id}"')
+        if attributes.get('TargetMode') != 'External':
+            target = attributes['Target']
+            part = _part_name(target)
+            files[_part_name(_renamed(target, n))] = archive.read(part)
+            renamed.append((part, _part_name(_renamed(target, n))))
+            element = element.replace(f'Target="{target}"', f'Target="{_renamed(target, n)}"')
+        relationships.append(element)
+
+    def rename(match):
+        return match.group(0).replace(f'"{match.group(1)}"', f'"rIdChunk{n}-{match.group(1)}"')
+
+    return _REL_ID.sub(rename, content), _REL_ID.sub(rename, section), relationships, renamed
+
+
+def merge(paths, output):
+    """Concatenate DOCX files written by pdf2docx, in order, into output"""
+    with zipfile.ZipFile(paths[0]) as base:
+        files = {name: base.read(name) for name in base.namelist()}
+    head, content, section, tail = _split_body(files.pop('word/document.xml').decode('utf-8'))
+    rels = files['word/_rels/document.xml.rels'].decode('utf-8')
+    styles = files['word/styles.xml'].decode('utf-8')
+    content_types = files['[Content_Types].xml'].decode('utf-8')
+
+    body = [content]
+    relationships = []
+    for n, path in enumerate(paths[1:], 2):
+        with zipfile.ZipFile(path) as archive:
+            content, next_section, chunk_relationships, renamed = _take_chunk(archive, n, files)
+            if 'word/styles.xml' in archive.namelist():
+                styles = _merge_styles(styles, archive.read('word/styles.xml').decode('utf-8'))
+            content_types = _merge_content_types(
+                content_types, archive.read('[Content_Types].xml').decode('utf-8'), renamed)
+        # The previous chunk's last section closes here, as a section break
+        if section:
+            body.append(f'<w:p><w:pPr>{section}</w:pPr></w:p>')
+        body.append(content)
+        relationships.extend(chunk_relationships)
+        section = next_section
+
+    # Drawing ids have to be unique across the merged document
+    ids = itertools.count(1)
+    document = _DOC_PR_ID.sub(lambda match: f'{match.group(1)}{next(ids)}', head + ''.join(body) + section + tail)
+
+    files['word/_rels/document.xml.rels'] = rels.replace(
+        '</Relationships>', ''.join(relationships) + '</Relationships>').encode('utf-8')
+    files['word/styles.xml'] = styles.encode('utf-8')
+    files['[Content_Types].xml'] = content_types.encode('utf-8')
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', files.pop('[Content_Types].xml'))
+        archive.writestr('word/document.xml', document.encode('utf-8'))
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return output
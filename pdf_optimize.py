@@ -0,0 +1,215 @@
+"""PDF size optimization and PDF/A output.
+
+PyMuPDF reads objects from the file as they are needed, so images are
+decoded and re-encoded one at a time rather than all held in memory.
+
+- Images drawn at more than 1.5 times the target resolution (IMAGE_DPI by
+  default) are downsampled to it. They are re-encoded as JPEG if they were
+  JPEG, losslessly otherwise, and kept only when smaller.
+- Embedded fonts are subset to the glyphs the document uses. This needs
+  fontTools.
+- Saving drops unreferenced objects, merges identical ones (repeated fonts
+  and images included) and compresses every stream.
+- With pikepdf installed, the result is rewritten with object streams and
+  linearized for fast web view.
+
+A document that comes out no smaller (one that was already compact, where
+the rewrite only adds overhead) is also saved without the optimizations,
+and the smaller of the two files is kept.
+
+PDF/A output also gets PDF/A-2b identification in its XMP metadata and an
+sRGB OutputIntent. That declares the profile; it doesn't make a document
+that breaks it (transparency, unembedded fonts) compliant.
+"""
+import io
+import os
+import tempfile
+from xml.sax.saxutils import escape
+
+import fitz  # PyMuPDF
+from PIL import Image, ImageCms
+
+import page_ranges
+
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+IMAGE_DPI = 150
+# Images up to this multiple of the target resolution are left alone; re-encoding them gains little
+IMAGE_DPI_SLACK = 1.5
+JPEG_QUALITY = 80
+
+_SRGB = 'sRGB IEC61966-2.1'
+
+
+def _image_resolutions(doc):
+    """{image xref: (highest pixels per inch it is drawn at, page number)}"""
+    resolutions = {}
+    for page in doc:
+        for info in page.get_image_info(xrefs=True):
+            xref = info.get('xref')
+            bbox = fitz.Rect(info['bbox'])
+            if not xref or bbox.is_empty:
+                continue
+            resolution = max(info['width'], info['height']) / (max(bbox.width, bbox.height) / 72)
+            if resolution > resolutions.get(xref, (0, None))[0]:
+                resolutions[xref] = (resolution, page.number)
+    return resolutions
+
+
+def _downsample(doc, page, xref, resolution, dpi):
+    """Re-encode one image at dpi; bytes saved, 0 when it was kept as is"""
+    info = doc.extract_image(xref)
+    if not info or info.get('smask') or info.get('colorspace') not in (1, 3):
+        return 0  # masks, transparency, CMYK and indexed images keep their encoding
+    pix = fitz.Pixmap(doc, xref)
+    if pix.alpha or pix.n not in (1, 3):
+        return 0
+    image = Image.frombytes('L' if pix.n == 1 else 'RGB', (pix.width, pix.height), pix.samples)
+    scale = dpi / resolution
+    image = image.resize((max(1, round(pix.width * scale)), max(1, round(pix.height * scale))), Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    if info['ext'] in ('jpeg', 'jpg'):
+        image.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+    else:
+        image.save(buffer, 'PNG', optimize=True)
+    before = len(doc.xref_stream_raw(xref))
+    if buffer.tell() >= before:
+        return 0
+    page.replace_image(xref, stream=buffer.getvalue())
+    return before - buffer.tell()
+
+
+def downsample_images(doc, dpi=IMAGE_DPI):
+    """Downsample every image drawn above dpi * IMAGE_DPI_SLACK; (images replaced, bytes saved)"""
+    replaced = saved = 0
+    for xref, (resolution, page_number) in _image_resolutions(doc).items():
+        if resolution <= dpi * IMAGE_DPI_SLACK:
+            continue
+        gained = _downsample(doc, doc[page_number], xref, resolution, dpi)
+        if gained:
+            replaced += 1
+            saved += gained
+    return replaced, saved
+
+
+def _xmp(metadata):
+    """PDF/A-2b XMP packet mirroring the document info title, author and producer"""
+    fields = ''
+    if metadata.get('title'):
+        fields += f'<dc:title><rdf:Alt><rdf:li xml:lang="x-default">{escape(metadata["title"])}</rdf:li></rdf:Alt></dc:title>'
+    if metadata.get('author'):
+        fields += f'<dc:creator><rdf:Seq><rdf:li>{escape(metadata["author"])}</rdf:li></rdf:Seq></dc:creator>'
+    if metadata.get('producer'):
+        fields += f'<pdf:Producer>{escape(metadata["producer"])}</pdf:Producer>'
+    return (
+        '<?xpacket begin="\ufeff" id="W5M0MpCehiHzreSzNTczkc9d"?>'
+        '<x:xmpmeta xmlns:x="adobe:ns:meta/">'
+        '<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">'
+        '<rdf:Description rdf:about="" xmlns:pdfaid="http://www.aiim.org/pdfa/ns/id/" '
+        'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:pdf="http://ns.adobe.com/pdf/1.3/">'
+        f'<pdfaid:part>2</pdfaid:part><pdfaid:conformance>B</pdfaid:conformance>{fields}'
+        '</rdf:Description></rdf:RDF></x:xmpmeta>'
+        '<?xpacket end="w"?>'
+    )
+
+
+def mark_pdfa(doc):
+    """Add PDF/A-2b XMP identification and an sRGB OutputIntent"""
+    doc.set_xml_metadata(_xmp(doc.metadata or {}))
+
+    profile = doc.get_new_xref()
+    doc.update_object(profile, '<< /N 3 >>')
+    doc.update_stream(profile, ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB')).tobytes())
+    intent = doc.get_new_xref()
+    doc.update_object(intent, f'<< /Type /OutputIntent /S /GTS_PDFA1 /OutputConditionIdentifier ({_SRGB}) '
+                              f'/Info ({_SRGB}) /DestOutputProfile {profile} 0 R >>')
+    doc.xref_set_key(doc.pdf_catalog(), 'OutputIntents', f'[{intent} 0 R]')
+
+
+def _save(doc, output_path):
+    save_options = {'garbage': 4, 'deflate': True, 'deflate_images': True, 'deflate_fonts': True}
+    if pikepdf is None:
+        doc.save(output_path, **save_options)
+        return
+
+    # PyMuPDF can't write object streams; pikepdf rewrites the saved file with them
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, saved_path = tempfile.mkstemp(suffix='.pdf', dir=directory)
+    os.close(fd)
+    try:
+        doc.save(saved_path, **save_options)
+        with pikepdf.open(saved_path) as pdf:
+            pdf.save(output_path, object_stream_mode=pikepdf.ObjectStreamMode.generate,
+                     compress_streams=True, linearize=True)
+    finally:
+        os.remove(saved_path)
+
+
+def _open(input_path, pages):
+    doc = fitz.open(input_path)
+    if pages:
+        doc.select(page_ranges.select(pages, len(doc)))
+    return doc
+
+
+def _save_plain(input_path, output_path, pages, pdfa):
+    """Replace output_path with a plain save of the selected pages if that is smaller; True if it was"""
+    fd, plain_path = tempfile.mkstemp(suffix='.pdf', dir=os.path.dirname(os.path.abspath(output_path)))
+    os.close(fd)
+    try:
+        doc = _open(input_path, pages)
+        try:
+            if pdfa:
+                mark_pdfa(doc)
+            doc.save(plain_path)
+        finally:
+            doc.close()
+        if os.path.getsize(plain_path) >= os.path.getsize(output_path):
+            return False
+        os.replace(plain_path, output_path)
+        return True
+    finally:
+        if os.path.exists(plain_path):
+            os.remove(plain_path)
+
+
+def optimize(input_path, output_path, pages=None, pdfa=False, image_dpi=IMAGE_DPI):
+    """Write a smaller copy of input_path (the given page range, default all).
+
+    Returns a report: bytes_in, bytes_out, bytes_saved (negative when the
+    output grew), optimized (False when the plain save was kept),
+    images_downsampled, image_bytes_saved and fonts_subset.
+    """
+    doc = _open(input_path, pages)
+    try:
+        images, image_bytes = downsample_images(doc, image_dpi)
+        try:
+            doc.subset_fonts()
+            fonts_subset = True
+        except ImportError:
+            fonts_subset = False  # fontTools is not installed
+        if pdfa:
+            mark_pdfa(doc)
+        _save(doc, output_path)
+    finally:
+        doc.close()
+
+    bytes_in = os.path.getsize(input_path)
+    # The optimized file stays unless it is no smaller than the input and a plain save beats it
+    optimized = os.path.getsize(output_path) < bytes_in or not _save_plain(input_path, output_path, pages, pdfa)
+    if not optimized:
+        images, image_bytes, fonts_subset = 0, 0, False
+    bytes_out = os.path.getsize(output_path)
+    return {
+        'bytes_in': bytes_in,
+        'bytes_out': bytes_out,
+        'bytes_saved': bytes_in - bytes_out,
+        'optimized': optimized,
+        'images_downsampled': images,
+        'image_bytes_saved': image_bytes,
+        'fonts_subset': fonts_subset,
+    }
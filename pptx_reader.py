@@ -0,0 +1,163 @@
+"""Direct-XML text extraction for .pptx files.
+
+Only the presentation part, the slide parts and their notes are read from
+the zip; images, layouts and masters are never touched. Slide order comes
+from ``p:sldIdLst`` in presentation.xml, not from part names. Text is
+collected from shapes (including grouped shapes), table cells and speaker
+notes. Large decks can be parsed across processes.
+"""
+import os
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+A = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+P = '{http://schemas.openxmlformats.org/presentationml/2006/main}'
+R = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+MC = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_RELS_BASE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+
+# Decks with fewer slides are parsed in-process; pool start-up would cost more
+PARALLEL_MIN_SLIDES = 100
+
+
+def _rels(archive, part):
+    """{rId: (type, target part name)} for one part"""
+    directory, name = posixpath.split(part)
+    try:
+        root = ET.fromstring(archive.read(posixpath.join(directory, '_rels', f"{name}.rels")))
+    except KeyError:
+        return {}
+    rels = {}
+    for rel in root.iter(_REL + 'Relationship'):
+        if rel.get('TargetMode') == 'External':
+            continue
+        target = rel.get('Target')
+        if target.startswith('/'):
+            target = target.lstrip('/')
+        else:
+            target = posixpath.normpath(posixpath.join(directory, target))
+        rels[rel.get('Id')] = (rel.get('Type'), target)
+    return rels
+
+
+def _presentation_part(archive):
+    for rel_type, target in _rels(archive, '').values():
+        if rel_type == _RELS_BASE + 'officeDocument':
+            return target
+    return 'ppt/presentation.xml'
+
+
+def slide_parts(archive):
+    """Slide part names in presentation order"""
+    presentation = _presentation_part(archive)
+    rels = _rels(archive, presentation)
+    root = ET.fromstring(archive.read(presentation))
+    parts = []
+    for slide_id in root.iter(P + 'sldId'):
+        rel = rels.get(slide_id.get(R + 'id'))
+        if rel is not None:
+            parts.append(rel[1])
+    return parts
+
+
+def _paragraphs(tx_body):
+    for paragraph in tx_body.iter(A + 'p'):
+        pieces = []
+        for node in paragraph.iter():
+            if node.tag == A + 't':
+                pieces.append(node.text or '')
+            elif node.tag == A + 'br':
+                pieces.append('\n')
+        yield ''.join(pieces)
+
+
+def _shape_texts(container):
+    """Text of every shape under a shape tree, in z-order"""
+    for shape in container:
+        tag = shape.tag
+        if tag == P + 'sp':
+            body = shape.find(P + 'txBody')
+            if body is not None:
+                text = '\n'.join(_paragraphs(body))
+                if text.strip():
+                    yield text
+        elif tag == P + 'grpSp':
+            yield from _shape_texts(shape)
+        elif tag == P + 'graphicFrame':
+            for row in shape.iter(A + 'tr'):
+                cells = []
+                for cell in row.findall(A + 'tc'):
+                    if cell.get('hMerge') or cell.get('vMerge'):
+                        continue  # covered by a merged cell that already has the text
+                    body = cell.find(A + 'txBody')
+                    cells.append(' '.join(' '.join(_paragraphs(body)).split()) if body is not None else '')
+                line = '\t'.join(cells)
+                if line.strip():
+                    yield line
+        elif tag == MC + 'AlternateContent':
+            # Prefer the fallback every consumer understands, so nothing is read twice
+            branch = shape.find(MC + 'Fallback')
+            if branch is None:
+                branch = shape.find(MC + 'Choice')
+            if branch is not None:
+                yield from _shape_texts(branch)
+
+
+def _notes_texts(root):
+    """Body placeholder text of a notes slide (not the slide image or number)"""
+    for shape in root.iter(P + 'sp'):
+        placeholder = shape.find(f'{P}nvSpPr/{P}nvPr/{P}ph')
+        if placeholder is None or placeholder.get('type') != 'body':
+            continue
+        body = shape.find(P + 'txBody')
+        if body is not None:
+            text = '\n'.join(_paragraphs(body))
+            if text.strip():
+                yield text
+
+
+def _read_slide(archive, part):
+    root = ET.fromstring(archive.read(part))
+    tree = root.find(f'{P}cSld/{P}spTree')
+    slide = {'texts': list(_shape_texts(tree)) if tree is not None else [], 'notes': []}
+    for rel_type, target in _rels(archive, part).values():
+        if rel_type == _RELS_BASE + 'notesSlide':
+            slide['notes'] = list(_notes_texts(ET.fromstring(archive.read(target))))
+    return slide
+
+
+def _read_slides(path, parts):
+    with zipfile.ZipFile(path) as archive:
+        return [_read_slide(archive, part) for part in parts]
+
+
+def read_slides(source, workers=None):
+    """[{'texts': [...], 'notes': [...]}, ...] in presentation order.
+
+    With workers > 1, a path source and at least PARALLEL_MIN_SLIDES slides,
+    slides are parsed in chunks across a process pool.
+    """
+    with zipfile.ZipFile(source) as archive:
+        parts = slide_parts(archive)
+        parallel = (workers and workers > 1 and len(parts) >= PARALLEL_MIN_SLIDES
+                    and isinstance(source, (str, os.PathLike)))
+        if not parallel:
+            return [_read_slide(archive, part) for part in parts]
+
+    size = -(-len(parts) // workers)
+    chunks = [parts[i:i + size] for i in range(0, len(parts), size)]
+    with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+        return [slide for chunk in pool.map(_read_slides, [source] * len(chunks), chunks) for slide in chunk]
+
+
+def extract_text(source, workers=None):
+    """Slide text followed by its notes; slides separated by a blank line"""
+    slides = []
+    for slide in read_slides(source, workers):
+        lines = slide['texts'] + [f"Notes: {note}" for note in slide['notes']]
+        if lines:
+            slides.append('\n'.join(lines))
+    return '\n\n'.join(slides)
@@ -0,0 +1,199 @@
+"""Stage-level timing spans and opt-in per-request profiling.
+
+Wrap any step in ``span()``; finished spans are handed to every configured
+sink. Sinks are chosen with ``CONVERTER_TRACE`` (comma-separated):
+
+    metrics            stage histogram on /metrics (default)
+    log                one line per span on the ``converter.trace`` logger
+    json:/path.jsonl   one JSON object per span appended to a file
+
+``capture()`` runs cProfile and/or tracemalloc around a block and saves the
+results for offline analysis (``python -m pstats file.prof``).
+"""
+import os
+import json
+import time
+import uuid
+import cProfile
+import logging
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+import metrics
+
+_local = threading.local()
+_sinks = []
+
+
+class LogSink:
+    def __init__(self, logger=None):
+        self.logger = logger or logging.getLogger('converter.trace')
+
+    def emit(self, record):
+        indent = '  ' * record['depth']
+        attrs = ' '.join(f'{key}={value}' for key, value in record['attrs'].items())
+        self.logger.info('%s%s %.4fs cpu=%.4fs %s %s', indent, record['name'], record['seconds'],
+                         record['cpu_seconds'], record['status'], attrs)
+
+
+class JsonFileSink:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def emit(self, record):
+        line = json.dumps(record, default=str) + '\n'
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+
+class MetricsSink:
+    def emit(self, record):
+        metrics.STAGE_DURATION.observe(record['seconds'], stage=record['name'], status=record['status'])
+
+
+def add_sink(sink):
+    _sinks.append(sink)
+
+
+def set_sinks(sinks):
+    _sinks[:] = list(sinks)
+
+
+def configure(spec):
+    """Build sinks from a CONVERTER_TRACE style string"""
+    sinks = []
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        kind, _, arg = item.partition(':')
+        if kind == 'metrics':
+            sinks.append(MetricsSink())
+        elif kind == 'log':
+            sinks.append(LogSink(logging.getLogger(arg) if arg else None))
+        elif kind == 'json':
+            sinks.append(JsonFileSink(arg or 'trace.jsonl'))
+        elif kind != 'none':
+            raise ValueError(f"Unknown trace sink: {kind}")
+    set_sinks(sinks)
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time a block and report it to the configured sinks"""
+    if not _sinks:
+        yield None
+        return
+
+    stack = _stack()
+    if not stack:
+        _local.trace_id = getattr(_local, 'request_trace_id', None) or uuid.uuid4().hex[:16]
+    record = {
+        'trace': _local.trace_id,
+        'name': name,
+        'parent': stack[-1]['name'] if stack else None,
+        'depth': len(stack),
+        'attrs': attrs,
+        'start': time.time(),
+        'status': 'ok',
+    }
+    stack.append(record)
+    started = time.perf_counter()
+    cpu_started = time.thread_time()
+    try:
+        yield record
+    except BaseException as e:
+        record['status'] = 'error'
+        record['error'] = type(e).__name__
+        raise
+    finally:
+        record['seconds'] = time.perf_counter() - started
+        record['cpu_seconds'] = time.thread_time() - cpu_started
+        stack.pop()
+        for sink in list(_sinks):
+            try:
+                sink.emit(record)
+            except Exception as e:
+                print(f"Trace sink failed: {e}")
+
+
+@contextmanager
+def trace(trace_id=None):
+    """Group every span opened in this block under one trace id"""
+    previous = getattr(_local, 'request_trace_id', None)
+    _local.request_trace_id = trace_id or uuid.uuid4().hex[:16]
+    try:
+        yield _local.request_trace_id
+    finally:
+        _local.request_trace_id = previous
+
+
+# cProfile and tracemalloc are process-wide; only one capture runs at a time
+_capture_lock = threading.Lock()
+
+
+@contextmanager
+def capture(kinds, directory, label='request'):
+    """Profile a block with cProfile ('cpu') and/or tracemalloc ('memory').
+
+    Yields a dict that lists the files written once the block finishes. When
+    another capture is already running the block runs unprofiled and the dict
+    has ``skipped`` set.
+    """
+    kinds = {kind.strip().lower() for kind in kinds.split(',') if kind.strip()}
+    result = {'id': f"{time.strftime('%Y%m%d-%H%M%S')}_{label}_{uuid.uuid4().hex[:8]}", 'files': []}
+    if not kinds & {'cpu', 'memory'} or not _capture_lock.acquire(blocking=False):
+        result['skipped'] = True
+        yield result
+        return
+
+    profiler = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        if 'memory' in kinds:
+            tracemalloc.start(25)
+        if 'cpu' in kinds:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            yield result
+        finally:
+            base = os.path.join(directory, result['id'])
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(f"{base}.prof")
+                result['files'].append(f"{base}.prof")
+            if 'memory' in kinds:
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                snapshot.dump(f"{base}.tracemalloc")
+                with open(f"{base}.memory.txt", 'w', encoding='utf-8') as f:
+                    f.write(f"peak traced memory: {peak} bytes\n\n")
+                    for stat in snapshot.statistics('lineno')[:50]:
+                        f.write(f"{stat}\n")
+                result['files'] += [f"{base}.tracemalloc", f"{base}.memory.txt"]
+    finally:
+        _capture_lock.release()
+
+
+def _reset_locks():
+    """Locks held by other threads at fork time would never be released in the child"""
+    global _capture_lock
+    _capture_lock = threading.Lock()
+    for sink in _sinks:
+        if isinstance(sink, JsonFileSink):
+            sink.lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_locks)
+
+configure(os.environ.get('CONVERTER_TRACE', 'metrics'))
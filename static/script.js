@@ -1,6 +1,10 @@
 let selectedFile = null;
 let selectedFormat = null;
 let downloadPath = null;
+let previewUrl = null;
+let previewOffset = 0;
+let previewSize = 0;
+let currentJobId = null;
 
 // DOM elements
 const uploadArea = document.getElementById('uploadArea');
@@ -20,6 +24,9 @@ const resultSection = document.getElementById('resultSection');
 const resultFileName = document.getElementById('resultFileName');
 const textPreview = document.getElementById('textPreview');
 const previewText = document.getElementById('previewText');
+const previewMore = document.getElementById('previewMore');
+const previewStatus = document.getElementById('previewStatus');
+const loadMoreBtn = document.getElementById('loadMoreBtn');
 
 // Event listeners
 fileInput.addEventListener('change', handleFileSelect);
@@ -125,6 +132,8 @@ async function convertFile() {
     const formData = new FormData();
     formData.append('file', selectedFile);
     formData.append('format', selectedFormat);
+    currentJobId = crypto.randomUUID ? crypto.randomUUID() : Date.now().toString(36) + Math.random().toString(36).slice(2);
+    formData.append('job_id', currentJobId);
     
     try {
         const response = await fetch('/convert', {
@@ -138,6 +147,9 @@ async function convertFile() {
             downloadPath = result.download_url;
             showResult(result);
             showNotification('✅', 'File converted successfully!', 'success');
+        } else if (result.error_type === 'cancelled') {
+            showNotification('⛔', 'Conversion cancelled', 'info');
+            hideProgress();
         } else {
             throw new Error(result.error);
         }
@@ -145,10 +157,20 @@ async function convertFile() {
         alert('Conversion failed: ' + error.message);
         hideProgress();
     } finally {
+        currentJobId = null;
         resetButton();
     }
 }
 
+async function cancelConversion() {
+    if (!currentJobId) return;
+    try {
+        await fetch(`/cancel/${currentJobId}`, { method: 'POST' });
+    } catch (error) {
+        console.error('Cancel failed:', error);
+    }
+}
+
 function animateProgress() {
     let progress = 0;
     const interval = setInterval(() => {
@@ -185,8 +207,39 @@ function showResult(result) {
     if (result.text_content) {
         textPreview.style.display = 'block';
         previewText.value = result.text_content;
+        previewUrl = result.preview_url;
+        previewOffset = result.preview_next_offset;
+        previewSize = result.size;
+        updatePreviewMore(result.preview_truncated);
     } else {
         textPreview.style.display = 'none';
+        previewMore.style.display = 'none';
+    }
+}
+
+function updatePreviewMore(truncated) {
+    if (truncated && previewUrl) {
+        previewMore.style.display = 'flex';
+        previewStatus.textContent = `Showing ${formatFileSize(previewOffset)} of ${formatFileSize(previewSize)}`;
+    } else {
+        previewMore.style.display = 'none';
+    }
+}
+
+async function loadMorePreview() {
+    if (!previewUrl) return;
+    loadMoreBtn.disabled = true;
+    try {
+        const response = await fetch(`${previewUrl}?offset=${previewOffset}`);
+        const page = await response.json();
+        if (page.error) throw new Error(page.error);
+        previewText.value += page.text;
+        previewOffset = page.next_offset;
+        updatePreviewMore(!page.eof);
+    } catch (error) {
+        showNotification('⚠️', 'Could not load more preview: ' + error.message, 'info');
+    } finally {
+        loadMoreBtn.disabled = false;
     }
 }
 
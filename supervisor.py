@@ -0,0 +1,281 @@
+"""Run each conversion in a supervised child process.
+
+The child is forked from the worker, so already-imported backends are shared
+copy-on-write. It gets CPU-time and address-space rlimits and its own process
+group, so helpers like tesseract are stopped with it. It is killed when it
+overruns the wall-clock timeout or is cancelled. Running jobs are registered
+as pid files in a shared directory, so any gunicorn worker can cancel them.
+A requested cProfile/tracemalloc capture runs in the child too, around the
+conversion itself.
+"""
+import os
+import re
+import errno
+import time
+import uuid
+import pickle
+import select
+import signal
+import threading
+import contextlib
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import metrics
+import profiling
+
+_JOB_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class ConversionKilled(Exception):
+    """The conversion process was stopped before it produced a result"""
+    kind = 'killed'
+
+
+class ConversionTimeout(ConversionKilled):
+    kind = 'timeout'
+
+
+class ConversionCancelled(ConversionKilled):
+    kind = 'cancelled'
+
+
+class ConversionResourceLimit(ConversionKilled):
+    kind = 'resource_limit'
+
+
+def valid_job_id(job_id):
+    return bool(job_id) and _JOB_ID_PATTERN.match(job_id) is not None
+
+
+def _limit(kind, soft, hard):
+    current_soft, current_hard = resource.getrlimit(kind)
+    if current_hard != resource.RLIM_INFINITY:
+        soft, hard = min(soft, current_hard), min(hard, current_hard)
+    resource.setrlimit(kind, (soft, hard))
+
+
+def _capture(profile):
+    """profiling.capture for a profile request; yields None without one"""
+    if not profile:
+        return contextlib.nullcontext()
+    return profiling.capture(profile['kinds'], profile['directory'], profile.get('label', 'convert'))
+
+
+class Supervisor:
+    def __init__(self, converter, job_dir, timeout=None, cpu_seconds=None, memory_bytes=None):
+        self.converter = converter
+        self.job_dir = job_dir
+        self.timeout = timeout or None
+        self.cpu_seconds = cpu_seconds or None
+        self.memory_bytes = memory_bytes or None
+        self._local = threading.local()
+        os.makedirs(job_dir, exist_ok=True)
+
+    @property
+    def supported(self):
+        return hasattr(os, 'fork') and hasattr(os, 'killpg')
+
+    def _pid_path(self, job_id):
+        return os.path.join(self.job_dir, f"{job_id}.pid")
+
+    def _cancel_path(self, job_id):
+        return os.path.join(self.job_dir, f"{job_id}.cancelled")
+
+    def last_reports(self):
+        """FileConverter.last_reports for the last conversion this thread supervised"""
+        if not self.supported:
+            return self.converter.last_reports()
+        return dict(getattr(self._local, 'reports', {}))
+
+    def convert(self, input_path, output_format, job_id=None, profile=None, **options):
+        """Same contract as FileConverter.convert, but killable and resource-limited.
+
+        profile is a dict with the capture kinds, directory and label to
+        profile the conversion with; the capture's result is stored in it
+        under 'capture' once the conversion has finished.
+        """
+        if not self.supported:
+            with _capture(profile) as capture:
+                try:
+                    return self.converter.convert(input_path, output_format, **options)
+                finally:
+                    if profile is not None:
+                        profile['capture'] = capture
+        if job_id is None:
+            job_id = uuid.uuid4().hex
+        elif not valid_job_id(job_id):
+            raise ValueError(f"Invalid job id: {job_id}")
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+
+        pid_path = self._pid_path(job_id)
+        cancel_path = self._cancel_path(job_id)
+        self._local.reports = {}
+        if os.path.exists(cancel_path):
+            os.remove(cancel_path)
+
+        started = time.perf_counter()
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            self._run_child(write_fd, input_path, output_format, options, profile)
+
+        os.close(write_fd)
+        try:
+            # The child does this too; whichever runs first, the group exists before the job is registered
+            try:
+                os.setpgid(pid, pid)
+            except OSError as e:
+                if e.errno not in (errno.EACCES, errno.ESRCH):
+                    raise
+            self._register(pid_path, pid)
+            data, timed_out = self._read_result(pid, read_fd)
+        finally:
+            os.close(read_fd)
+            # Unregister before reaping, so cancel() can never signal a reused pid
+            try:
+                os.remove(pid_path)
+            except OSError:
+                pass
+        _, status = os.waitpid(pid, 0)
+        cancelled = os.path.exists(cancel_path)
+        if cancelled:
+            os.remove(cancel_path)
+
+        if os.WIFSIGNALED(status) or not data:
+            # Reap anything the child left running in its process group
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except OSError:
+                pass
+            error = self._killed_error(status, timed_out, cancelled)
+            self._discard_output(input_path, output_format)
+            metrics.observe_conversion(Path(input_path).suffix.lower(), output_format.lower(), 'none',
+                                       time.perf_counter() - started, os.path.getsize(input_path),
+                                       None, error.kind, error)
+            raise error
+
+        message = pickle.loads(data)
+        metrics.REGISTRY.merge(message.get('metrics'))
+        if profile is not None:
+            profile['capture'] = message.get('capture')
+        if message.get('type') == 'MemoryError':
+            raise ConversionResourceLimit('Conversion exceeded the memory limit')
+        if 'error' in message:
+            # ValueError means bad input or options; callers report it differently
+            raise (ValueError if message.get('type') == 'ValueError' else Exception)(message['error'])
+        self._local.reports = message.get('reports', {})
+        return message['output']
+
+    def _register(self, pid_path, pid):
+        """Write the pid file atomically, so cancel() never reads a partial one"""
+        temp_path = f"{pid_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(str(pid))
+        os.replace(temp_path, pid_path)
+
+    def _read_result(self, pid, read_fd):
+        """Collect the child's pickled result, killing it at the deadline"""
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        chunks = []
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                try:
+                    os.killpg(pid, signal.SIGKILL)
+                except OSError:
+                    pass
+                return b''.join(chunks), True
+            ready, _, _ = select.select([read_fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(read_fd, 65536)
+            if not chunk:
+                return b''.join(chunks), False
+            chunks.append(chunk)
+
+    def _killed_error(self, status, timed_out, cancelled):
+        if cancelled:
+            return ConversionCancelled('Conversion was cancelled')
+        if timed_out:
+            return ConversionTimeout(f"Conversion exceeded the {self.timeout:g}s time limit")
+        if os.WIFSIGNALED(status):
+            signum = os.WTERMSIG(status)
+            if signum == getattr(signal, 'SIGXCPU', None):
+                return ConversionResourceLimit(f"Conversion exceeded the {self.cpu_seconds}s CPU time limit")
+            if signum == signal.SIGKILL and (self.cpu_seconds or self.memory_bytes):
+                # The hard CPU limit or the kernel OOM killer
+                return ConversionResourceLimit('Conversion was killed after exceeding its resource limits')
+            return ConversionKilled(f"Conversion process died with {signal.Signals(signum).name}")
+        return ConversionKilled(f"Conversion process exited with code {os.WEXITSTATUS(status)}")
+
+    def _discard_output(self, input_path, output_format):
+        try:
+            os.remove(self.converter._get_output_path(input_path, output_format))
+        except OSError:
+            pass
+
+    def _apply_limits(self):
+        if resource is None:
+            return
+        if self.cpu_seconds:
+            # SIGXCPU at the soft limit, SIGKILL a few seconds later if it is ignored
+            _limit(resource.RLIMIT_CPU, int(self.cpu_seconds), int(self.cpu_seconds) + 5)
+        if self.memory_bytes:
+            _limit(resource.RLIMIT_AS, int(self.memory_bytes), int(self.memory_bytes))
+
+    def _run_child(self, write_fd, input_path, output_format, options, profile=None):
+        code = 0
+        try:
+            os.setpgid(0, 0)
+            # Don't run the server's shutdown handlers in the child
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            # Only samples recorded in this child are sent back
+            metrics.REGISTRY.collect_delta()
+            self._apply_limits()
+            with _capture(profile) as capture:
+                try:
+                    message = {'output': self.converter.convert(input_path, output_format, **options),
+                               'reports': self.converter.last_reports()}
+                except MemoryError:
+                    message = {'error': 'Conversion exceeded the memory limit', 'type': 'MemoryError'}
+                except Exception as e:
+                    message = {'error': str(e), 'type': type(e).__name__}
+            message['capture'] = capture
+            message['metrics'] = metrics.REGISTRY.collect_delta()
+            with os.fdopen(write_fd, 'wb') as f:
+                f.write(pickle.dumps(message))
+        except BaseException:
+            code = 1
+        finally:
+            # Skip atexit/__del__ so the shared converter temp dir is left alone
+            os._exit(code)
+
+    def cancel(self, job_id):
+        """Kill a running job, whichever worker started it; False if it isn't running"""
+        if not valid_job_id(job_id):
+            return False
+        try:
+            with open(self._pid_path(job_id), 'r') as f:
+                pid = int(f.read())
+        except (OSError, ValueError):
+            return False
+        with open(self._cancel_path(job_id), 'w'):
+            pass
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except OSError:
+            # No such group yet: the job is registered, so kill the child itself
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                os.remove(self._cancel_path(job_id))
+                return False
+        return True
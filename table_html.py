@@ -0,0 +1,152 @@
+"""Streaming HTML table writer.
+
+Tables are written in batches of rows, each batch escaped and joined
+column-wise with pandas string operations instead of cell by cell, and
+written straight to the output. A table is never rendered into one string.
+
+Every row is a real <tr>, so the page reads back with any HTML parser. With
+page_rows, a table is written already paged: only its first page_rows rows
+are marked shown, so the browser never lays out the rest, and a small script
+adds Previous/Next controls. Without scripts a <noscript> style shows the
+whole table.
+"""
+import itertools
+from html import escape
+
+import pandas as pd
+
+BATCH_ROWS = 5000
+
+HEAD = """<html>
+<head>
+    <meta charset="utf-8">
+    <style>
+        body { font-family: Arial, sans-serif; margin: 40px; }
+        table { border-collapse: collapse; width: 100%; }
+        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+        th { background-color: #f2f2f2; }
+        h2 { margin-top: 2em; }
+        .pager { margin: 0.5em 0; display: none; }
+        .paging .pager { display: block; }
+        .paging tbody tr { display: none; }
+        .paging tbody tr.shown { display: table-row; }
+    </style>
+    <noscript><style>.paging tbody tr { display: table-row; } .paging .pager { display: none; }</style></noscript>
+</head>
+<body>
+"""
+
+PAGER_SCRIPT = """<script>
+document.querySelectorAll('.paged-table').forEach(function (box) {
+    var rows = box.querySelector('tbody').rows;
+    var label = box.querySelector('.pager span');
+    var size = Number(box.dataset.pageSize);
+    var pages = Math.max(1, Math.ceil(rows.length / size));
+    var page = 0;
+    var shown = Array.prototype.slice.call(rows, 0, size);
+    function show() {
+        shown.forEach(function (tr) { tr.classList.remove('shown'); });
+        shown = Array.prototype.slice.call(rows, page * size, (page + 1) * size);
+        shown.forEach(function (tr) { tr.classList.add('shown'); });
+        label.textContent = 'Page ' + (page + 1) + ' of ' + pages + ' (' + rows.length + ' rows)';
+    }
+    box.querySelectorAll('.pager button').forEach(function (button) {
+        button.onclick = function () {
+            page = Math.min(pages - 1, Math.max(0, page + Number(button.dataset.step)));
+            show();
+        };
+    });
+    if (rows.length > size) {
+        show();
+    } else {
+        box.classList.remove('paging');
+    }
+});
+</script>
+"""
+
+
+def batches(df, size=BATCH_ROWS):
+    """A DataFrame as consecutive row slices (at least one, so headers survive)"""
+    yield df.iloc[:size]
+    for start in range(size, len(df), size):
+        yield df.iloc[start:start + size]
+
+
+def _text_columns(batch):
+    """Each column as display strings, missing values blank"""
+    columns = []
+    for i in range(batch.shape[1]):
+        values = batch.iloc[:, i]
+        # Positional index: columns are concatenated element-wise, never aligned on labels
+        columns.append(values.astype(str).where(values.notna(), '').reset_index(drop=True))
+    return columns
+
+
+def _escaped(column):
+    return (column.str.replace('&', '&amp;', regex=False)
+            .str.replace('<', '&lt;', regex=False)
+            .str.replace('>', '&gt;', regex=False))
+
+
+def _rows_html(batch, shown=0):
+    """The batch's rows; the first `shown` are marked as part of the visible page"""
+    columns = [_escaped(column) for column in _text_columns(batch)]
+    if not columns:
+        return '<tr class="shown"></tr>\n' * shown + '<tr></tr>\n' * (len(batch) - shown)
+    rows = '<td>' + columns[0]
+    for column in columns[1:]:
+        rows = rows + '</td><td>' + column
+    rows = rows + '</td></tr>\n'
+    return ''.join('<tr class="shown">' + rows.iloc[:shown]) + ''.join('<tr>' + rows.iloc[shown:])
+
+
+def _header(columns):
+    cells = ''.join(f'<th>{escape(str(column))}</th>' for column in columns)
+    return f'<thead><tr>{cells}</tr></thead>\n'
+
+
+def write_table(f, rows, table_id, page_rows=None):
+    """Write one table from a DataFrame or an iterable of DataFrame batches"""
+    if isinstance(rows, pd.DataFrame):
+        rows = batches(rows)
+    rows = iter(rows)
+    first = next(rows, None)
+    columns = first.columns if first is not None else []
+
+    to_mark = int(page_rows) if page_rows else 0
+    if page_rows:
+        f.write(f'<div class="paged-table paging" data-page-size="{to_mark}">\n'
+                '<div class="pager"><button data-step="-1">Previous</button> <span></span> '
+                '<button data-step="1">Next</button></div>\n')
+    f.write(f'<table class="dataframe" id="{table_id}">\n{_header(columns)}<tbody>\n')
+    if first is not None:
+        for batch in itertools.chain([first], rows):
+            marked = min(to_mark, len(batch))
+            f.write(_rows_html(batch, marked))
+            to_mark -= marked
+    f.write('</tbody>\n</table>\n')
+    if page_rows:
+        f.write('</div>\n')
+
+
+def write_document(f, tables, page_rows=None):
+    """A full page with one table per {name: rows}; several tables get a linked contents list.
+
+    page_rows pages every table in the browser, that many rows at a time.
+    """
+    f.write(HEAD)
+    if len(tables) > 1:
+        f.write('<nav><ul>\n')
+        for i, name in enumerate(tables, 1):
+            f.write(f'<li><a href="#sheet-{i}">{escape(str(name))}</a></li>\n')
+        f.write('</ul></nav>\n')
+    for i, (name, rows) in enumerate(tables.items(), 1):
+        if len(tables) > 1:
+            f.write(f'<h2 id="sheet-{i}">{escape(str(name))}</h2>\n')
+            write_table(f, rows, f'data-table-{i}', page_rows)
+        else:
+            write_table(f, rows, 'data-table', page_rows)
+    if page_rows:
+        f.write(PAGER_SCRIPT)
+    f.write('</body>\n</html>\n')
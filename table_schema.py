@@ -0,0 +1,149 @@
+"""Schema inference and dtype compaction for tabular conversions.
+
+Column types are guessed from a sample of rows, then each candidate cast is
+applied to the whole column and kept only if it is lossless: every value
+must survive the round trip back to the text it came from. Text outputs
+stay what they were, only smaller and faster to produce:
+
+- integer columns are downcast to the narrowest integer type
+- low-cardinality text becomes a categorical
+- numeric-looking text becomes (nullable) numbers, except for JSON output,
+  where "42" and 42 are different values
+- ISO dates become datetimes, for typed outputs only (xlsx, parquet, feather),
+  since text writers would print them differently
+
+A user-supplied schema, ``{column: type}``, replaces inference entirely.
+"""
+import json
+
+import pandas as pd
+
+SAMPLE_ROWS = 10000
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+# Outputs that store dates as dates rather than as text
+TYPED_FORMATS = ('xlsx', 'parquet', 'feather')
+# Outputs that tell numbers and numeric strings apart
+QUOTED_FORMATS = ('json',)
+
+_NUMBER = r'-?\d+(\.\d+)?'
+_ISO_DATE = r'\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?'
+_DATETIME_ALIASES = ('date', 'datetime', 'timestamp')
+
+
+def parse(schema):
+    """{column: dtype} from a dict or its JSON text; None when no schema was given"""
+    if schema is None or isinstance(schema, dict):
+        parsed = schema
+    else:
+        try:
+            parsed = json.loads(schema)
+        except ValueError:
+            raise ValueError("Schema must be a JSON object of column: type")
+        if not isinstance(parsed, dict):
+            raise ValueError("Schema must be a JSON object of column: type")
+    if not parsed:
+        return None
+
+    dtypes = {}
+    for column, dtype in parsed.items():
+        if str(dtype).lower() in _DATETIME_ALIASES:
+            dtypes[column] = 'datetime64[ns]'
+            continue
+        try:
+            pd.api.types.pandas_dtype(dtype)
+        except TypeError:
+            raise ValueError(f"Unknown type {dtype!r} for column {column!r}")
+        dtypes[column] = dtype
+    return dtypes
+
+
+def read_csv_kwargs(schema):
+    """Let read_csv build the given types directly instead of guessing first"""
+    if not schema:
+        return {}
+    dates = [column for column, dtype in schema.items() if dtype == 'datetime64[ns]']
+    dtypes = {column: dtype for column, dtype in schema.items() if column not in dates}
+    return {'dtype': dtypes, 'parse_dates': dates or None}
+
+
+def apply(df, schema):
+    """Cast the schema's columns; anything that doesn't fit raises ValueError"""
+    missing = [column for column in schema if column not in df.columns]
+    if missing:
+        raise ValueError(f"Schema columns not in the data: {', '.join(map(str, missing))}")
+    df = df.copy(deep=False)
+    for column, dtype in schema.items():
+        values = df[column]
+        if values.dtype == dtype:
+            continue
+        if dtype == 'datetime64[ns]':
+            df[column] = pd.to_datetime(values)
+        elif pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(dtype)) and values.dtype == object:
+            df[column] = pd.to_numeric(values).astype(dtype)
+        else:
+            df[column] = values.astype(dtype)
+    return df
+
+
+def infer(df, parse_numbers=True, parse_dates=False, sample_rows=SAMPLE_ROWS):
+    """{column: 'integer' | 'number' | 'datetime' | 'category'} for compactable columns"""
+    sample = df if len(df) <= sample_rows else df.sample(sample_rows, random_state=0)
+    kinds = {}
+    for column in df.columns:
+        values = sample[column]
+        if pd.api.types.is_integer_dtype(values.dtype):
+            kinds[column] = 'integer'
+            continue
+        if values.dtype != object or pd.api.types.infer_dtype(values, skipna=True) != 'string':
+            continue
+        values = values.dropna()
+        if values.empty:
+            continue
+        if parse_numbers and values.str.fullmatch(_NUMBER).all():
+            kinds[column] = 'number'
+        elif parse_dates and values.str.fullmatch(_ISO_DATE).all():
+            kinds[column] = 'datetime'
+        elif values.nunique() <= len(values) * CATEGORY_MAX_RATIO:
+            kinds[column] = 'category'
+    return kinds
+
+
+def _same_text(parsed, values):
+    present = values.notna()
+    return bool((parsed.isna() == ~present).all() and (parsed[present].astype(str) == values[present]).all())
+
+
+def _compact_column(values, kind):
+    if kind == 'integer':
+        return pd.to_numeric(values, downcast='integer')
+    if kind == 'number':
+        parsed = pd.to_numeric(values, errors='coerce')
+        if parsed.dropna().mod(1).eq(0).all() and not values.dropna().str.contains('.', regex=False).any():
+            parsed = pd.to_numeric(parsed.astype('Int64'), downcast='integer')
+        return parsed if _same_text(parsed, values) else values
+    if kind == 'datetime':
+        parsed = pd.to_datetime(values, errors='coerce', format='ISO8601')
+        return parsed if parsed.isna().equals(values.isna()) else values
+    if kind == 'category':
+        return values.astype('category')
+    return values
+
+
+def compact(df, schema=None, output_ext=None):
+    """Apply the user schema if there is one, otherwise infer and compact for output_ext"""
+    if schema:
+        return apply(df, schema)
+    if not df.columns.is_unique:
+        return df
+    kinds = infer(df, output_ext not in QUOTED_FORMATS, output_ext in TYPED_FORMATS)
+    if not kinds:
+        return df
+    df = df.copy(deep=False)
+    for column, kind in kinds.items():
+        try:
+            df[column] = _compact_column(df[column], kind)
+        except (ValueError, TypeError, AttributeError, OverflowError):
+            pass  # a value outside the sample didn't fit; keep the column as loaded
+    return df
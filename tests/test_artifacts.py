@@ -0,0 +1,39 @@
+import pytest
+
+artifacts = pytest.importorskip('artifacts')
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip, deflate, br', 'gzip'),
+    ('zstd, gzip', 'zstd'),
+    ('GZIP', 'gzip'),
+    ('gzip;q=0.5', 'gzip'),
+    ('gzip; q=0', None),
+    ('zstd;q=0, gzip', 'gzip'),
+    ('*', 'zstd'),
+    ('*;q=0, gzip', 'gzip'),
+    ('gzip;q=oops', None),
+    ('identity', None),
+    ('', None),
+    (None, None),
+])
+def test_negotiate_encoding(header, expected):
+    assert artifacts.negotiate_encoding(header, ('zstd', 'gzip')) == expected
+
+
+def test_server_preference_wins_over_quality():
+    assert artifacts.negotiate_encoding('gzip;q=1, zstd;q=0.1', ('zstd', 'gzip')) == 'zstd'
+
+
+def test_alias_shares_content_under_a_new_id(tmp_path):
+    store = artifacts.ArtifactStore(str(tmp_path / 'store'), 3600)
+    source = tmp_path / 'out.csv'
+    source.write_text('a,b\n1,2\n')
+
+    artifact = store.store(str(source), 'report.csv')
+    alias = store.alias(artifact, 'other.csv')
+
+    assert alias['id'] != artifact['id']
+    assert alias['download_name'] == 'other.csv'
+    assert alias['sha256'] == artifact['sha256']
+    assert open(alias['path']).read() == 'a,b\n1,2\n'
@@ -0,0 +1,39 @@
+import io
+import os
+import json
+import zipfile
+
+import pytest
+
+batch = pytest.importorskip('batch')
+
+
+class _DyingConverter:
+    def convert(self, input_path, output_format, **options):
+        os._exit(1)
+
+
+def _manifest(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        return json.loads(archive.read('manifest.json'))
+
+
+def test_dead_worker_is_recorded_in_manifest(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, 'FileConverter', _DyingConverter)
+    monkeypatch.setattr(batch, '_pool', None)
+    inputs = []
+    for name in ('a.txt', 'b.txt'):
+        path = tmp_path / name
+        path.write_text('hello')
+        inputs.append((name, str(path)))
+    work_dir = tmp_path / 'work'
+    work_dir.mkdir()
+
+    manifest = _manifest(b''.join(batch.stream_results(inputs, 'html', str(work_dir), 2)))
+
+    assert manifest['total'] == 2
+    assert manifest['failed'] == 2
+    assert all(entry['status'] == 'error' and 'BrokenProcessPool' in entry['error']
+               for entry in manifest['files'])
+    # The broken pool is dropped so the next batch gets a working one
+    assert batch._pool is None
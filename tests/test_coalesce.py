@@ -0,0 +1,87 @@
+import os
+import time
+import threading
+
+import pytest
+
+coalesce = pytest.importorskip('coalesce')
+
+needs_flock = pytest.mark.skipif(coalesce.fcntl is None, reason='needs fcntl')
+
+
+def test_identical_calls_share_one_run(tmp_path):
+    flights = coalesce.SingleFlight(str(tmp_path))
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'result'
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.run('key', work)))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(flights.run('key', work)))
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(calls) == 1
+    assert sorted(results) == [('result', False), ('result', True)]
+
+
+def test_unshared_errors_are_retried(tmp_path):
+    flights = coalesce.SingleFlight(str(tmp_path))
+
+    with pytest.raises(ValueError):
+        flights.run('key', lambda: (_ for _ in ()).throw(ValueError('boom')), share_error=lambda e: False)
+    assert flights.run('key', lambda: 42) == (42, False)
+
+
+@needs_flock
+def test_purge_keeps_held_locks(tmp_path):
+    flights = coalesce.SingleFlight(str(tmp_path))
+    old = time.time() - coalesce._RESULT_TTL - 60
+    for key in ('held', 'idle'):
+        (tmp_path / f'{key}.lock').touch()
+        result = tmp_path / f'{key}.result'
+        result.write_bytes(b'')
+        os.utime(result, (old, old))
+
+    fd = os.open(tmp_path / 'held.lock', os.O_RDWR)
+    try:
+        coalesce.fcntl.flock(fd, coalesce.fcntl.LOCK_EX)
+        flights._purge()
+    finally:
+        os.close(fd)
+
+    assert (tmp_path / 'held.lock').exists()
+    assert not (tmp_path / 'idle.lock').exists()
+    assert not (tmp_path / 'idle.result').exists()
+
+
+@needs_flock
+def test_leader_relocks_a_purged_lock_file(tmp_path, monkeypatch):
+    flights = coalesce.SingleFlight(str(tmp_path))
+    lock_path = str(tmp_path / 'key.lock')
+    opened = []
+    real_open = os.open
+
+    def open_then_purge(path, *args):
+        fd = real_open(path, *args)
+        if path == lock_path and not opened:
+            # The purge unlinks the file between our open and our flock
+            os.remove(path)
+        opened.append(path)
+        return fd
+
+    monkeypatch.setattr(os, 'open', open_then_purge)
+    assert flights.run('key', lambda: 'value') == ('value', False)
+    assert opened.count(lock_path) == 2
+    assert os.path.exists(lock_path)
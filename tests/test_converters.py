@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+converters = pytest.importorskip('converters')
+
+
+@pytest.fixture
+def converter():
+    return converters.FileConverter(workers=1)
+
+
+@pytest.fixture
+def table_csv(tmp_path):
+    path = tmp_path / 'table.csv'
+    path.write_text('id,city\n1,Oslo\n2,Rome\n', encoding='utf-8')
+    return str(path)
+
+
+def test_options_for_other_formats_are_ignored(converter, table_csv):
+    output = converter.convert(table_csv, 'json', pages='1-2', sheets='Sheet1')
+    with open(output, encoding='utf-8') as f:
+        assert json.load(f) == [{'id': 1, 'city': 'Oslo'}, {'id': 2, 'city': 'Rome'}]
+
+
+def test_unknown_options_are_rejected(converter, table_csv):
+    with pytest.raises(ValueError, match='Unknown conversion option'):
+        converter.convert(table_csv, 'json', colour='blue')
+
+
+@pytest.fixture
+def two_sheet_xlsx(tmp_path):
+    pytest.importorskip('openpyxl')
+    path = tmp_path / 'book.xlsx'
+    with converters.pd.ExcelWriter(path) as writer:
+        converters.pd.DataFrame({'a': [1, 2]}).to_excel(writer, sheet_name='One', index=False)
+        converters.pd.DataFrame({'b': [3]}).to_excel(writer, sheet_name='Two', index=False)
+    return path
+
+
+@pytest.mark.parametrize('spill_threshold', [converters.MEMORY_MAX_BYTES, 0])
+def test_stream_refuses_to_return_a_zip(converter, two_sheet_xlsx, spill_threshold):
+    data = two_sheet_xlsx.read_bytes()
+    with pytest.raises(ValueError, match='2 sheets would be returned as a ZIP'):
+        converter.convert_bytes(data, '.xlsx', 'csv', spill_threshold)
+
+    csv = converter.convert_bytes(data, '.xlsx', 'csv', spill_threshold, sheets='Two')
+    assert csv.decode('utf-8').split() == ['b', '3']
+    assert converter.convert(str(two_sheet_xlsx), 'csv').endswith('.zip')
+
+
+def test_unsupported_pairs_are_rejected_and_counted(converter, table_csv):
+    errors = converters.metrics.ERRORS.values
+    key = ('csv', 'bogus', 'ValueError')
+    before = errors.get(key, 0)
+
+    with pytest.raises(ValueError, match='Cannot convert .csv to bogus'):
+        converter.convert(table_csv, 'bogus')
+    assert errors[key] == before + 1
+    assert converters.metrics.CONVERSIONS.values[('csv', 'bogus', 'none', 'error')] >= 1
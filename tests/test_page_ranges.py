@@ -0,0 +1,35 @@
+import pytest
+
+page_ranges = pytest.importorskip('page_ranges')
+
+
+@pytest.mark.parametrize('pages, expected', [
+    ('1-3,7,10-', [(1, 3), (7, 7), (10, None)]),
+    (' 2 - 4 , 6 ', [(2, 4), (6, 6)]),
+    ('-3', [(1, 3)]),
+    (5, [(5, 5)]),
+    ([1, '3-4'], [(1, 1), (3, 4)]),
+])
+def test_parse(pages, expected):
+    assert page_ranges.parse(pages) == expected
+
+
+@pytest.mark.parametrize('pages', ['', ',', '1,,2', 'a', '3-1', '0', '0-2', '-', '1-2-3'])
+def test_parse_rejects(pages):
+    with pytest.raises(ValueError):
+        page_ranges.parse(pages)
+
+
+@pytest.mark.parametrize('pages', [None, '', []])
+def test_select_defaults_to_every_page(pages):
+    assert page_ranges.select(pages, 4) == [0, 1, 2, 3]
+
+
+def test_select_is_sorted_and_unique():
+    assert page_ranges.select('7-8,2,1-3,8-', 10) == [0, 1, 2, 6, 7, 8, 9]
+
+
+@pytest.mark.parametrize('pages', ['5', '2-5', '5-'])
+def test_select_rejects_pages_past_the_end(pages):
+    with pytest.raises(ValueError, match='out of range'):
+        page_ranges.select(pages, 4)
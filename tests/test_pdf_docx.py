@@ -0,0 +1,81 @@
+import io
+import re
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+
+import pytest
+
+pdf_docx = pytest.importorskip('pdf_docx')
+
+
+def test_chunks():
+    pages = list(range(40))
+    assert pdf_docx.chunks(pages, 4) == [pages[0:10], pages[10:20], pages[20:30], pages[30:40]]
+    assert pdf_docx.chunks(pages, 8) == [pages[0:10], pages[10:20], pages[20:30], pages[30:40]]
+    assert pdf_docx.chunks(pages[:25], 4) == [pages[0:13], pages[13:25]]
+    assert pdf_docx.chunks(pages[:5], 4) == [pages[:5]]
+
+
+def _make_pdf(path, pages, image_every=None):
+    fitz = pytest.importorskip('fitz')
+    Image = pytest.importorskip('PIL.Image')
+    doc = fitz.open()
+    for n in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f'Page {n + 1}', fontsize=14)
+        if image_every and n % image_every == 3:
+            buffer = io.BytesIO()
+            Image.new('RGB', (40, 30), (n * 6, 100, 200)).save(buffer, 'PNG')
+            page.insert_image(fitz.Rect(72, 100, 272, 250), stream=buffer.getvalue())
+    doc.save(str(path))
+    doc.close()
+
+
+def _convert(tmp_path, image_every=None):
+    pytest.importorskip('pdf2docx')
+    pdf, docx_path = tmp_path / 'in.pdf', tmp_path / 'out.docx'
+    _make_pdf(pdf, 40, image_every)
+    pdf_docx.convert(str(pdf), str(docx_path), workers=4)
+    return docx_path
+
+
+def test_forty_pages_merge_from_four_chunks(tmp_path):
+    docx = pytest.importorskip('docx')
+    path = _convert(tmp_path)
+
+    with zipfile.ZipFile(path) as archive:
+        for name in archive.namelist():
+            if name.endswith(('.xml', '.rels')):
+                ET.fromstring(archive.read(name))  # every part is well-formed
+    document = docx.Document(str(path))
+    assert len(document.sections) == 40
+    text = '\n'.join(paragraph.text for paragraph in document.paragraphs)
+    assert [int(n) for n in re.findall(r'Page (\d+)', text)] == list(range(1, 41))
+
+
+def test_merged_images_are_renamed_per_chunk(tmp_path):
+    docx = pytest.importorskip('docx')
+    path = _convert(tmp_path, image_every=10)  # one image in each chunk
+
+    with zipfile.ZipFile(path) as archive:
+        names = set(archive.namelist())
+        xml = archive.read('word/document.xml').decode('utf-8')
+        rels = {attributes['Id']: attributes for attributes in (
+            dict(re.findall(r'(\w+)="([^"]*)"', element))
+            for element in re.findall(r'<Relationship\b[^>]*/>', archive.read('word/_rels/document.xml.rels').decode('utf-8')))}
+        content_types = archive.read('[Content_Types].xml').decode('utf-8')
+
+    embeds = re.findall(r'r:embed="([^"]+)"', xml)
+    assert len(embeds) == 4
+    assert [embed.split('-')[0] for embed in embeds[1:]] == ['rIdChunk2', 'rIdChunk3', 'rIdChunk4']
+    targets = [rels[embed]['Target'] for embed in embeds]
+    assert len(set(targets)) == 4
+    assert all(posixpath.basename(target).startswith(f'chunk{n}-') for n, target in zip((2, 3, 4), targets[1:]))
+    assert all(posixpath.normpath(posixpath.join('word', target)) in names for target in targets)
+    assert 'Extension="png"' in content_types
+
+    doc_pr_ids = re.findall(r'<wp:docPr\b[^>]*?\bid="(\d+)"', xml)
+    assert len(doc_pr_ids) == 4 and len(set(doc_pr_ids)) == 4
+
+    assert len(docx.Document(str(path)).inline_shapes) == 4
@@ -0,0 +1,53 @@
+import io
+import os
+
+import pytest
+
+fitz = pytest.importorskip('fitz')
+pdf_optimize = pytest.importorskip('pdf_optimize')
+
+
+def _pdf(path, image_size=None, pages=1):
+    doc = fitz.open()
+    for n in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f'Page {n + 1}')
+        if image_size:
+            from PIL import Image
+            buffer = io.BytesIO()
+            Image.effect_noise(image_size, 60).convert('RGB').save(buffer, 'PNG')
+            page.insert_image(fitz.Rect(72, 100, 172, 200), stream=buffer.getvalue())
+    doc.save(str(path))
+    doc.close()
+
+
+def _is_pdfa(path):
+    with fitz.open(str(path)) as doc:
+        return '<pdfaid:part>2</pdfaid:part>' in doc.get_xml_metadata()
+
+
+def test_compact_pdf_keeps_the_plain_save(tmp_path):
+    source, output = tmp_path / 'in.pdf', tmp_path / 'out.pdf'
+    _pdf(source)
+
+    report = pdf_optimize.optimize(str(source), str(output), pdfa=True)
+
+    assert report['optimized'] is False
+    assert report['bytes_out'] == os.path.getsize(output)
+    assert report['bytes_saved'] == report['bytes_in'] - report['bytes_out']
+    assert _is_pdfa(output)
+    assert not [name for name in os.listdir(tmp_path) if name not in ('in.pdf', 'out.pdf')]
+
+
+def test_oversized_images_are_downsampled(tmp_path):
+    source, output = tmp_path / 'in.pdf', tmp_path / 'out.pdf'
+    _pdf(source, image_size=(1200, 1200), pages=3)  # 1200px over 100pt is 864 dpi
+
+    report = pdf_optimize.optimize(str(source), str(output), pages='1-2', pdfa=True)
+
+    assert report['optimized'] is True
+    assert report['images_downsampled'] >= 1
+    assert 0 < report['bytes_out'] < report['bytes_in']
+    assert _is_pdfa(output)
+    with fitz.open(str(output)) as doc:
+        assert len(doc) == 2
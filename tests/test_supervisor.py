@@ -0,0 +1,117 @@
+import os
+import time
+import threading
+
+import pytest
+
+supervisor = pytest.importorskip('supervisor')
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork')
+
+
+class _SlowConverter:
+    def convert(self, input_path, output_format, **options):
+        time.sleep(30)
+
+    def _get_output_path(self, input_path, output_format):
+        return f"{input_path}.{output_format}"
+
+
+def _wait_for(path, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        assert time.monotonic() < deadline, f"{path} never appeared"
+        time.sleep(0.01)
+
+
+def test_cancel_kills_a_running_job(tmp_path):
+    jobs = supervisor.Supervisor(_SlowConverter(), str(tmp_path / 'jobs'))
+    source = tmp_path / 'in.txt'
+    source.write_text('hello')
+    outcome = {}
+
+    def run():
+        try:
+            jobs.convert(str(source), 'pdf', 'job-1')
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    _wait_for(jobs._pid_path('job-1'))
+    assert jobs.cancel('job-1')
+    thread.join(10)
+
+    assert isinstance(outcome['error'], supervisor.ConversionCancelled)
+    assert not os.path.exists(jobs._pid_path('job-1'))
+    assert not jobs.cancel('job-1')
+
+
+def test_cancel_falls_back_to_the_pid(tmp_path, monkeypatch):
+    jobs = supervisor.Supervisor(_SlowConverter(), str(tmp_path / 'jobs'))
+    killed = []
+    monkeypatch.setattr(os, 'killpg', lambda pid, signum: (_ for _ in ()).throw(ProcessLookupError()))
+    monkeypatch.setattr(os, 'kill', lambda pid, signum: killed.append(pid))
+    jobs._register(jobs._pid_path('job-2'), 12345)
+
+    assert jobs.cancel('job-2')
+    assert killed == [12345]
+
+
+
+class _TracedConverter:
+    def convert(self, input_path, output_format, **options):
+        import profiling
+        with profiling.span('write'):
+            supervisor.metrics.FALLBACKS.inc(fallback='test')
+            output = self._get_output_path(input_path, output_format)
+            with open(output, 'w') as f:
+                f.write('done')
+        return output
+
+    def last_reports(self):
+        return {}
+
+    def _get_output_path(self, input_path, output_format):
+        return f"{input_path}.{output_format}"
+
+
+def test_locks_held_by_other_threads_at_fork_do_not_hang_the_child(tmp_path):
+    profiling = pytest.importorskip('profiling')
+    jobs = supervisor.Supervisor(_TracedConverter(), str(tmp_path / 'jobs'), timeout=5)
+    source = tmp_path / 'in.txt'
+    source.write_text('hello')
+    trace_path = tmp_path / 'trace.jsonl'
+    sink = profiling.JsonFileSink(str(trace_path))
+    profiling.add_sink(sink)
+    held = threading.Event()
+
+    def hold():
+        # Held while the child forks; released once it has written its output
+        with supervisor.metrics.REGISTRY.lock, sink.lock:
+            held.set()
+            deadline = time.monotonic() + 10
+            while not os.path.exists(f"{source}.out") and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    held.wait(5)
+    try:
+        assert jobs.convert(str(source), 'out') == f"{source}.out"
+    finally:
+        thread.join(15)
+        profiling._sinks.remove(sink)
+    assert supervisor.metrics.FALLBACKS.values[('test',)] >= 1
+    assert '"name": "write"' in trace_path.read_text()
+
+
+def test_value_errors_keep_their_type(tmp_path):
+    converters = pytest.importorskip('converters')
+    jobs = supervisor.Supervisor(converters.FileConverter(workers=1), str(tmp_path / 'jobs'), timeout=30)
+    source = tmp_path / 'in.csv'
+    source.write_text('a\n1\n')
+
+    with pytest.raises(ValueError, match='Cannot convert .csv to bogus') as raised:
+        jobs.convert(str(source), 'bogus')
+    assert str(tmp_path) not in str(raised.value)
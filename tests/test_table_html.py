@@ -0,0 +1,85 @@
+import io
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+table_html = pytest.importorskip('table_html')
+
+
+def _document(tables, page_rows=None):
+    f = io.StringIO()
+    table_html.write_document(f, tables, page_rows)
+    return f.getvalue()
+
+
+def test_batches_cover_every_row_and_keep_headers():
+    df = pd.DataFrame({'a': range(12)})
+    assert [len(batch) for batch in table_html.batches(df, 5)] == [5, 5, 2]
+    assert [list(batch.columns) for batch in table_html.batches(df.iloc[:0], 5)] == [['a']]
+
+
+def test_cells_are_escaped_and_missing_values_blank():
+    df = pd.DataFrame({'<b>': ['</td><script>x</script>', None], 'n': [1.5, None]})
+    html = _document({None: df})
+    assert '<th>&lt;b&gt;</th>' in html
+    assert '&lt;/td&gt;&lt;script&gt;x&lt;/script&gt;' in html
+    assert '<script' not in html
+    assert '<tr><td></td><td></td></tr>' in html
+
+
+def test_large_tables_are_plain_rows_by_default():
+    pytest.importorskip('lxml')
+    df = pd.DataFrame({'id': range(25000), 'name': [f'row {n}' for n in range(25000)]})
+    html = _document({None: table_html.batches(df, 4000)})
+
+    assert 'paged-table' not in html and '<script' not in html
+    parsed = pd.read_html(io.StringIO(html))[0]
+    assert len(parsed) == 25000
+    assert parsed['name'].iloc[-1] == 'row 24999'
+
+
+def test_page_rows_pages_real_rows():
+    pytest.importorskip('lxml')
+    df = pd.DataFrame({'id': range(300)})
+    html = _document({'First': df, 'Second': df.iloc[:10]}, page_rows=100)
+
+    assert html.count('<div class="paged-table paging" data-page-size="100">') == 2
+    assert html.count(table_html.PAGER_SCRIPT) == 1
+    first, second = pd.read_html(io.StringIO(html))
+    assert len(first) == 300 and len(second) == 10
+    assert '<a href="#sheet-2">Second</a>' in html
+
+
+def test_page_rows_hides_rows_in_the_markup():
+    df = pd.DataFrame({'id': range(12000)})
+    html = _document({None: table_html.batches(df, 5000)}, page_rows=250)
+
+    rows = html.split('<tbody>\n')[1].split('</tbody>')[0].splitlines()
+    assert len(rows) == 12000
+    assert all(row.startswith('<tr class="shown">') for row in rows[:250])
+    assert all(row.startswith('<tr>') for row in rows[250:])
+    # Hidden before any script runs, shown again when scripts are off
+    assert '.paging tbody tr { display: none; }' in html
+    assert html.index('<noscript><style>.paging tbody tr { display: table-row; }') < html.index('<body>')
+
+
+def test_csv_to_html_round_trip(tmp_path):
+    pytest.importorskip('lxml')
+    converters = pytest.importorskip('converters')
+    html_reader = pytest.importorskip('html_reader')
+    source = tmp_path / 'big.csv'
+    source.write_text('id,name\n' + ''.join(f'{n},name {n}\n' for n in range(12000)), encoding='utf-8')
+    converter = converters.FileConverter(workers=1)
+
+    output = converter.convert(str(source), 'html')
+    parsed = pd.read_html(output)[0]
+    assert len(parsed) == 12000
+    assert 'name 11999' in html_reader.extract_text(output)
+
+    paged = converter.convert(str(source), 'html', page_rows='500')
+    assert len(pd.read_html(paged)[0]) == 12000
+    with open(paged, encoding='utf-8') as f:
+        assert 'data-page-size="500"' in f.read()
+
+    with pytest.raises(ValueError, match='page_rows'):
+        converter.convert(str(source), 'html', page_rows='lots')
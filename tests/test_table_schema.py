@@ -0,0 +1,83 @@
+import pytest
+
+pd = pytest.importorskip('pandas')
+table_schema = pytest.importorskip('table_schema')
+
+
+def test_parse_accepts_dicts_json_and_date_aliases():
+    assert table_schema.parse(None) is None
+    assert table_schema.parse({}) is None
+    assert table_schema.parse('{"id": "int32", "when": "Date"}') == {'id': 'int32', 'when': 'datetime64[ns]'}
+    assert table_schema.parse({'name': 'category'}) == {'name': 'category'}
+
+
+@pytest.mark.parametrize('schema', ['not json', '[1, 2]', {'id': 'no-such-type'}])
+def test_parse_rejects_bad_schemas(schema):
+    with pytest.raises(ValueError):
+        table_schema.parse(schema)
+
+
+def test_read_csv_kwargs_splits_out_dates():
+    kwargs = table_schema.read_csv_kwargs({'id': 'int32', 'when': 'datetime64[ns]'})
+    assert kwargs == {'dtype': {'id': 'int32'}, 'parse_dates': ['when']}
+    assert table_schema.read_csv_kwargs(None) == {}
+
+
+def test_apply_casts_and_reports_missing_columns():
+    df = pd.DataFrame({'id': ['1', '2'], 'when': ['2024-01-02', '2024-03-04']})
+    typed = table_schema.apply(df, {'id': 'int16', 'when': 'datetime64[ns]'})
+    assert str(typed['id'].dtype) == 'int16'
+    assert pd.api.types.is_datetime64_any_dtype(typed['when'])
+    assert df['id'].dtype == object  # the input frame is left alone
+
+    with pytest.raises(ValueError, match='missing'):
+        table_schema.apply(df, {'missing': 'int32'})
+
+
+def test_infer_kinds():
+    df = pd.DataFrame({
+        'count': [1, 2, 3, 4],
+        'amount': ['1.5', '2', '-3.25', None],
+        'city': ['Oslo', 'Oslo', 'Rome', 'Rome'],
+        'day': ['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04'],
+        'note': ['a', 'b', 'c', 'd'],
+    })
+    assert table_schema.infer(df) == {'count': 'integer', 'amount': 'number', 'city': 'category'}
+    assert table_schema.infer(df, parse_numbers=False, parse_dates=True) == {
+        'count': 'integer', 'day': 'datetime', 'city': 'category'}
+
+
+def test_compact_is_lossless():
+    df = pd.DataFrame({
+        'count': [1, 2, 3, 4],
+        'zip': ['0042', '1000', '2000', '3000'],  # leading zeros must survive
+        'amount': ['1.5', '2.0', '3.25', '4.0'],
+        'whole': ['1', '2', None, '4'],
+        'city': ['Oslo', 'Oslo', 'Rome', 'Rome'],
+    })
+    compacted = table_schema.compact(df, output_ext='csv')
+
+    assert str(compacted['count'].dtype) == 'int8'
+    assert compacted['zip'].tolist() == df['zip'].tolist()
+    assert compacted['amount'].tolist() == [1.5, 2.0, 3.25, 4.0]
+    assert str(compacted['whole'].dtype) == 'Int8'
+    assert str(compacted['city'].dtype) == 'category'
+    assert compacted.to_csv(index=False) == df.to_csv(index=False)
+
+
+def test_compact_keeps_numeric_text_for_json_and_dates_for_typed_outputs():
+    df = pd.DataFrame({'code': ['1', '2', '3'], 'day': ['2024-01-01', '2024-01-02', '2024-01-03']})
+
+    as_json = table_schema.compact(df, output_ext='json')
+    assert as_json['code'].tolist() == ['1', '2', '3']
+
+    as_parquet = table_schema.compact(df, output_ext='parquet')
+    assert pd.api.types.is_datetime64_any_dtype(as_parquet['day'])
+    assert not pd.api.types.is_datetime64_any_dtype(table_schema.compact(df, output_ext='csv')['day'])
+
+
+def test_compact_uses_the_schema_instead_of_inference():
+    df = pd.DataFrame({'id': ['1', '2'], 'city': ['Oslo', 'Oslo']})
+    compacted = table_schema.compact(df, {'id': 'int64'}, 'csv')
+    assert str(compacted['id'].dtype) == 'int64'
+    assert compacted['city'].dtype == object
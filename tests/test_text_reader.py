@@ -0,0 +1,52 @@
+import io
+import codecs
+
+import pytest
+
+text_reader = pytest.importorskip('text_reader')
+
+
+@pytest.mark.parametrize('bom, encoding', [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+])
+def test_bom_wins(bom, encoding):
+    assert text_reader.detect_encoding(bom + 'système'.encode(encoding.replace('-sig', ''))[:20]) == encoding
+
+
+def test_strict_utf8():
+    assert text_reader.detect_encoding('naïve café — 日本'.encode('utf-8')) == 'utf-8'
+
+
+@pytest.mark.parametrize('text', [
+    'système', 'jürgen', 'café', 'Le système est prêt. Déjà vu, garçon.\n', 'Price: 5€ — “quoted”\n',
+    'Sehr geehrter Herr Müller, die Größe der Straße wurde geändert.\n',
+])
+def test_western_text_reads_as_cp1252(text):
+    data = text.encode('cp1252')
+    assert text_reader.detect_encoding(data) == 'cp1252'
+    assert text_reader.read_text(io.BytesIO(data)) == text
+
+
+@pytest.mark.parametrize('encoding', ['utf-16-le', 'utf-16-be'])
+def test_utf16_without_bom(encoding):
+    text = 'hello wörld\nsecond line\n'
+    data = text.encode(encoding)
+    assert text_reader.detect_encoding(data) == encoding
+    assert text_reader.read_text(io.BytesIO(data)) == text
+
+
+def test_character_cut_at_the_end_of_the_sample():
+    head = 'a' * (text_reader.SAMPLE_BYTES - 1)
+    text = head + 'é and more\n'  # é's two bytes straddle the sample boundary
+    data = text.encode('utf-8')
+    assert text_reader.detect_encoding(data[:text_reader.SAMPLE_BYTES]) == 'utf-8'
+    assert text_reader.read_text(io.BytesIO(data)) == text
+
+
+def test_iter_lines_matches_split():
+    data = 'one\ntwo\n\nthree'.encode('utf-8')
+    assert list(text_reader.iter_lines(io.BytesIO(data))) == ['one', 'two', '', 'three']
+    assert list(text_reader.iter_lines(io.BytesIO(b'one\n'))) == ['one', '']
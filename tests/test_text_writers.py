@@ -0,0 +1,162 @@
+import re
+import zipfile
+
+import pytest
+
+text_writers = pytest.importorskip('text_writers')
+
+LATIN = ['Plain ASCII line', 'Tabs\tand (parens) and \\ backslash', 'Café déjà vu – €5']
+NON_LATIN = ['Привет, мир', 'ελληνικά', '中文测试 mixed with Latin']
+
+
+@pytest.mark.parametrize('lines', [LATIN, NON_LATIN, LATIN + NON_LATIN])
+def test_pdf_text_round_trips(tmp_path, lines):
+    fitz = pytest.importorskip('fitz')
+    path = tmp_path / 'out.pdf'
+
+    assert text_writers.write_pdf(lines, str(path)) == 1
+
+    with fitz.open(str(path)) as doc:
+        text = doc[0].get_text()
+    for line in lines:
+        assert line.expandtabs(4) in text
+
+
+def test_pdf_pages_and_empty_input(tmp_path):
+    fitz = pytest.importorskip('fitz')
+    lines = [f'line {n}' for n in range(text_writers.LINES_PER_PAGE * 2 + 1)]
+
+    assert text_writers.write_pdf(lines, str(tmp_path / 'long.pdf')) == 3
+    assert text_writers.write_pdf([], str(tmp_path / 'empty.pdf')) == 1
+    with fitz.open(str(tmp_path / 'long.pdf')) as doc:
+        assert len(doc) == 3
+        assert 'line 94' in doc[2].get_text()
+    with fitz.open(str(tmp_path / 'empty.pdf')) as doc:
+        assert len(doc) == 1
+        assert doc[0].get_text() == ''
+
+
+def test_pdf_uncovered_characters_become_question_marks(tmp_path):
+    fitz = pytest.importorskip('fitz')
+    path = tmp_path / 'out.pdf'
+
+    text_writers.write_pdf(['שלום Привет'], str(path))
+
+    with fitz.open(str(path)) as doc:
+        assert '???? Привет' in doc[0].get_text()
+
+
+@pytest.mark.parametrize('lines', [[], LATIN + [''] + NON_LATIN])
+def test_docx_opens_with_python_docx(tmp_path, lines):
+    docx = pytest.importorskip('docx')
+    path = tmp_path / 'out.docx'
+
+    text_writers.write_docx(lines, str(path))
+
+    paragraphs = [p.text for p in docx.Document(str(path)).paragraphs]
+    assert paragraphs == [line for line in lines if line.strip()]
+
+
+@pytest.mark.parametrize('lines', [[], LATIN + [''] + NON_LATIN])
+def test_pptx_opens_with_python_pptx(tmp_path, lines):
+    pptx = pytest.importorskip('pptx')
+    path = tmp_path / 'out.pptx'
+
+    count = text_writers.write_pptx(text_writers.slide_bodies(lines), str(path))
+
+    prs = pptx.Presentation(str(path))
+    assert len(prs.slides) == count
+    body = [p.text for slide in prs.slides for p in slide.placeholders[1].text_frame.paragraphs]
+    assert body == [line for line in lines if line]
+    assert [slide.shapes.title.text for slide in prs.slides] == [f'Slide {n}' for n in range(1, count + 1)]
+
+
+def test_pptx_app_properties_describe_the_deck(tmp_path):
+    pytest.importorskip('pptx')
+    path = tmp_path / 'out.pptx'
+    lines = [f'word{n} word' for n in range(25)]
+
+    count = text_writers.write_pptx(text_writers.slide_bodies(lines), str(path))
+
+    with zipfile.ZipFile(str(path)) as archive:
+        app = archive.read('docProps/app.xml').decode('utf-8')
+    assert count == 3
+    assert f'<Slides>{count}</Slides>' in app
+    assert '<Paragraphs>25</Paragraphs>' in app
+    assert '<Words>50</Words>' in app
+    titles = re.search(r'<TitlesOfParts>(.*?)</TitlesOfParts>', app).group(1)
+    assert re.findall(r'Slide \d+', titles) == ['Slide 1', 'Slide 2', 'Slide 3']
+    assert f'size="{1 + count}"' in titles
+
+
+@pytest.mark.parametrize('count, pages', [(0, 1), (1, 1), (47, 1), (48, 2), (94, 2), (95, 3)])
+def test_pdf_page_break_at_47_lines(tmp_path, count, pages):
+    fitz = pytest.importorskip('fitz')
+    assert text_writers.LINES_PER_PAGE == 47
+    path = tmp_path / 'out.pdf'
+    lines = [f'line {n}' for n in range(count)]
+
+    assert text_writers.write_pdf(lines, str(path)) == pages
+
+    with fitz.open(str(path)) as doc:
+        assert len(doc) == pages
+        text = [doc[n].get_text().split('\n') for n in range(pages)]
+    found = [line for page in text for line in page if line]
+    assert found == lines
+    if count == 48:
+        assert [line for line in text[1] if line] == ['line 47']
+
+
+def test_pdf_non_latin_lines_on_both_sides_of_a_page_break(tmp_path):
+    fitz = pytest.importorskip('fitz')
+    path = tmp_path / 'out.pdf'
+    lines = [f'строка {n} 中文' for n in range(48)]
+
+    assert text_writers.write_pdf(lines, str(path)) == 2
+
+    with fitz.open(str(path)) as doc:
+        assert 'строка 46 中文' in doc[0].get_text()
+        assert doc[1].get_text().strip() == 'строка 47 中文'
+        # The embedded font is shared by both pages, not written twice
+        fonts = {font[3] for page in doc for font in page.get_fonts()}
+    assert len(fonts) == 2
+
+
+@pytest.mark.parametrize('lines, sizes', [
+    ([f'l{n}' for n in range(10)], [10]),
+    ([f'l{n}' for n in range(11)], [10, 1]),
+    ([f'l{n}' for n in range(20)], [10, 10]),
+    (['a', ''] * 10, [10]),
+    (['a', ''] * 11, [10, 1]),
+    (['a', 'b', ''] * 4, [8]),
+    (['a', 'b', 'c', ''] * 4, [10, 2]),
+    ([], []),
+    (['', '', ''], []),
+])
+def test_slide_breaks_at_10_lines_or_paragraphs(lines, sizes):
+    assert [len(body) for body in text_writers.slide_bodies(lines)] == sizes
+
+
+def test_pptx_survives_a_python_pptx_round_trip(tmp_path):
+    pptx = pytest.importorskip('pptx')
+    path, resaved = tmp_path / 'out.pptx', tmp_path / 'resaved.pptx'
+    lines = [f'{n} Привет 中文' for n in range(25)]
+
+    count = text_writers.write_pptx(text_writers.slide_bodies(lines), str(path))
+
+    prs = pptx.Presentation(str(path))
+    assert count == len(prs.slides) == 3
+    assert len({slide.slide_id for slide in prs.slides}) == 3
+    prs.slides.add_slide(prs.slide_layouts[1]).shapes.title.text = 'Added'
+    prs.save(str(resaved))
+
+    again = pptx.Presentation(str(resaved))
+    assert [slide.shapes.title.text for slide in again.slides] == ['Slide 1', 'Slide 2', 'Slide 3', 'Added']
+    body = [p.text for slide in list(again.slides)[:3] for p in slide.placeholders[1].text_frame.paragraphs]
+    assert body == lines
+    with zipfile.ZipFile(str(path)) as archive:
+        names = archive.namelist()
+        content_types = archive.read('[Content_Types].xml').decode('utf-8')
+    assert sorted(name for name in names if re.fullmatch(r'ppt/slides/slide\d+\.xml', name)) == [
+        'ppt/slides/slide1.xml', 'ppt/slides/slide2.xml', 'ppt/slides/slide3.xml']
+    assert all(f'/ppt/slides/slide{n}.xml' in content_types for n in (1, 2, 3))
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+watcher = pytest.importorskip('watcher')
+
+
+def _touch(path, mtime):
+    path.write_bytes(b'data')
+    os.utime(path, (mtime, mtime))
+
+
+def test_multi_sheet_workbook_zip_counts_as_up_to_date(tmp_path):
+    inbox, outbox = tmp_path / 'in', tmp_path / 'out'
+    inbox.mkdir()
+    outbox.mkdir()
+    rule = watcher.Rule(str(inbox), '*', 'csv', str(outbox))
+    book, table = inbox / 'book.xlsx', inbox / 'table.csv'
+    _touch(book, 1000)
+    _touch(table, 1000)
+    _touch(outbox / 'book.zip', 2000)
+    _touch(outbox / 'table.zip', 2000)
+
+    assert rule.is_up_to_date(str(book))
+    assert not rule.is_up_to_date(str(table))  # only workbooks are converted to a .zip
+
+    w = watcher.Watcher([rule], use_inotify=False)
+    w.scan()
+    assert list(w.pending) == [str(table)]
+
+
+def test_recorded_output_counts_as_up_to_date(tmp_path):
+    rule = watcher.Rule(str(tmp_path), '*', 'json', str(tmp_path / 'out'))
+    source, output = tmp_path / 'data.txt', tmp_path / 'elsewhere.json'
+    _touch(source, 1000)
+    assert not rule.is_up_to_date(str(source))
+
+    _touch(output, 2000)
+    rule.outputs[str(source)] = str(output)
+    assert rule.is_up_to_date(str(source))
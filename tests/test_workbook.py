@@ -0,0 +1,34 @@
+import pytest
+
+pd = pytest.importorskip('pandas')
+workbook = pytest.importorskip('workbook')
+
+NAMES = ['Summary', 'Q1', 'Q2']
+
+
+@pytest.mark.parametrize('sheets', [None, '', []])
+def test_select_defaults_to_every_sheet(sheets):
+    assert workbook.select(NAMES, sheets) == NAMES
+
+
+@pytest.mark.parametrize('sheets', [['Q2', 'Summary'], 'Q2, Summary', 'Q2,,Summary,'])
+def test_select_keeps_workbook_order(sheets):
+    assert workbook.select(NAMES, sheets) == ['Summary', 'Q2']
+
+
+def test_select_rejects_unknown_sheets():
+    with pytest.raises(ValueError, match='No such sheet: Q3'):
+        workbook.select(NAMES, 'Q1,Q3')
+
+
+def test_read_sheets(tmp_path):
+    pytest.importorskip('openpyxl')
+    path = tmp_path / 'book.xlsx'
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({'a': [1, 2]}).to_excel(writer, sheet_name='First', index=False)
+        pd.DataFrame({'b': ['x']}).to_excel(writer, sheet_name='Second', index=False)
+
+    sheets = workbook.read_sheets(str(path))
+    assert list(sheets) == ['First', 'Second']
+    assert sheets['First']['a'].tolist() == [1, 2]
+    assert list(workbook.read_sheets(str(path), 'Second')) == ['Second']
@@ -0,0 +1,125 @@
+"""Encoding detection and incremental decoding for plain-text inputs.
+
+Only the head of a file is sampled to pick the encoding: a BOM wins, then
+BOM-less UTF-16 and a strict UTF-8 check, then chardet and charset_normalizer
+when they are confident, and cp1252 otherwise. The file is then
+decoded chunk by chunk as it is read, so a large non-UTF-8 log is read once
+instead of once per candidate encoding.
+"""
+import io
+import codecs
+
+try:
+    from charset_normalizer import from_bytes
+except ImportError:
+    from_bytes = None
+
+try:
+    import chardet
+except ImportError:
+    chardet = None
+
+SAMPLE_BYTES = 64 * 1024
+
+# Detector answers weaker than these fall back to cp1252
+MIN_CONFIDENCE = 0.7
+MIN_COHERENCE = 0.1
+MAX_CHAOS = 0.1
+
+# Legacy encodings charset_normalizer may choose between
+CANDIDATES = ['cp1252', 'cp1250', 'cp1251', 'cp1253', 'cp1254', 'cp1255', 'cp1256', 'cp1257', 'koi8_r',
+              'iso8859_15', 'shift_jis', 'euc_jp', 'gb18030', 'big5', 'euc_kr']
+
+# Read as cp1252, as browsers do: it only adds printable characters to Latin-1
+_WESTERN = {'ascii', 'iso8859-1', 'cp1252'}
+
+# UTF-32 LE starts with the UTF-16 LE BOM, so it has to be checked first
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def _utf16_without_bom(sample):
+    """'utf-16-le'/'utf-16-be' when NULs sit in every other byte, as mostly-ASCII UTF-16 does"""
+    even, odd = sample[0::2], sample[1::2]
+    if len(sample) < 4:
+        return None
+    if odd.count(0) > len(odd) * 0.3 and even.count(0) < len(even) * 0.05:
+        return 'utf-16-le'
+    if even.count(0) > len(even) * 0.3 and odd.count(0) < len(odd) * 0.05:
+        return 'utf-16-be'
+    return None
+
+
+def _prefer_cp1252(sample, encoding):
+    """cp1252 whenever it reads the sample exactly like the detected encoding"""
+    if codecs.lookup(encoding).name in _WESTERN:
+        return 'cp1252'
+    try:
+        if sample.decode('cp1252') == sample.decode(encoding):
+            return 'cp1252'
+    except (UnicodeDecodeError, LookupError):
+        pass
+    return encoding
+
+
+def detect_encoding(sample):
+    """Best encoding for a sample taken from the start of a file"""
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    if b'\x00' in sample:
+        encoding = _utf16_without_bom(sample)
+        if encoding:
+            return encoding
+    else:
+        # NUL bytes are valid UTF-8 but almost always mean BOM-less UTF-16/32
+        try:
+            # A full sample may end with a character cut in half; a whole file may not
+            codecs.getincrementaldecoder('utf-8')().decode(sample, final=len(sample) < SAMPLE_BYTES)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            pass
+
+    # charset_normalizer happily calls short Western text cp1250 or mac_iceland,
+    # so chardet goes first and only confident, coherent answers are used
+    if chardet is not None:
+        result = chardet.detect(sample)
+        if result.get('encoding') and (result.get('confidence') or 0) >= MIN_CONFIDENCE:
+            return _prefer_cp1252(sample, result['encoding'])
+    if from_bytes is not None:
+        best = from_bytes(sample, cp_isolation=CANDIDATES).best()
+        if best is not None and best.chaos <= MAX_CHAOS and best.coherence >= MIN_COHERENCE:
+            return _prefer_cp1252(sample, best.encoding)
+    return 'cp1252'
+
+
+def open_text(source, encoding=None):
+    """Decoding text stream over a path or a seekable binary file object"""
+    raw = source if hasattr(source, 'read') else open(source, 'rb')
+    if encoding is None:
+        start = raw.tell()
+        encoding = detect_encoding(raw.read(SAMPLE_BYTES))
+        raw.seek(start)
+    # A sample can't vouch for the whole file; undecodable bytes become U+FFFD
+    return io.TextIOWrapper(raw, encoding=encoding, errors='replace')
+
+
+def iter_lines(source, encoding=None):
+    """Lines without their newline, exactly like read_text().split('\\n') but lazy"""
+    with open_text(source, encoding) as f:
+        line = ''
+        for line in f:
+            yield line[:-1] if line.endswith('\n') else line
+        if not line or line.endswith('\n'):
+            yield ''
+
+
+def read_text(source, encoding=None):
+    with open_text(source, encoding) as f:
+        return f.read()
@@ -0,0 +1,370 @@
+"""Streaming PDF, DOCX and PPTX writers for line-oriented text.
+
+Each writer takes an iterable of lines and writes pages, paragraphs or slides
+as it goes, so memory stays flat however long the input is. The PDF is
+assembled by hand with the base-14 Helvetica font. Lines WinAnsiEncoding
+can't show are set in the Unicode font PyMuPDF ships (Droid Sans Fallback:
+Latin, Greek, Cyrillic and CJK), embedded once the pages are written and
+subset with fontTools when it is installed. DOCX and PPTX output reuse the
+package python-docx / python-pptx would produce for a one-item document:
+every part is copied as-is and only the body (or the slide list) and the
+document properties are written from the stream.
+"""
+import io
+import re
+import posixpath
+import zlib
+import zipfile
+import functools
+from xml.sax.saxutils import escape
+
+import pptx_reader
+
+try:
+    from fontTools import subset as font_subset
+    from fontTools.ttLib import TTFont
+except ImportError:
+    font_subset = None
+
+# Same page geometry as fitz's default A4 page with insert_text at (50, y)
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 50
+FONT_SIZE = 11
+LEADING = 15
+LINES_PER_PAGE = 47
+
+SLIDE_MAX_LINES = 10
+
+# PyMuPDF's built-in fallback font; the only broad-coverage font it always has
+UNICODE_FONT = 'cjk'
+
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+_TITLE = 'TEXT-WRITERS-TITLE'
+_BODY = 'TEXT-WRITERS-BODY'
+
+
+def _xml_text(text):
+    return escape(_XML_ILLEGAL.sub('', text))
+
+
+def _pdf_string(data):
+    return b'(' + data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)').replace(b'\r', b'') + b')'
+
+
+def _chunks(lines, size):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class _UnicodeFont:
+    """Type0 font for the lines Helvetica can't show; takes five objects from number on"""
+
+    def __init__(self, number):
+        import fitz
+
+        self.number = number
+        self.font = fitz.Font(UNICODE_FONT)
+        self.chars = {}  # glyph id -> first character drawn with it
+
+    def show(self, line):
+        gids = []
+        for char in line.replace('\r', ''):
+            gid = self.font.has_glyph(ord(char))
+            if not gid:
+                char = '?'  # the font doesn't cover it either (e.g. Hebrew, Arabic)
+                gid = self.font.has_glyph(ord(char))
+            self.chars.setdefault(gid, char)
+            gids.append(gid)
+        return b'/F2 %d Tf <%s> Tj /F1 %d Tf' % (FONT_SIZE, ''.join('%04x' % gid for gid in gids).encode('ascii'), FONT_SIZE)
+
+    def _font_file(self):
+        data = self.font.buffer
+        if font_subset is None:
+            return data
+        font = TTFont(io.BytesIO(data))
+        subsetter = font_subset.Subsetter(font_subset.Options(retain_gids=True, notdef_outline=True))
+        subsetter.populate(gids=sorted(self.chars))
+        subsetter.subset(font)
+        buffer = io.BytesIO()
+        font.save(buffer)
+        return buffer.getvalue()
+
+    def _to_unicode(self):
+        mapped = sorted((gid, char) for gid, char in self.chars.items() if gid)
+        blocks = b''
+        for i in range(0, len(mapped), 100):
+            block = mapped[i:i + 100]
+            blocks += b'%d beginbfchar\n' % len(block)
+            for gid, char in block:
+                blocks += b'<%04x> <%s>\n' % (gid, char.encode('utf-16-be').hex().encode('ascii'))
+            blocks += b'endbfchar\n'
+        return (b'/CIDInit /ProcSet findresource begin 12 dict begin begincmap\n'
+                b'/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n'
+                b'/CMapName /Adobe-Identity-UCS def /CMapType 2 def\n'
+                b'1 begincodespacerange\n<0000> <ffff>\nendcodespacerange\n' + blocks +
+                b'endcmap CMapName currentdict /CMap defineresource pop end end')
+
+    def write(self, pdf):
+        n = self.number
+        name = b'/' + re.sub(r'[^A-Za-z0-9]', '', self.font.name).encode('ascii')
+        widths = b' '.join(b'%d [%d]' % (gid, round(self.font.glyph_advance(ord(char)) * 1000))
+                           for gid, char in sorted(self.chars.items()))
+        box = self.font.bbox
+        bbox = b' '.join(b'%d' % round(value * 1000) for value in (box.x0, box.y0, box.x1, box.y1))
+        font_file = self._font_file()
+        compressed = zlib.compress(font_file)
+        to_unicode = zlib.compress(self._to_unicode())
+        pdf.object(n, b'<< /Type /Font /Subtype /Type0 /BaseFont %s /Encoding /Identity-H '
+                   b'/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>' % (name, n + 1, n + 4))
+        pdf.object(n + 1, b'<< /Type /Font /Subtype /CIDFontType2 /BaseFont %s '
+                   b'/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> '
+                   b'/FontDescriptor %d 0 R /CIDToGIDMap /Identity /DW 1000 /W [%s] >>' % (name, n + 2, widths))
+        pdf.object(n + 2, b'<< /Type /FontDescriptor /FontName %s /Flags 4 /FontBBox [%s] /ItalicAngle 0 '
+                   b'/Ascent %d /Descent %d /CapHeight %d /StemV 80 /FontFile2 %d 0 R >>'
+                   % (name, bbox, round(self.font.ascender * 1000), round(self.font.descender * 1000),
+                      round(self.font.ascender * 1000), n + 3))
+        pdf.object(n + 3, b'<< /Length %d /Length1 %d /Filter /FlateDecode >>\nstream\n'
+                   % (len(compressed), len(font_file)) + compressed + b'\nendstream')
+        pdf.object(n + 4, b'<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(to_unicode)
+                   + to_unicode + b'\nendstream')
+
+
+class _PdfFile:
+    def __init__(self, f):
+        self.f = f
+        self.position = 0
+        self.offsets = {}
+
+    def write(self, data):
+        self.f.write(data)
+        self.position += len(data)
+
+    def object(self, number, body):
+        self.offsets[number] = self.position
+        self.write(b'%d 0 obj\n' % number + body + b'\nendobj\n')
+
+
+def write_pdf(lines, output):
+    """One A4 page per LINES_PER_PAGE lines; output is a path or a binary file"""
+    if hasattr(output, 'write'):
+        return _write_pdf(lines, output)
+    with open(output, 'wb') as f:
+        return _write_pdf(lines, f)
+
+
+def _write_pdf(lines, f):
+    pdf = _PdfFile(f)
+    pdf.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    pdf.object(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+    pdf.object(3, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+
+    kids = []
+    number = 4
+    unicode_font = None
+    for page_lines in _chunks(lines, LINES_PER_PAGE):
+        shown = []
+        for line in page_lines:
+            line = line.expandtabs(4)
+            try:
+                shown.append(_pdf_string(line.encode('cp1252')) + b' Tj')
+            except UnicodeEncodeError:
+                if unicode_font is None:
+                    unicode_font = _UnicodeFont(number)
+                    number += 5
+                shown.append(unicode_font.show(line))
+        content = zlib.compress(b'BT /F1 %d Tf %d TL %d %d Td %s ET' % (
+            FONT_SIZE, LEADING, MARGIN, PAGE_HEIGHT - MARGIN, b' T* '.join(shown)))
+        fonts = b'/F1 3 0 R' if unicode_font is None else b'/F1 3 0 R /F2 %d 0 R' % unicode_font.number
+        pdf.object(number, b'<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(content)
+                   + content + b'\nendstream')
+        pdf.object(number + 1, b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+                   b'/Resources << /Font << %s >> >> /Contents %d 0 R >>'
+                   % (PAGE_WIDTH, PAGE_HEIGHT, fonts, number))
+        kids.append(b'%d 0 R' % (number + 1))
+        number += 2
+    if not kids:
+        # A PDF needs at least one page, as fitz's new_page() gave before
+        pdf.object(number, b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] >>' % (PAGE_WIDTH, PAGE_HEIGHT))
+        kids.append(b'%d 0 R' % number)
+        number += 1
+    if unicode_font is not None:
+        unicode_font.write(pdf)
+
+    pdf.object(2, b'<< /Type /Pages /Kids [' + b' '.join(kids) + b'] /Count %d >>' % len(kids))
+    xref = pdf.position
+    pdf.write(b'xref\n0 %d\n0000000000 65535 f \n' % number)
+    for i in range(1, number):
+        pdf.write(b'%010d 00000 n \n' % pdf.offsets[i])
+    pdf.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (number, xref))
+    return len(kids)
+
+
+@functools.lru_cache(maxsize=None)
+def _docx_template():
+    import docx
+
+    buffer = io.BytesIO()
+    docx.Document().save(buffer)
+    with zipfile.ZipFile(buffer) as archive:
+        parts = {name: archive.read(name) for name in archive.namelist()}
+    xml = parts.pop('word/document.xml').decode('utf-8')
+    start = xml.index('<w:body>') + len('<w:body>')
+    end = xml.find('<w:sectPr', start)
+    if end < 0:
+        end = xml.index('</w:body>', start)
+    return parts, xml[:start].encode('utf-8'), xml[end:].encode('utf-8')
+
+
+def _docx_paragraph(line):
+    runs = '<w:tab/>'.join(f'<w:t xml:space="preserve">{_xml_text(part)}</w:t>' for part in line.split('\t'))
+    return f'<w:p><w:r>{runs}</w:r></w:p>'.encode('utf-8')
+
+
+def write_docx(lines, output):
+    """One paragraph per non-blank line, streamed into word/document.xml"""
+    parts, head, tail = _docx_template()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in parts.items():
+            archive.writestr(name, data)
+        with archive.open('word/document.xml', 'w') as part:
+            part.write(head)
+            for line in lines:
+                if line.strip():
+                    part.write(_docx_paragraph(line))
+            part.write(tail)
+    return output
+
+
+@functools.lru_cache(maxsize=None)
+def _pptx_template():
+    from pptx import Presentation
+
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[1])  # Title and Content
+    slide.shapes.title.text = _TITLE
+    slide.placeholders[1].text = _BODY
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    with zipfile.ZipFile(buffer) as archive:
+        slide_name = pptx_reader.slide_parts(archive)[0]
+        parts = {name: archive.read(name) for name in archive.namelist()}
+    directory, name = slide_name.rsplit('/', 1)
+    slide_rels = parts.pop(f'{directory}/_rels/{name}.rels')
+    xml = parts.pop(slide_name).decode('utf-8')
+    body = re.search(r'<a:p>(?:(?!<a:p>).)*?' + _BODY + r'.*?</a:p>', xml, re.S)
+    return {
+        'parts': parts,
+        'directory': directory,
+        'rels': slide_rels,
+        'before': xml[:body.start()],
+        'paragraph': body.group(0),
+        'after': xml[body.end():],
+        'slide_name': slide_name,
+    }
+
+
+def _slide_overrides(content_types, slide_name, count):
+    override = re.search(r'<Override [^>]*PartName="/%s"[^>]*/>' % re.escape(slide_name), content_types).group(0)
+    overrides = ''.join(override.replace(slide_name, _numbered(slide_name, n)) for n in range(1, count + 1))
+    return content_types.replace(override, '').replace('</Types>', overrides + '</Types>')
+
+
+def _slide_rels(presentation_rels, slide_name, count):
+    target = posixpath.relpath(slide_name, 'ppt')
+    rel = re.search(r'<Relationship [^>]*Target="%s"[^>]*/>' % re.escape(target), presentation_rels).group(0)
+    rels = ''.join(
+        re.sub(r'Id="[^"]*"', f'Id="rIdSlide{n}"', rel).replace(target, _numbered(target, n))
+        for n in range(1, count + 1))
+    return presentation_rels.replace(rel, '').replace('</Relationships>', rels + '</Relationships>')
+
+
+def _app_properties(app, count, paragraphs, words):
+    """docProps/app.xml with the deck's slide count, slide titles and text statistics"""
+    for tag, value in (('Slides', count), ('Paragraphs', paragraphs), ('Words', words)):
+        app = re.sub(r'<%s>\d*</%s>' % (tag, tag), f'<{tag}>{value}</{tag}>', app)
+    pair = re.search(r'(<vt:lpstr>Slide Titles</vt:lpstr></vt:variant><vt:variant><vt:i4>)(\d+)', app)
+    vector = re.search(r'<TitlesOfParts><vt:vector size="\d+" baseType="lpstr">(.*?)</vt:vector>', app, re.S)
+    if not pair or not vector:
+        return app
+    # Slide titles come last, after the template's fonts and theme
+    titles = re.findall(r'<vt:lpstr>.*?</vt:lpstr>', vector.group(1))
+    titles = titles[:len(titles) - int(pair.group(2))]
+    titles += [f'<vt:lpstr>Slide {n}</vt:lpstr>' for n in range(1, count + 1)]
+    app = (app[:vector.start()] + f'<TitlesOfParts><vt:vector size="{len(titles)}" baseType="lpstr">'
+           + ''.join(titles) + '</vt:vector>' + app[vector.end():])
+    return app[:pair.start()] + f'{pair.group(1)}{count}' + app[pair.end():]
+
+
+def _numbered(slide_name, n):
+    return re.sub(r'\d+(?=\.xml$)', str(n), slide_name)
+
+
+def slide_bodies(lines, limit=SLIDE_MAX_LINES):
+    """Group lines into slide bodies.
+
+    Blank lines separate paragraphs; a slide takes up to ``limit`` paragraphs,
+    and is cut early once it holds ``limit`` lines so one endless paragraph
+    (a log, say) is spread over many slides instead of overflowing one.
+    """
+    body, pending = [], []
+    paragraphs = 0
+    for line in lines:
+        if line:
+            pending.append(line)
+            if len(body) + len(pending) < limit:
+                continue
+        text = '\n'.join(pending).strip()
+        pending = []
+        if text:
+            body.extend(text.split('\n'))
+            paragraphs += 1
+            if paragraphs >= limit or len(body) >= limit:
+                yield body
+                body, paragraphs = [], 0
+    text = '\n'.join(pending).strip()
+    if text:
+        body.extend(text.split('\n'))
+    if body:
+        yield body
+
+
+def write_pptx(bodies, output):
+    """One Title and Content slide per body (a list of lines), streamed into the zip"""
+    template = _pptx_template()
+    parts = dict(template['parts'])
+    directory = template['directory']
+    content_types = parts.pop('[Content_Types].xml').decode('utf-8')
+    presentation = parts.pop('ppt/presentation.xml').decode('utf-8')
+    presentation_rels = parts.pop('ppt/_rels/presentation.xml.rels').decode('utf-8')
+    app = parts.pop('docProps/app.xml', None)
+
+    count = paragraphs = words = 0
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in parts.items():
+            archive.writestr(name, data)
+        for body in bodies:
+            count += 1
+            with archive.open(f'{directory}/slide{count}.xml', 'w') as part:
+                part.write(template['before'].replace(_TITLE, f'Slide {count}').encode('utf-8'))
+                for line in body:
+                    part.write(template['paragraph'].replace(_BODY, _xml_text(line)).encode('utf-8'))
+                    words += len(line.split())
+                paragraphs += len(body)
+                part.write(template['after'].replace(_TITLE, f'Slide {count}').encode('utf-8'))
+            archive.writestr(f'{directory}/_rels/slide{count}.xml.rels', template['rels'])
+
+        if app is not None:
+            archive.writestr('docProps/app.xml', _app_properties(app.decode('utf-8'), count, paragraphs, words))
+        archive.writestr('[Content_Types].xml', _slide_overrides(content_types, template['slide_name'], count))
+        archive.writestr('ppt/_rels/presentation.xml.rels', _slide_rels(presentation_rels, template['slide_name'], count))
+        ids = ''.join(f'<p:sldId id="{255 + n}" r:id="rIdSlide{n}"/>' for n in range(1, count + 1))
+        archive.writestr('ppt/presentation.xml',
+                         re.sub(r'<p:sldIdLst>.*?</p:sldIdLst>', f'<p:sldIdLst>{ids}</p:sldIdLst>', presentation, flags=re.S))
+    return count
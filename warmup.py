@@ -0,0 +1,143 @@
+"""Backend warm-up for pre-forking servers.
+
+Conversions run in children forked from the web worker (see supervisor), so
+whatever a backend sets up lazily during a conversion is thrown away with
+the child and paid for again on the next request. warm() does that work
+once, up front:
+
+- imports the heavy backends
+- loads the fonts behind PyMuPDF, pdfminer, reportlab and WeasyPrint
+- builds the DOCX/PPTX templates and the per-process style and font pools
+  in converters
+- runs Tesseract once, so its binary and language data are in the page cache
+
+Under gunicorn with preload_app (see gunicorn.conf.py) it runs in the master
+before any worker is forked, and every worker, conversion child and batch
+process inherits the warm state copy-on-write.
+"""
+import io
+import time
+import threading
+
+import profiling
+
+_lock = threading.Lock()
+_thread = None
+_state = {'ready': False, 'seconds': None, 'steps': {}}
+
+
+def _sample_pdf():
+    import text_writers
+
+    buffer = io.BytesIO()
+    text_writers.write_pdf(['Warm-up 0123456789'], buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def _warm_imports():
+    import openpyxl
+    import reportlab.platypus
+    import converters
+
+    if converters.pdf2docx:
+        from pdf2docx import Converter
+    if converters.pyarrow:
+        import pyarrow.parquet
+
+
+def _warm_pdf():
+    import fitz
+    import converters
+
+    with fitz.open(stream=_sample_pdf().read(), filetype='pdf') as doc:
+        doc[0].get_text('dict')
+    if not converters.pdfplumber:
+        return False
+    with converters.pdfplumber.open(_sample_pdf()) as pdf:
+        pdf.pages[0].extract_text()
+
+
+def _warm_office():
+    import converters
+    import text_writers
+
+    text_writers._docx_template()
+    if not converters.Presentation:
+        return False
+    text_writers._pptx_template()
+
+
+def _warm_reportlab():
+    import converters
+
+    converters._pdf_table_styles()
+
+
+def _warm_weasyprint():
+    import converters
+
+    if not converters.HTML:
+        return False
+    converters.HTML(string='<p>Warm-up</p>').write_pdf(font_config=converters._font_config())
+
+
+def _warm_tesseract():
+    import converters
+    from PIL import Image
+
+    if not converters.pytesseract:
+        return False
+    try:
+        converters.pytesseract.get_tesseract_version()
+    except converters.pytesseract.TesseractNotFoundError:
+        return False
+    converters.pytesseract.image_to_string(Image.new('L', (120, 40), 255))
+
+
+# name -> step; a step returns False when its backend isn't installed
+STEPS = (
+    ('imports', _warm_imports),
+    ('pdf', _warm_pdf),
+    ('office', _warm_office),
+    ('reportlab', _warm_reportlab),
+    ('weasyprint', _warm_weasyprint),
+    ('tesseract', _warm_tesseract),
+)
+
+
+def warm():
+    """Run every step once. A failing step is recorded and doesn't stop the rest"""
+    with _lock:
+        if _state['ready']:
+            return status()
+        started = time.perf_counter()
+        for name, step in STEPS:
+            step_started = time.perf_counter()
+            try:
+                with profiling.span('warmup', step=name):
+                    result = 'skipped' if step() is False else 'ok'
+            except Exception as e:
+                result = f"error: {type(e).__name__}: {e}"
+            _state['steps'][name] = {'status': result, 'seconds': round(time.perf_counter() - step_started, 3)}
+        _state['seconds'] = round(time.perf_counter() - started, 3)
+        _state['ready'] = True
+    return status()
+
+
+def start():
+    """Warm up in a background thread unless that is done or already running"""
+    global _thread
+    with _lock:
+        if _state['ready'] or (_thread is not None and _thread.is_alive()):
+            return
+        _thread = threading.Thread(target=warm, name='warmup', daemon=True)
+        _thread.start()
+
+
+def is_ready():
+    return _state['ready']
+
+
+def status():
+    return {'ready': _state['ready'], 'seconds': _state['seconds'], 'steps': dict(_state['steps'])}
@@ -0,0 +1,213 @@
+"""Watch-folder daemon: convert files as they are dropped into a directory.
+
+Rules map a glob in an input directory to a target format and an output
+directory. Files are only picked up once their size and mtime have stopped
+changing for ``settle_seconds``, then converted on the rule's worker pool and
+atomically renamed into the output directory.
+
+Uses inotify on Linux when ``inotify_simple`` is installed and falls back to
+polling everywhere else.
+"""
+import os
+import json
+import time
+import signal
+import fnmatch
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import cli
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = inotify_flags = None
+
+
+class Rule:
+    def __init__(self, input, pattern, format, output, workers=1):
+        self.input_dir = os.path.abspath(input)
+        self.pattern = pattern
+        self.format = format.lower()
+        self.output_dir = os.path.abspath(output)
+        self.workers = int(workers)
+        self.pool = None
+        self.outputs = {}  # source -> the output it was last converted to
+
+    def matches(self, path):
+        return (os.path.dirname(path) == self.input_dir
+                and fnmatch.fnmatch(os.path.basename(path), self.pattern))
+
+    def output_for(self, path):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.output_dir, f"{stem}.{self.format}")
+
+    def is_up_to_date(self, path):
+        """Whether path's output is newer than path; a multi-sheet workbook's output is a .zip"""
+        output = self.output_for(path)
+        candidates = [self.outputs.get(path), output]
+        if os.path.splitext(path)[1].lower() in ('.xlsx', '.xls'):
+            candidates.append(os.path.splitext(output)[0] + '.zip')
+        return any(candidate and cli.is_up_to_date(path, candidate, None, 'mtime') for candidate in candidates)
+
+
+def load_rules(config_path):
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    rules = [Rule(**rule) for rule in config.get('rules', [])]
+    if not rules:
+        raise ValueError(f"No rules defined in {config_path}")
+    return rules, config
+
+
+class Watcher:
+    def __init__(self, rules, settle_seconds=2.0, poll_interval=1.0, rescan_interval=60.0,
+                 use_inotify=True):
+        self.rules = rules
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.rescan_interval = rescan_interval
+        self.input_dirs = sorted({rule.input_dir for rule in rules})
+        self.pending = {}    # path -> (size, mtime_ns, stable_since)
+        self.in_flight = {}  # path -> number of rules still converting it
+        self.failed = {}     # path -> mtime_ns of the version that failed
+        self.stopped = False
+        self.lock = threading.Lock()
+        self.inotify = None
+        if use_inotify and INotify is not None:
+            self.inotify = INotify()
+            mask = inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO | inotify_flags.MODIFY
+            self.watch_dirs = {self.inotify.add_watch(d, mask): d for d in self.input_dirs}
+
+    def stop(self, *args):
+        self.stopped = True
+
+    def _rules_for(self, path):
+        return [rule for rule in self.rules if rule.matches(path)]
+
+    def note(self, path):
+        """Start tracking a candidate file until it settles"""
+        if path in self.pending or path in self.in_flight or not os.path.isfile(path):
+            return
+        if os.path.basename(path).startswith('.'):
+            # Hidden files are usually partial uploads or editor lock files
+            return
+        rules = self._rules_for(path)
+        if not rules:
+            return
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        if self.failed.get(path) == stat.st_mtime_ns:
+            return
+        if all(rule.is_up_to_date(path) for rule in rules):
+            return
+        self.pending[path] = (stat.st_size, stat.st_mtime_ns, time.monotonic())
+
+    def scan(self):
+        for input_dir in self.input_dirs:
+            try:
+                names = os.listdir(input_dir)
+            except OSError as e:
+                print(f"Cannot scan {input_dir}: {e}", flush=True)
+                continue
+            for name in names:
+                self.note(os.path.join(input_dir, name))
+
+    def wait_for_changes(self):
+        if self.inotify is None:
+            time.sleep(self.poll_interval)
+            self.scan()
+            return
+        for event in self.inotify.read(timeout=int(self.poll_interval * 1000)):
+            if event.mask & inotify_flags.Q_OVERFLOW:
+                self.scan()
+            elif event.name:
+                self.note(os.path.join(self.watch_dirs[event.wd], event.name))
+
+    def submit_settled(self):
+        now = time.monotonic()
+        for path, (size, mtime_ns, since) in list(self.pending.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Removed or renamed before it settled
+                del self.pending[path]
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                self.pending[path] = (stat.st_size, stat.st_mtime_ns, now)
+                continue
+            if now - since < self.settle_seconds:
+                continue
+
+            del self.pending[path]
+            rules = self._rules_for(path)
+            with self.lock:
+                self.in_flight[path] = len(rules)
+            for rule in rules:
+                future = rule.pool.submit(cli.convert_one, path, rule.output_for(path), rule.format, False, None)
+                future.add_done_callback(
+                    lambda f, rule=rule, path=path, mtime_ns=mtime_ns: self._finished(rule, path, mtime_ns, f))
+
+    def _finished(self, rule, path, mtime_ns, future):
+        with self.lock:
+            self.in_flight[path] -= 1
+            if not self.in_flight[path]:
+                del self.in_flight[path]
+        try:
+            entry = future.result()
+        except Exception as e:
+            entry = {'source': path, 'status': 'error', 'error': str(e), 'seconds': None}
+        if entry['status'] == 'error':
+            self.failed[path] = mtime_ns
+            print(f"FAILED {path}: {entry['error']}", flush=True)
+        else:
+            self.failed.pop(path, None)
+            rule.outputs[path] = entry['output']
+            print(f"Converted {path} -> {entry['output']} ({entry['seconds']}s)", flush=True)
+
+    def run(self):
+        for rule in self.rules:
+            os.makedirs(rule.output_dir, exist_ok=True)
+            rule.pool = ProcessPoolExecutor(max_workers=rule.workers, initializer=cli._init_worker)
+
+        mode = 'inotify' if self.inotify is not None else f'polling every {self.poll_interval}s'
+        print(f"Watching {', '.join(self.input_dirs)} ({mode})", flush=True)
+
+        # Pick up whatever was dropped while the daemon was down
+        self.scan()
+        last_rescan = time.monotonic()
+        try:
+            while not self.stopped:
+                self.wait_for_changes()
+                if self.inotify is not None and time.monotonic() - last_rescan >= self.rescan_interval:
+                    self.scan()
+                    last_rescan = time.monotonic()
+                self.submit_settled()
+        finally:
+            for rule in self.rules:
+                rule.pool.shutdown(wait=True)
+            if self.inotify is not None:
+                self.inotify.close()
+
+
+def run_watch(args):
+    if args.config:
+        rules, config = load_rules(args.config)
+    else:
+        if not (args.input and args.output and args.to):
+            raise SystemExit("watch needs either --config or INPUT OUTPUT --to FORMAT")
+        rules = [Rule(args.input, args.pattern, args.to, args.output, args.jobs)]
+        config = {}
+
+    watcher = Watcher(
+        rules,
+        settle_seconds=config.get('settle_seconds', args.settle),
+        poll_interval=config.get('poll_interval', args.poll_interval),
+        use_inotify=not args.poll,
+    )
+    signal.signal(signal.SIGTERM, watcher.stop)
+    signal.signal(signal.SIGINT, watcher.stop)
+    watcher.run()
+    return 0
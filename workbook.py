@@ -0,0 +1,52 @@
+"""Multi-sheet XLSX reading.
+
+Every sheet of a workbook is exposed, in workbook order, optionally narrowed
+to a selection of sheet names. Large workbooks are parsed one sheet per
+process: openpyxl is pure Python, so sheets parsed in threads would still
+run one at a time.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# Smaller workbooks are parsed in-process; pool start-up would cost more
+PARALLEL_MIN_BYTES = 2 * 1024 * 1024
+
+
+def select(names, sheets):
+    """Sheet names to read, in workbook order.
+
+    sheets is None for all of them, a list of names, or a comma-separated
+    string of names.
+    """
+    if not sheets:
+        return list(names)
+    if isinstance(sheets, str):
+        sheets = [sheet.strip() for sheet in sheets.split(',') if sheet.strip()]
+    missing = [sheet for sheet in sheets if sheet not in names]
+    if missing:
+        raise ValueError(f"No such sheet: {', '.join(missing)} (sheets: {', '.join(names)})")
+    return [name for name in names if name in sheets]
+
+
+def _read_sheet(path, name):
+    return pd.read_excel(path, sheet_name=name)
+
+
+def read_sheets(source, sheets=None, workers=None):
+    """{sheet name: DataFrame} for the selected sheets.
+
+    With workers > 1, a path source of at least PARALLEL_MIN_BYTES and more
+    than one sheet, sheets are parsed across a process pool.
+    """
+    with pd.ExcelFile(source) as book:
+        names = select(book.sheet_names, sheets)
+        parallel = (workers and workers > 1 and len(names) > 1
+                    and isinstance(source, (str, os.PathLike))
+                    and os.path.getsize(source) >= PARALLEL_MIN_BYTES)
+        if not parallel:
+            return {name: book.parse(name) for name in names}
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(names))) as pool:
+        return dict(zip(names, pool.map(_read_sheet, [source] * len(names), names)))